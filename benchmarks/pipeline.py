@@ -0,0 +1,296 @@
+"""
+Benchmarks for each stage of the recipe generation pipeline.
+
+The benchmarks run against local stand-ins for PyPI and the conda channels,
+using synthetic projects with many dependencies (to measure how each stage scales)
+and many projects (to measure end-to-end throughput).
+The time taken to import :mod:`mkrecipe` in a new interpreter is also measured, as it affects CLI startup.
+
+Run with::
+
+	python -m benchmarks.pipeline --save baseline.json
+	python -m benchmarks.pipeline --compare baseline.json
+
+"""
+
+# stdlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# 3rd party
+import click
+from domdf_python_tools.paths import PathPlus
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import MaryBerry, filter_reqs_by_py_version, filter_reqs_with_markers, make_recipe
+from mkrecipe import conda, metadata, pypi
+from mkrecipe.config import clear_cache as clear_config_cache
+from mkrecipe.config import load_toml
+
+__all__ = ("Result", "compare", "run_benchmarks", "synthetic_dependencies", "write_project")
+
+#: Mapping of benchmark names to results, with the keys ``seconds`` (the median time) and ``items``.
+Result = Dict[str, Dict[str, float]]
+
+# Markers which exercise both the marker filters, in roughly the proportions seen in real projects.
+_MARKERS = [
+		'',
+		'',
+		'',
+		"; python_version < '3.8'",
+		"; python_version >= '3.9'",
+		"; platform_system == 'Windows'",
+		"; platform_python_implementation != 'CPython'",
+		"; python_full_version >= '3.7.1' and python_version < '3.12'",
+		]
+
+
+def synthetic_dependencies(count: int) -> List[str]:
+	"""
+	Returns ``count`` requirement strings named ``dep-0``, ``dep-1`` etc., with a mixture of markers.
+
+	:param count:
+	"""
+
+	return [f"dep-{idx}>={idx % 7}.{idx % 3}{_MARKERS[idx % len(_MARKERS)]}" for idx in range(count)]
+
+
+def write_project(directory: PathPlus, name: str, dependencies: Sequence[str]) -> PathPlus:
+	"""
+	Write a ``pyproject.toml`` file for a synthetic project, and return the project directory.
+
+	:param directory: The directory to create the project in.
+	:param name:
+	:param dependencies:
+	"""
+
+	project_dir = directory / name
+	project_dir.maybe_make(parents=True)
+	(project_dir / "pyproject.toml").write_lines([
+			"[project]",
+			f'name = "{name}"',
+			'version = "1.0.0"',
+			'description = "A synthetic project for benchmarking."',
+			f"dependencies = {json.dumps(list(dependencies))}",
+			'license = {text = "MIT"}',
+			'authors = [{name = "Brian"}]',
+			'',
+			"[tool.mkrecipe]",
+			'conda-channels = ["conda-forge", "domdfcoding"]',
+			"min-python-version = 3.7",
+			])
+
+	return project_dir
+
+
+@contextmanager
+def _stand_ins(project_names: Sequence[str], dependency_names: Sequence[str]) -> Iterator[StandInServer]:
+	original_urls = pypi.PYPI_SIMPLE_URL, conda.CONDA_URL
+	original_env = {name: os.environ.get(name) for name in ("MKRECIPE_CACHE_DIR", "MKRECIPE_INDEX_URL")}
+
+	with StandInServer() as server, tempfile.TemporaryDirectory() as cache_dir:
+		for name in project_names:
+			server.add_project(name, [f"{name}-1.0.0.tar.gz", f"{name}-1.0.0-py3-none-any.whl"])
+
+		server.add_channel("conda-forge", ["setuptools", "wheel", *dependency_names[::2]])
+		server.add_channel("domdfcoding", dependency_names[1::2])
+
+		pypi.PYPI_SIMPLE_URL, conda.CONDA_URL = f"{server.url}simple/", f"{server.url}conda/"
+		os.environ["MKRECIPE_CACHE_DIR"] = cache_dir
+		os.environ.pop("MKRECIPE_INDEX_URL", None)
+		conda._indexes.clear()
+
+		try:
+			yield server
+		finally:
+			pypi.PYPI_SIMPLE_URL, conda.CONDA_URL = original_urls
+			conda._indexes.clear()
+
+			for name, value in original_env.items():
+				if value is None:
+					os.environ.pop(name, None)
+				else:
+					os.environ[name] = value
+
+
+def _clear_caches() -> None:
+	# Discard everything cached on disk and in memory, as for the first run on a new machine.
+	clear_config_cache()
+	conda.clear_cache()
+	metadata.clear_cache()
+	pypi.clear_cache()
+
+
+def _time(func: Callable[[], Any], repeat: int) -> float:
+	return statistics.median(timeit.repeat(func, repeat=repeat, number=1))
+
+
+def _import_time(module: str, repeat: int) -> float:
+	# The cumulative time to import the module in a new interpreter, from ``python -X importtime``.
+	times = []
+
+	for _ in range(repeat):
+		process = subprocess.run(
+				[sys.executable, "-X", "importtime", "-c", f"import {module}"],
+				stderr=subprocess.PIPE,
+				check=True,
+				universal_newlines=True,
+				)
+
+		for line in process.stderr.splitlines()[1:]:
+			_, cumulative, name = (part.strip() for part in line.split(':', 1)[1].split('|'))
+			if name == module:
+				times.append(int(cumulative) / 1_000_000)
+
+	return statistics.median(times)
+
+
+def run_benchmarks(
+		dependencies: Sequence[int] = (100, 500),
+		projects: int = 1000,
+		repeat: int = 5,
+		) -> Result:
+	"""
+	Run the benchmarks, and return the results.
+
+	:param dependencies: The numbers of dependencies to benchmark the per-project stages with.
+	:param projects: The number of projects to create recipes for in the throughput benchmarks.
+	:param repeat: The number of times to repeat each per-project benchmark. The median time is reported.
+	"""
+
+	results: Result = {}
+	max_dependencies = max(dependencies)
+	dependency_names = [f"dep-{idx}" for idx in range(max_dependencies)]
+	project_names = [f"project-{idx}" for idx in range(projects)]
+
+	def record(name: str, seconds: float, items: int) -> None:
+		results[name] = {"seconds": seconds, "items": items}
+
+	record("import mkrecipe", _import_time("mkrecipe", repeat), 1)
+
+	with tempfile.TemporaryDirectory() as tmpdir, _stand_ins(["big", *project_names], dependency_names):
+		tmp_path = PathPlus(tmpdir)
+
+		for count in dependencies:
+			project_dir = write_project(tmp_path / str(count), "big", synthetic_dependencies(count))
+			pyproject_file = project_dir / "pyproject.toml"
+			recipe_file = project_dir / "conda" / "meta.yaml"
+
+			config = load_toml(pyproject_file)
+			requirements = list(config["dependencies"])
+			berry = MaryBerry(project_dir)
+			runtime_requirements = berry.get_runtime_requirements()  # Also warms the caches.
+			sdist_url = berry.get_sdist_url()
+			recipe = berry._build_sdist(sdist_url, runtime_requirements)
+
+			def parse_toml() -> Dict[str, Any]:
+				# Drop the cached configuration so the file is parsed each time.
+				clear_config_cache()
+				return load_toml(pyproject_file)
+
+			def recompute_requirements() -> List[ComparableRequirement]:
+				berry.invalidate()
+				return berry.get_runtime_requirements()
+
+			stages: Dict[str, Callable[[], Any]] = {
+					"load_toml": parse_toml,
+					"filter_reqs_with_markers": lambda: list(filter_reqs_with_markers(config, [])),
+					"filter_reqs_by_py_version": lambda: filter_reqs_by_py_version(config, requirements),
+					"get_runtime_requirements": recompute_requirements,
+					"render_template": lambda: berry.render_sdist(sdist_url, runtime_requirements),
+					"emit_recipe": lambda: berry._build_sdist(sdist_url, runtime_requirements).to_yaml(),
+					"recipe_to_yaml": recipe.to_yaml,
+					"make_recipe": lambda: make_recipe(project_dir, recipe_file),
+					}
+
+			for stage, func in stages.items():
+				record(f"{stage}[{count}]", _time(func, repeat), count)
+
+		small_dependencies = synthetic_dependencies(10)
+		project_dirs = [write_project(tmp_path / "many", name, small_dependencies) for name in project_names]
+
+		for label in ("cold", "warm"):
+			if label == "cold":
+				# The per-project benchmarks above have already populated the caches.
+				_clear_caches()
+
+			start = timeit.default_timer()
+			for project_dir in project_dirs:
+				make_recipe(project_dir, project_dir / "conda" / "meta.yaml")
+			record(f"make_recipe[{projects} projects, {label} cache]", timeit.default_timer() - start, projects)
+
+	return results
+
+
+def compare(results: Result, baseline: Result, tolerance: float = 1.5) -> List[str]:
+	"""
+	Compare the results against a baseline, and return the names of the benchmarks which regressed.
+
+	:param results:
+	:param baseline:
+	:param tolerance: The factor by which a benchmark may be slower than the baseline before it is reported.
+	"""
+
+	regressions = []
+
+	for name, result in results.items():
+		if name in baseline and result["seconds"] > baseline[name]["seconds"] * tolerance:
+			regressions.append(name)
+
+	return regressions
+
+
+@click.option("--compare", "baseline_file", type=click.STRING, help="Compare against results saved with --save.")
+@click.option("--save", "results_file", type=click.STRING, help="Save the results as JSON.")
+@click.option("--tolerance", type=click.FLOAT, default=1.5, help="The permitted slowdown relative to the baseline.")
+@click.option("--repeat", type=click.INT, default=5, help="The number of times to repeat each benchmark.")
+@click.option("--projects", type=click.INT, default=1000, help="The number of projects for the throughput benchmarks.")
+@click.option(
+		"--dependencies",
+		type=click.INT,
+		multiple=True,
+		default=(100, 500),
+		help="The number of dependencies of the synthetic project. May be given multiple times.",
+		)
+@click.command()
+def main(
+		dependencies: Sequence[int],
+		projects: int,
+		repeat: int,
+		tolerance: float,
+		results_file: Optional[str],
+		baseline_file: Optional[str],
+		) -> None:
+	"""
+	Benchmark the recipe generation pipeline.
+	"""
+
+	results = run_benchmarks(dependencies, projects, repeat)
+
+	width = max(map(len, results))
+	for name, result in results.items():
+		per_second = result["items"] / result["seconds"]
+		click.echo(f"{name:<{width}}  {result['seconds'] * 1000:>10.2f} ms  {per_second:>12.0f} items/s")
+
+	if results_file:
+		PathPlus(results_file).dump_json(results, indent=2)
+
+	if baseline_file:
+		regressions = compare(results, PathPlus(baseline_file).load_json(), tolerance)
+		for name in regressions:
+			click.echo(f"Regression: {name} is more than {tolerance}x slower than the baseline.", err=True)
+		if regressions:
+			sys.exit(1)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,164 @@
+"""
+Local stand-ins for the PyPI and conda servers ``mkrecipe`` talks to.
+"""
+
+# stdlib
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+__all__ = ("StandInServer", )
+
+
+class StandInServer:
+	"""
+	A threaded HTTP server on localhost which serves static responses.
+
+	Each response is served with an ``ETag`` and honours ``If-None-Match``,
+	and ``Range`` headers are honoured unless :attr:`accept_ranges` is :py:obj:`False`.
+	Connections are kept alive between requests, and counted in :attr:`connections`.
+	"""
+
+	def __init__(self) -> None:
+		self.routes: Dict[str, Tuple[int, str, bytes]] = {}
+		self.requests: List[str] = []
+		self.connections = 0
+		self.accept_ranges = True
+
+		server = self
+
+		class Handler(BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+			disable_nagle_algorithm = True
+
+			def setup(self) -> None:
+				server.connections += 1
+				super().setup()
+
+			def do_GET(self) -> None:  # noqa: N802
+				server.requests.append(self.path)
+				status, content_type, body = server.routes.get(self.path, (404, "text/plain", b"Not Found"))
+				etag = f'"{hashlib.sha256(body).hexdigest()}"'
+
+				if status == 200 and self.headers.get("If-None-Match") == etag:
+					self.send_response(304)
+					self.end_headers()
+					return
+
+				byte_range = self.headers.get("Range", '')
+				if status == 200 and server.accept_ranges and byte_range.startswith("bytes="):
+					first, last = byte_range[6:].split('-')
+					if first:
+						start, end = int(first), min(int(last) + 1, len(body))
+					else:
+						start, end = max(len(body) - int(last), 0), len(body)
+
+					self.send_response(206)
+					self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(body)}")
+					self.send_header("Content-Length", str(end - start))
+					self.end_headers()
+					self.wfile.write(body[start:end])
+					return
+
+				self.send_response(status)
+				self.send_header("Content-Type", content_type)
+				self.send_header("Content-Length", str(len(body)))
+				self.send_header("ETag", etag)
+				self.end_headers()
+				self.wfile.write(body)
+
+			def log_message(self, *args) -> None:  # noqa: MAN002
+				pass
+
+		self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+		self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.01, ), daemon=True)
+
+	@property
+	def url(self) -> str:
+		"""
+		The base URL of the server, with a trailing slash.
+		"""
+
+		host, port = self._httpd.server_address[:2]
+		if isinstance(host, bytes):
+			host = host.decode("UTF-8")
+		return f"http://{host}:{port}/"
+
+	def add(self, path: str, body: bytes, content_type: str = "application/octet-stream", status: int = 200) -> None:
+		self.routes[path] = (status, content_type, body)
+
+	def add_json(self, path: str, data: object, content_type: str = "application/json") -> None:
+		self.add(path, json.dumps(data).encode("UTF-8"), content_type)
+
+	def add_project(
+			self,
+			name: str,
+			filenames: Iterable[str],
+			contents: Optional[Mapping[str, bytes]] = None,
+			metadata: Optional[Mapping[str, bytes]] = None,
+			) -> None:
+		"""
+		Add a :pep:`691` project page for ``name`` listing the given files.
+
+		:param contents: Mapping of filenames to their content. Defaults to the filename.
+		:param metadata: Mapping of filenames to the content of their :pep:`658` metadata files.
+		"""
+
+		files = []
+
+		for filename in filenames:
+			path = f"/packages/{filename}"
+			content = (contents or {}).get(filename, filename.encode("UTF-8"))
+			self.add(path, content)
+			file: Dict[str, Any] = {
+					"filename": filename,
+					"url": path,
+					"hashes": {"sha256": hashlib.sha256(content).hexdigest()},
+					}
+
+			if metadata and filename in metadata:
+				self.add(f"{path}.metadata", metadata[filename])
+				file["core-metadata"] = {"sha256": hashlib.sha256(metadata[filename]).hexdigest()}
+
+			files.append(file)
+
+		self.add_json(
+				f"/simple/{name}/",
+				{"meta": {"api-version": "1.0"}, "name": name, "files": files},
+				"application/vnd.pypi.simple.v1+json",
+				)
+
+	def add_channel(
+			self,
+			name: str,
+			packages: Iterable[str],
+			linux_packages: Optional[Iterable[str]] = (),
+			) -> None:
+		"""
+		Add a conda channel called ``name`` containing the given packages.
+
+		:param packages: The packages in the ``noarch`` subdirectory.
+		:param linux_packages: The packages in the ``linux-64`` subdirectory,
+			or :py:obj:`None` if the channel has no such subdirectory.
+		"""
+
+		for subdir, subdir_packages in (("noarch", packages), ("linux-64", linux_packages)):
+			if subdir_packages is None:
+				self.routes.pop(f"/conda/{name}/{subdir}/repodata.json", None)
+				continue
+
+			repodata = {
+					"packages": {},
+					"packages.conda": {f"{package}-1.0-0.conda": {"name": package} for package in subdir_packages},
+					}
+			self.add_json(f"/conda/{name}/{subdir}/repodata.json", repodata)
+
+	def __enter__(self) -> "StandInServer":
+		self._thread.start()
+		return self
+
+	def __exit__(self, *args) -> None:  # noqa: MAN002
+		self._httpd.shutdown()
+		self._httpd.server_close()
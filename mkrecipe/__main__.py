@@ -27,12 +27,13 @@ A tool to create recipes for building conda packages from distributions on PyPI.
 #
 
 # stdlib
-from typing import TYPE_CHECKING
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
 
 # 3rd party
 import click
 from consolekit import click_command
-from consolekit.options import DescribedArgument, auto_default_option
+from consolekit.options import DescribedArgument, auto_default_option, flag_option
 from consolekit.tracebacks import handle_tracebacks, traceback_option
 
 # this package
@@ -40,62 +41,381 @@ from mkrecipe import __version__
 
 if TYPE_CHECKING:
 	# 3rd party
+	from domdf_python_tools.paths import PathPlus
 	from domdf_python_tools.typing import PathLike
-	from typing_extensions import Literal
+
+	# this package
+	from mkrecipe.retry import RetryPolicy
 
 __all__ = ("main", )
 
 
+class _ArtifactTypes(click.Choice):
+	# Accepts a comma-separated list of artifact types.
+
+	def convert(self, value: Any, param: Optional[click.Parameter], ctx: Optional[click.Context]) -> Tuple[str, ...]:
+		if isinstance(value, tuple):
+			return value
+
+		artifact_types: List[str] = []
+
+		for artifact_type in str(value).split(','):
+			artifact_type = super().convert(artifact_type.strip(), param, ctx).lower()
+			if artifact_type not in artifact_types:
+				artifact_types.append(artifact_type)
+
+		return tuple(artifact_types)
+
+
 @click.version_option(__version__)
 @traceback_option()
+@auto_default_option(
+		"--serve",
+		type=click.STRING,
+		help="Run a server which creates recipes on request, listening on PORT, HOST:PORT or unix:PATH.",
+		)
+@flag_option(
+		"-w",
+		"--watch",
+		help="Keep running, and recreate the recipe whenever the project's configuration changes.",
+		)
+@flag_option(
+		"--timings",
+		help="Print the time spent in each phase of creating the recipes, and the network requests made, "
+		"to stderr as JSON.",
+		)
+@auto_default_option(
+		"--max-requests",
+		type=click.INT,
+		help="The maximum number of network requests to make. Further requests fail instead of being sent.",
+		)
+@flag_option(
+		"--refresh",
+		help="Look up everything recorded in the lockfile again, and record the results afresh.",
+		)
+@flag_option(
+		"--lock",
+		help="Record the data looked up on the network in the project's mkrecipe.lock file. "
+		"Once it exists the recipe is created from the lockfile, without accessing the network.",
+		)
+@flag_option(
+		"-i",
+		"--incremental",
+		help="Skip creating recipes whose inputs have not changed since they were last created.",
+		)
+@auto_default_option(
+		"--index-url",
+		type=click.STRING,
+		help="The URL or path of a simple index to use instead of PyPI, such as a local mirror.",
+		)
+@auto_default_option(
+		"--global-deadline",
+		type=click.FLOAT,
+		help="The maximum time in seconds to spend looking up all the projects on PyPI, including retries.",
+		)
+@auto_default_option(
+		"--deadline",
+		type=click.FLOAT,
+		help="The maximum time in seconds to spend looking up each project on PyPI, including retries.",
+		)
+@auto_default_option(
+		"-j",
+		"--jobs",
+		type=click.INT,
+		help="The number of worker processes to use in batch mode. Defaults to the number of CPUs.",
+		)
+@auto_default_option(
+		"-m",
+		"--manifest",
+		type=click.STRING,
+		help="A TOML file listing the recipes to create in batch mode.",
+		)
 @auto_default_option(
 		"-t",
 		"--type",
-		"artifact_type",
-		type=click.Choice(["sdist", "wheel"], case_sensitive=False),
-		help="The type of release artifact to build the conda package from.",
+		"artifact_types",
+		type=_ArtifactTypes(["sdist", "wheel"], case_sensitive=False),
+		help="The type of release artifact to build the conda package from. "
+		"Give both as 'sdist,wheel' to create both recipes at once.",
 		show_default=True,
 		)
 @auto_default_option("-o", "--outfile", type=click.STRING, help="The output file.", show_default=True)
 @click.argument(
 		"project",
 		type=click.STRING,
-		default='.',
-		description="The project to create the recipe for.",
+		nargs=-1,
+		description="The project(s) to create the recipe for.",
 		cls=DescribedArgument,
 		)
 @click_command()
 def main(
-		project: "PathLike" = '.',
+		project: Tuple["PathLike", ...] = (),
 		outfile: str = "conda/meta.yaml",
-		artifact_type: "Literal['sdist', 'wheel']" = "sdist",
+		artifact_types: Tuple[str, ...] = ("sdist", ),
+		manifest: Optional[str] = None,
+		jobs: Optional[int] = None,
+		deadline: Optional[float] = None,
+		global_deadline: Optional[float] = None,
+		index_url: Optional[str] = None,
+		incremental: bool = False,
+		lock: bool = False,
+		refresh: bool = False,
+		max_requests: Optional[int] = None,
+		timings: bool = False,
+		watch: bool = False,
+		serve: Optional[str] = None,
 		show_traceback: bool = False,
 		) -> None:
 	"""
 	Make a conda recipe for the given project.
+
+	If more than one project is given, or a manifest is used,
+	the recipes are created in parallel and the output file is relative to each project.
+
+	If more than one artifact type is given, each recipe is written to a subdirectory
+	of the output file's directory named after the artifact type, such as ``conda/wheel/meta.yaml``.
+
+	With ``--watch`` the recipe is recreated each time the project's ``pyproject.toml``
+	or ``requirements.txt`` file changes, until interrupted.
+	With ``--serve`` recipes are instead created on request (see :mod:`mkrecipe.server`).
+
+	With ``--timings`` the wall and CPU time spent in each phase is printed to stderr as JSON,
+	along with the number of network requests made to PyPI and the conda channels.
+	In batch mode the median and 95th percentile times of each phase across the recipes are included.
+
+	With ``--max-requests`` no more than the given number of network requests are made.
+	In batch mode the recipes are then created in threads rather than processes,
+	so the limit applies to the whole batch.
+
+	With ``--lock`` the artifact URLs and validated requirements are recorded in the project's
+	``mkrecipe.lock`` file. Whenever that file exists the recipe is created from it, only accessing the network
+	for anything not recorded in it. With ``--refresh`` everything is looked up again and recorded afresh.
 	"""
 
+	# stdlib
+	import os
+	import time
+
 	# 3rd party
 	from domdf_python_tools.paths import PathPlus
 	from pyproject_parser.cli import ConfigTracebackHandler
 
 	# this package
-	from mkrecipe import MaryBerry
+	from mkrecipe import make_recipes
+	from mkrecipe.batch import _get_recipe_files
+	from mkrecipe.network import get_stats
+	from mkrecipe.retry import RetryPolicy
+	from mkrecipe.timings import Timings
+
+	if index_url is not None:
+		# Set in the environment so it is inherited by the worker processes in batch mode.
+		os.environ["MKRECIPE_INDEX_URL"] = index_url
 
 	with handle_tracebacks(show_traceback, ConfigTracebackHandler):
-		recipe_file = PathPlus(outfile)
-		recipe_file.parent.maybe_make(parents=True)
-
-		if artifact_type == "sdist":
-			recipe = MaryBerry(project).make()
-		elif artifact_type == "wheel":
-			recipe = MaryBerry(project).make_for_wheel()
-		else:  # pragma: no cover
-			# Click should handle this case for us
-			raise click.BadOptionUsage("type", f"Unknown value for '--type': {artifact_type}")
-
-		recipe_file.write_clean(recipe)
-		click.echo(f"Recipe written to {recipe_file.as_posix()!r}")
+		policy_kwargs: Dict[str, Any] = {}
+		if deadline is not None:
+			policy_kwargs["deadline"] = deadline
+		if global_deadline is not None:
+			policy_kwargs["global_deadline"] = time.time() + global_deadline
+		retry_policy = RetryPolicy.from_environment(**policy_kwargs)
+
+		if timings and (serve is not None or watch):
+			raise click.UsageError("--timings cannot be used with --serve or --watch.")
+
+		if max_requests is not None:
+			if serve is not None or watch:
+				raise click.UsageError("--max-requests cannot be used with --serve or --watch.")
+			get_stats().max_requests = max_requests
+
+		if (lock or refresh) and (serve is not None or watch):
+			raise click.UsageError("--lock and --refresh cannot be used with --serve or --watch.")
+
+		# Otherwise the lockfile is used if it exists.
+		use_lock = True if lock else None
+
+		if serve is not None:
+			if project or manifest is not None or watch:
+				raise click.UsageError("--serve cannot be used with projects, --manifest or --watch.")
+			_serve(serve, retry_policy)
+			return
+
+		if manifest is not None or len(project) > 1:
+			if watch:
+				raise click.UsageError("--watch cannot be used with more than one project.")
+			_batch(
+					project,
+					outfile,
+					artifact_types,
+					manifest,
+					jobs,
+					retry_policy,
+					incremental,
+					timings,
+					threads=max_requests is not None,
+					lock=use_lock,
+					refresh=refresh,
+					)
+			return
+
+		if watch:
+			if len(artifact_types) > 1:
+				raise click.UsageError("--watch cannot be used with more than one artifact type.")
+			_watch(project[0] if project else '.', PathPlus(outfile), artifact_types[0], retry_policy)
+			return
+
+		project_dir = PathPlus(project[0] if project else '.')
+		recipe_files = _get_recipe_files(outfile, artifact_types)
+		recipe_timings = Timings()
+		written = make_recipes(
+				project_dir,
+				recipe_files,
+				retry_policy,
+				incremental,
+				recipe_timings,
+				lock=use_lock,
+				refresh=refresh,
+				)
+
+		for artifact_type, recipe_file in recipe_files.items():
+			_report(recipe_file, written[artifact_type])
+
+		if timings:
+			_report_timings({
+					"project": project_dir.as_posix(),
+					"phases": recipe_timings.as_dict(),
+					"network": get_stats().as_dict(),
+					})
+
+
+def _report(outfile: str, written: bool) -> None:
+	if written:
+		click.echo(f"Recipe written to {outfile!r}")
+	else:
+		click.echo(f"Recipe {outfile!r} is up to date")
+
+
+def _report_timings(data: Dict[str, Any]) -> None:
+	# stdlib
+	import json
+
+	click.echo(json.dumps(data, indent=2), err=True)
+
+
+def _serve(address: str, retry_policy: "RetryPolicy") -> None:
+
+	# this package
+	from mkrecipe.server import make_server
+
+	try:
+		server = make_server(address, retry_policy)
+	except ValueError as e:
+		raise click.BadParameter(str(e), param_hint="'--serve'")
+
+	with server:
+		if isinstance(server.server_address, str):
+			location = f"unix:{server.server_address}"
+		else:
+			host, port = cast(Tuple[str, int], server.server_address)[:2]
+			location = f"http://{host}:{port}/"
+
+		click.echo(f"Serving recipes on {location}. Press Ctrl+C to stop.")
+
+		try:
+			server.serve_forever()
+		except KeyboardInterrupt:
+			pass
+
+
+def _watch(project_dir: "PathLike", recipe_file: "PathPlus", artifact_type: str, retry_policy: "RetryPolicy") -> None:
+
+	# 3rd party
+	from domdf_python_tools.paths import PathPlus
+
+	# this package
+	from mkrecipe.watch import watch
+
+	click.echo(f"Watching {PathPlus(project_dir).as_posix()!r} for changes. Press Ctrl+C to stop.")
+
+	try:
+		for result in watch(project_dir, recipe_file, artifact_type, retry_policy):
+			if result.error is not None:
+				click.echo(f"Failed to create recipe: {result.error}", err=True)
+			elif result.written:
+				click.echo(f"Recipe written to {recipe_file.as_posix()!r} in {result.elapsed * 1000:.0f}ms")
+			else:
+				click.echo(f"Recipe {recipe_file.as_posix()!r} is up to date")
+	except KeyboardInterrupt:
+		pass
+
+
+def _batch(
+		projects: Tuple["PathLike", ...],
+		outfile: str,
+		artifact_types: Tuple[str, ...],
+		manifest: Optional[str],
+		jobs: Optional[int],
+		retry_policy: "RetryPolicy",
+		incremental: bool,
+		timings: bool,
+		threads: bool = False,
+		lock: Optional[bool] = None,
+		refresh: bool = False,
+		) -> None:
+
+	# 3rd party
+	from domdf_python_tools.paths import PathPlus
+
+	# this package
+	from mkrecipe.batch import BatchJob, _get_recipe_files, load_manifest, run_batch
+	from mkrecipe.network import get_stats, total
+	from mkrecipe.timings import summarise
+
+	batch_jobs = []
+
+	if manifest is not None:
+		batch_jobs.extend(load_manifest(manifest))
+
+	for project_dir in projects:
+		recipe_files = _get_recipe_files(PathPlus(project_dir) / outfile, artifact_types)
+		batch_jobs.append(BatchJob(PathPlus(project_dir).as_posix(), tuple(recipe_files), tuple(recipe_files.values())))
+
+	failures = 0
+	job_timings = []
+
+	results = run_batch(
+			batch_jobs,
+			max_workers=jobs,
+			retry_policy=retry_policy,
+			incremental=incremental,
+			threads=threads,
+			lock=lock,
+			refresh=refresh,
+			)
+	job_network = []
+
+	for result in results:
+		if result.success:
+			for artifact_type, recipe_file in result.job.recipe_files.items():
+				_report(recipe_file, result.written[artifact_type])  # type: ignore[index]
+		else:
+			failures += len(result.job.artifact_types)
+			click.echo(f"Failed to create recipe for {result.job.project!r}: {result.error}", err=True)
+
+		job_timings.append({**result.job._asdict(), "success": result.success, "phases": result.timings or {}})
+		job_network.append(result.network or {})
+
+	if timings:
+		# The requests made in worker processes are recorded in each result, and those made in threads in this process.
+		_report_timings({
+				"jobs": job_timings,
+				"summary": summarise(job["phases"] for job in job_timings),
+				"network": get_stats().as_dict() if threads else total(job_network),
+				})
+
+	if failures:
+		recipe_count = sum(len(job.artifact_types) for job in batch_jobs)
+		click.echo(f"{failures} of {recipe_count} recipes could not be created.", err=True)
+		sys.exit(1)
 
 
 if __name__ == "__main__":
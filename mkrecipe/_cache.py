@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+#
+#  _cache.py
+"""
+Helpers for ``mkrecipe``'s on-disk caches.
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+# 3rd party
+import platformdirs
+from domdf_python_tools.paths import PathPlus
+
+__all__ = ("get_cache_dir", "get_cache_ttl", "read_json", "write_bytes", "write_json")
+
+
+def get_cache_dir(*parts: str) -> PathPlus:
+	"""
+	Returns the directory in which to store cached data.
+
+	This is the user's cache directory unless overridden by the :envvar:`MKRECIPE_CACHE_DIR` environment variable.
+
+	:param parts: Subdirectories of the cache directory.
+	"""
+
+	base = os.environ.get("MKRECIPE_CACHE_DIR") or platformdirs.user_cache_dir(
+			appname="mkrecipe",
+			appauthor="domdfcoding",
+			)
+
+	return PathPlus(base, *parts)
+
+
+def get_cache_ttl() -> int:
+	"""
+	Returns the time in seconds for which cached data is used without being revalidated.
+
+	This is configured with the :envvar:`MKRECIPE_CACHE_TTL` environment variable, and defaults to one day.
+	"""
+
+	return int(os.environ.get("MKRECIPE_CACHE_TTL", 86400))
+
+
+def read_json(filename: PathPlus) -> Optional[Dict[str, Any]]:
+	"""
+	Read a cache entry, returning :py:obj:`None` if it does not exist or cannot be read.
+
+	:param filename:
+	"""
+
+	try:
+		data = json.loads(filename.read_text())
+	except (OSError, ValueError):
+		return None
+
+	if not isinstance(data, dict):
+		return None
+
+	return data
+
+
+def write_json(filename: PathPlus, data: Dict[str, Any]) -> None:
+	"""
+	Atomically write a cache entry.
+
+	:param filename:
+	:param data:
+	"""
+
+	write_bytes(filename, json.dumps(data).encode("UTF-8"))
+
+
+def write_bytes(filename: PathPlus, data: bytes) -> None:
+	"""
+	Atomically write a binary cache entry.
+
+	The data is written to a temporary file which then replaces ``filename``,
+	so concurrent processes and threads never see a partially written entry.
+
+	:param filename:
+	:param data:
+	"""
+
+	filename.parent.maybe_make(parents=True)
+
+	fd, tmp_name = tempfile.mkstemp(dir=filename.parent, prefix=f".{filename.name}.", suffix=".tmp")
+
+	try:
+		with os.fdopen(fd, "wb") as fp:
+			fp.write(data)
+		os.replace(tmp_name, filename)
+	except BaseException:
+		os.unlink(tmp_name)
+		raise
@@ -0,0 +1,1049 @@
+#!/usr/bin/env python3
+#
+#  _core.py
+"""
+The implementation of :mod:`mkrecipe`'s public API.
+
+This is imported on first use by :mod:`mkrecipe`, so the command line interface
+does not pay for importing the dependencies until a recipe is actually made.
+"""
+#
+#  Copyright © 2020-2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from itertools import chain
+from typing import (
+		TYPE_CHECKING,
+		Any,
+		Awaitable,
+		Callable,
+		Dict,
+		Iterable,
+		Iterator,
+		List,
+		Mapping,
+		Optional,
+		Set,
+		Tuple,
+		TypeVar,
+		Union,
+		)
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus, clean_writer
+from domdf_python_tools.typing import PathLike
+from packaging.requirements import InvalidRequirement
+from packaging.version import Version
+from shippinglabel import normalize
+from shippinglabel.requirements import ComparableRequirement, combine_requirements
+from shippinglabel_conda import make_conda_description, prepare_requirements
+from whey.config.whey import license_lookup
+
+# this package
+from mkrecipe._markers import marker_in_python_range
+from mkrecipe.conda import validate_requirements
+from mkrecipe.config import load_toml
+from mkrecipe.incremental import is_up_to_date, write_manifest
+from mkrecipe.lock import Lockfile, get_lock_path
+from mkrecipe.metadata import expand_extras
+from mkrecipe.network import Session
+from mkrecipe.pypi import ReleaseFile, ReleaseNotFound, get_sdist, get_sha256, get_wheel_url
+from mkrecipe.recipe import About, Build, Extra, Package, Recipe, Requirements, Source, Test
+from mkrecipe.resolver import Resolver, get_resolver
+from mkrecipe.retry import RetryPolicy
+from mkrecipe.template import get_template
+from mkrecipe.timings import Timings
+
+if TYPE_CHECKING:
+	# 3rd party
+	from typing_extensions import Literal
+
+__all__ = ("MaryBerry", "make_recipe", "make_recipes", "filter_reqs_with_markers", "filter_reqs_by_py_version")
+
+_artifact_types = ("sdist", "wheel")
+_T = TypeVar("_T")
+
+
+class MaryBerry:
+	# Get it?
+	"""
+	Builder of Conda ``meta.yaml`` recipes.
+
+	:param project_dir: The project directory.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+		If not given the policy is configured from environment variables.
+		Its deadline applies to all the lookups for the project.
+	:param timings: The object to record the time spent in each phase of creating the recipe in.
+		If not given a new :class:`~mkrecipe.timings.Timings` object is created.
+	:param resolver: The resolver to perform network lookups with.
+		Every request is made with its :attr:`~mkrecipe.resolver.Resolver.session`.
+		If not given the process-wide resolver from :func:`~mkrecipe.resolver.get_resolver` is used,
+		so connections are reused between projects.
+	:param lockfile: The lockfile to take the data which would be looked up on the network from where possible,
+		and to record the data which is looked up in. See :mod:`mkrecipe.lock`.
+
+	The runtime requirements, maintainers, URLs and conda description are computed on first use
+	and cached until :meth:`~.invalidate` is called or :attr:`~.config` is replaced.
+
+	.. versionchanged:: 0.10.0
+
+		* Added the ``retry_policy``, ``timings``, ``resolver`` and ``lockfile`` arguments.
+		* Derived data is cached on the instance.
+
+	.. autosummary-widths:: 6/16
+	"""
+
+	def __init__(
+			self,
+			project_dir: PathLike,
+			retry_policy: Optional[RetryPolicy] = None,
+			timings: Optional[Timings] = None,
+			resolver: Optional[Resolver] = None,
+			lockfile: Optional[Lockfile] = None,
+			) -> None:
+		self.project_dir = PathPlus(project_dir)
+		self.retry_policy = (retry_policy or RetryPolicy.from_environment()).for_project()
+
+		#: The resolver used to perform network lookups.
+		self.resolver = get_resolver() if resolver is None else resolver
+
+		#: The time spent in each phase of creating the recipe. See :mod:`mkrecipe.timings`.
+		self.timings = Timings() if timings is None else timings
+
+		#: The lockfile used for the data which would otherwise be looked up on the network, if any.
+		#: It is not saved by the :class:`~.MaryBerry`.
+		self.lockfile = lockfile
+
+		self._memo: Dict[str, Any] = {}
+
+		with self.timings.phase("load_config"):
+			self.config = self.load_config()
+
+	@property
+	def config(self) -> Dict[str, Any]:
+		"""
+		The ``mkrecipe`` configuration.
+
+		Setting this attribute (for example to the result of :meth:`~.load_config`) calls :meth:`~.invalidate`.
+		"""
+
+		return self._config
+
+	@config.setter
+	def config(self, config: Dict[str, Any]) -> None:
+		self._config = config
+		self.invalidate()
+
+	def load_config(self) -> Dict[str, Any]:
+		"""
+		Load the ``mkrecipe`` configuration.
+		"""
+
+		return load_toml(self.project_dir / "pyproject.toml")
+
+	def invalidate(self) -> None:
+		"""
+		Discard the cached runtime requirements, maintainers, URLs and conda description,
+		so they are computed again when next required.
+
+		Call this after modifying :attr:`~.config` in place,
+		or to validate the requirements against the conda channels again.
+
+		.. versionadded:: 0.10.0
+		"""  # noqa: D400
+
+		self._memo.clear()
+
+	def _memoized(self, key: str, func: Callable[[], _T]) -> _T:
+		if key not in self._memo:
+			self._memo[key] = func()
+		return self._memo[key]
+
+	def make(self) -> str:
+		"""
+		Make the recipe.
+
+		The source distribution is looked up on PyPI while the requirements are validated.
+
+		:returns: The ``meta.yaml`` recipe as a string.
+
+		.. versionchanged:: 0.10.0
+
+			* The lookup and validation are performed concurrently.
+			* The recipe includes the SHA256 digest of the source distribution if the :conf:`sha256` option is enabled.
+		"""
+
+		(sdist_url, sdist_sha256), runtime_requirements = self._resolve(self.get_sdist)
+
+		with self.timings.phase("render"):
+			return self.render_sdist(sdist_url, runtime_requirements, sdist_sha256)
+
+		# TODO: Entry points
+		#  entry_points:
+		#    - {{ import_name }} = {{ import_name }}:main
+		#  skip_compile_pyc:
+		#    - "*/templates/*.py"          # These should not (and cannot) be compiled
+
+	async def amake(self) -> str:
+		"""
+		Make the recipe, looking up the source distribution and validating the requirements concurrently.
+
+		.. versionadded:: 0.10.0
+
+		:returns: The ``meta.yaml`` recipe as a string.
+		"""
+
+		(sdist_url, sdist_sha256), runtime_requirements = await asyncio.gather(
+				self.aget_sdist(),
+				self.aget_runtime_requirements(),
+				)
+
+		with self.timings.phase("render"):
+			return self.render_sdist(sdist_url, runtime_requirements, sdist_sha256)
+
+	def _resolve(self, lookup: Callable[[], _T]) -> Tuple[_T, List[ComparableRequirement]]:
+		# Looks up the release artifact in a worker thread while the requirements are validated in this one,
+		# as neither depends on the other.
+
+		with ThreadPoolExecutor(1, thread_name_prefix="mkrecipe") as executor:
+			future = executor.submit(lookup)
+
+			try:
+				runtime_requirements = self.get_runtime_requirements()
+			finally:
+				# As when the lookup was performed first, its errors take precedence.
+				found = future.result()
+
+		return found, runtime_requirements
+
+	def render_sdist(
+			self,
+			sdist_url: str,
+			runtime_requirements: List[ComparableRequirement],
+			sdist_sha256: Optional[str] = None,
+			) -> str:
+		"""
+		Render the recipe for creating a conda package from the source distribution.
+
+		This is the final step of :meth:`~.make`, and can be used to recreate the recipe
+		without looking up the source distribution and requirements again.
+
+		.. versionadded:: 0.10.0
+
+		:param sdist_url: The URL of the source distribution, as returned by :meth:`~.get_sdist`.
+		:param runtime_requirements: The requirements, as returned by :meth:`~.get_runtime_requirements`.
+		:param sdist_sha256: The SHA256 digest of the source distribution, as returned by :meth:`~.get_sdist`.
+			If :py:obj:`None` the digest is omitted from the recipe.
+
+		:returns: The ``meta.yaml`` recipe as a string.
+		"""
+
+		host_requirements = sorted(
+				set(combine_requirements(
+						runtime_requirements,
+						*self.config["requires"],
+						normalize_func=str,
+						)),
+				)
+
+		project_license = license_lookup.get(self.config["license-key"], self.config["license-key"])
+
+		config = {k.replace('-', '_'): v for k, v in self.config.items()}
+
+		return get_template().render(
+				sdist_url=sdist_url,
+				sdist_sha256=sdist_sha256,
+				host_requirements=host_requirements,
+				runtime_requirements=runtime_requirements,
+				conda_full_description=self.make_conda_description(),
+				url_lines=list(self.get_urls()),
+				all_maintainers=sorted(self.get_maintainers()),
+				project_license=project_license,
+				**config,
+				)
+
+	def make_for_wheel(self) -> str:
+		"""
+		Make the recipe for creating a conda package from a wheel.
+
+		The wheel is looked up on PyPI while the requirements are validated.
+
+		.. versionadded:: 0.3.0
+
+		:returns: The ``meta.yaml`` recipe as a string.
+
+		.. versionchanged:: 0.10.0  The lookup and validation are performed concurrently.
+
+		.. latex:clearpage::
+		"""
+
+		wheel_url, runtime_requirements = self._resolve(self.get_wheel_url)
+
+		with self.timings.phase("render"):
+			return self.render_wheel(wheel_url, runtime_requirements)
+
+	async def amake_for_wheel(self) -> str:
+		"""
+		Make the recipe for creating a conda package from a wheel,
+		looking up the wheel and validating the requirements concurrently.
+
+		.. versionadded:: 0.10.0
+
+		:returns: The ``meta.yaml`` recipe as a string.
+		"""  # noqa: D400
+
+		wheel_url, runtime_requirements = await asyncio.gather(
+				self.aget_wheel_url(),
+				self.aget_runtime_requirements(),
+				)
+
+		with self.timings.phase("render"):
+			return self.render_wheel(wheel_url, runtime_requirements)
+
+	def render_wheel(self, wheel_url: str, runtime_requirements: List[ComparableRequirement]) -> str:
+		"""
+		Render the recipe for creating a conda package from a wheel.
+
+		This is the final step of :meth:`~.make_for_wheel`, and can be used to recreate the recipe
+		without looking up the wheel and requirements again.
+
+		.. versionadded:: 0.10.0
+
+		:param wheel_url: The URL of the wheel, as returned by :meth:`~.get_wheel_url`.
+		:param runtime_requirements: The requirements, as returned by :meth:`~.get_runtime_requirements`.
+
+		:returns: The ``meta.yaml`` recipe as a string.
+		"""
+
+		host_requirements = sorted(
+				set(combine_requirements(
+						runtime_requirements,
+						"setuptools",
+						"wheel",
+						normalize_func=str,
+						)),
+				)
+
+		project_license = license_lookup.get(self.config["license-key"], self.config["license-key"])
+
+		config = {k.replace('-', '_'): v for k, v in self.config.items() if k != "requires"}
+
+		return get_template().render(
+				wheel_url=wheel_url,
+				host_requirements=host_requirements,
+				runtime_requirements=runtime_requirements,
+				conda_full_description=self.make_conda_description(),
+				url_lines=list(self.get_urls()),
+				all_maintainers=sorted(self.get_maintainers()),
+				project_license=project_license,
+				requires=["setuptools", "wheel"],
+				wheel=True,
+				**config,
+				)
+
+	def make_multiple(self, artifact_types: Iterable[str] = _artifact_types) -> Dict[str, str]:
+		"""
+		Make recipes for several types of release artifact at once.
+
+		The requirements are resolved once and shared between the recipes,
+		and the URLs of the artifacts are looked up concurrently.
+
+		.. versionadded:: 0.10.0
+
+		:param artifact_types: The types of release artifact to make recipes for.
+
+		:returns: A mapping of artifact types to ``meta.yaml`` recipes.
+		"""
+
+		artifact_types = _check_artifact_types(artifact_types)
+		lookups = {"sdist": self.get_sdist, "wheel": self.get_wheel_url}
+
+		with ThreadPoolExecutor(len(artifact_types), thread_name_prefix="mkrecipe") as executor:
+			futures = {artifact_type: executor.submit(lookups[artifact_type]) for artifact_type in artifact_types}
+			runtime_requirements = self.get_runtime_requirements()
+			found = {artifact_type: future.result() for artifact_type, future in futures.items()}
+
+		return self._render_multiple(found, runtime_requirements)
+
+	async def amake_multiple(self, artifact_types: Iterable[str] = _artifact_types) -> Dict[str, str]:
+		"""
+		Make recipes for several types of release artifact at once,
+		looking up the artifacts and validating the requirements concurrently.
+
+		.. versionadded:: 0.10.0
+
+		:param artifact_types: The types of release artifact to make recipes for.
+
+		:returns: A mapping of artifact types to ``meta.yaml`` recipes.
+		"""  # noqa: D400
+
+		artifact_types = _check_artifact_types(artifact_types)
+		lookups = {"sdist": self.aget_sdist, "wheel": self.aget_wheel_url}
+
+		runtime_requirements, *found = await asyncio.gather(
+				self.aget_runtime_requirements(),
+				*(lookups[artifact_type]() for artifact_type in artifact_types),
+				)
+
+		return self._render_multiple(dict(zip(artifact_types, found)), runtime_requirements)
+
+	def _render_multiple(
+			self,
+			found: Dict[str, Any],
+			runtime_requirements: List[ComparableRequirement],
+			) -> Dict[str, str]:
+		# ``found`` maps "sdist" to the URL and digest of the source distribution, and "wheel" to the wheel's URL.
+
+		recipes = {}
+
+		with self.timings.phase("render"):
+			for artifact_type, artifact in found.items():
+				if artifact_type == "sdist":
+					recipes[artifact_type] = self.render_sdist(artifact[0], runtime_requirements, artifact[1])
+				else:
+					recipes[artifact_type] = self.render_wheel(artifact, runtime_requirements)
+
+		return recipes
+
+	def get_recipe(self) -> Recipe:
+		"""
+		Make the recipe as a :class:`~mkrecipe.recipe.Recipe` object, which can be modified before being serialised.
+
+		.. versionadded:: 0.10.0
+		"""
+
+		(sdist_url, sdist_sha256), runtime_requirements = self._resolve(self.get_sdist)
+
+		with self.timings.phase("render"):
+			return self._build_sdist(sdist_url, runtime_requirements, sdist_sha256)
+
+	def get_recipe_for_wheel(self) -> Recipe:
+		"""
+		Make the recipe for creating a conda package from a wheel as a :class:`~mkrecipe.recipe.Recipe` object.
+
+		.. versionadded:: 0.10.0
+		"""
+
+		wheel_url, runtime_requirements = self._resolve(self.get_wheel_url)
+
+		with self.timings.phase("render"):
+			return self._build_wheel(wheel_url, runtime_requirements)
+
+	def _build_sdist(
+			self,
+			sdist_url: str,
+			runtime_requirements: List[ComparableRequirement],
+			sdist_sha256: Optional[str] = None,
+			) -> Recipe:
+		return self._build_recipe(
+				Source(sdist_url, sdist_sha256),
+				Build("{{ PYTHON }} -m pip install . -vv  --no-build-isolation --no-deps"),
+				self.config["requires"],
+				runtime_requirements,
+				)
+
+	def _build_wheel(self, wheel_url: str, runtime_requirements: List[ComparableRequirement]) -> Recipe:
+		return self._build_recipe(
+				None,
+				Build(f"{{{{ PYTHON }}}} -m pip install {wheel_url} -vv --no-deps"),
+				["setuptools", "wheel"],
+				runtime_requirements,
+				)
+
+	def _build_recipe(
+			self,
+			source: Optional[Source],
+			build: Build,
+			requires: Iterable[Union[str, ComparableRequirement]],
+			runtime_requirements: List[ComparableRequirement],
+			) -> Recipe:
+		# Builds the same recipe as the template does.
+
+		requires = list(requires)
+		host_requirements = sorted(set(combine_requirements(runtime_requirements, *requires, normalize_func=str)))
+		python = f"python{self.config['requires-python']}"
+
+		return Recipe(
+				package=Package(self.config["name"].lower(), str(self.config["version"])),
+				source=source,
+				build=build,
+				requirements=Requirements(
+						build=["python", *map(str, requires)],
+						host=["pip", python, *map(str, host_requirements)],
+						run=[python, *map(str, runtime_requirements)],
+						),
+				test=Test([self.config["package"]]),
+				about=About(
+						summary=str(self.config["description"]),
+						description=self.make_conda_description(),
+						license=license_lookup.get(self.config["license-key"], self.config["license-key"]) or None,
+						urls=dict(self._get_url_entries()),
+						),
+				extra=Extra(sorted(self._get_maintainer_names(), key=repr)),
+				)
+
+	def get_sdist_url(self) -> str:
+		"""
+		Returns the URL of the project's source distribution on PyPI.
+		"""
+
+		return self.get_sdist()[0]
+
+	async def aget_sdist_url(self) -> str:
+		"""
+		Returns the URL of the project's source distribution on PyPI.
+
+		.. versionadded:: 0.10.0
+		"""
+
+		return (await self.aget_sdist())[0]
+
+	def get_sdist(self) -> Tuple[str, Optional[str]]:
+		"""
+		Returns the URL of the project's source distribution on PyPI,
+		and its SHA256 digest if the :conf:`sha256` option is enabled (otherwise :py:obj:`None`).
+
+		.. versionadded:: 0.10.0
+		"""  # noqa: D400
+
+		locked = self._get_locked("sdist")
+		if locked is not None:
+			return locked["url"], locked.get("sha256")
+
+		file = self._try_again(get_sdist)
+		sdist_url, sdist_sha256 = self._check_sdist_url(file.url), self._get_sha256(file)
+		return self._lock_artifact("sdist", sdist_url, sdist_sha256), sdist_sha256
+
+	async def aget_sdist(self) -> Tuple[str, Optional[str]]:
+		"""
+		Returns the URL of the project's source distribution on PyPI,
+		and its SHA256 digest if the :conf:`sha256` option is enabled (otherwise :py:obj:`None`).
+
+		.. versionadded:: 0.10.0
+		"""  # noqa: D400
+
+		locked = self._get_locked("sdist")
+		if locked is not None:
+			return locked["url"], locked.get("sha256")
+
+		file = await self._atry_again(self.resolver.get_sdist)
+		sdist_url, sdist_sha256 = self._check_sdist_url(file.url), await self.resolver.run(self._get_sha256, file)
+		return self._lock_artifact("sdist", sdist_url, sdist_sha256), sdist_sha256
+
+	def _get_sha256(self, file: ReleaseFile) -> Optional[str]:
+		if not self.config["sha256"]:
+			return None
+
+		# The digest is only computed locally if the index doesn't publish it.
+		with self.timings.phase("sha256"):
+			return self.retry_policy.call(get_sha256, file, self.resolver.session)
+
+	def _check_sdist_url(self, sdist_url: str) -> str:
+		if not sdist_url.endswith(".tar.gz"):
+			msg = f"Cannot find source distribution for {self.config['name']} version {self.config['version']}."
+			raise InvalidRequirement(msg)
+
+		return sdist_url
+
+	def get_wheel_url(self) -> str:
+		"""
+		Returns the URL of the project's binary wheel on PyPI.
+
+		.. versionadded:: 0.3.0
+		"""
+
+		locked = self._get_locked("wheel")
+		if locked is not None:
+			return locked["url"]
+
+		return self._lock_artifact("wheel", self._check_wheel_url(self._try_again(get_wheel_url)))
+
+	async def aget_wheel_url(self) -> str:
+		"""
+		Returns the URL of the project's binary wheel on PyPI.
+
+		.. versionadded:: 0.10.0
+		"""
+
+		locked = self._get_locked("wheel")
+		if locked is not None:
+			return locked["url"]
+
+		wheel_url = self._check_wheel_url(await self._atry_again(self.resolver.get_wheel_url))
+		return self._lock_artifact("wheel", wheel_url)
+
+	def _check_wheel_url(self, wheel_url: str) -> str:
+		if not wheel_url.endswith(".whl"):
+			msg = f"Cannot find wheel for {self.config['name']} version {self.config['version']}."
+			raise InvalidRequirement(msg)
+
+		return wheel_url
+
+	def _get_locked(self, artifact_type: str) -> Optional[Dict[str, Any]]:
+		# Returns the lockfile's entry for the release artifact, if it can be used.
+
+		if self.lockfile is None:
+			return None
+
+		locked = self.lockfile.get_artifact(artifact_type, self.config["name"], self.config["version"])
+
+		if locked is None or artifact_type != "sdist":
+			return locked
+		elif not self.config["sha256"]:
+			return {**locked, "sha256": None}
+		elif locked.get("sha256"):
+			return locked
+		else:
+			return None
+
+	def _lock_artifact(self, artifact_type: str, url: str, sha256: Optional[str] = None) -> str:
+		if self.lockfile is not None:
+			self.lockfile.set_artifact(artifact_type, self.config["name"], self.config["version"], url, sha256)
+
+		return url
+
+	def _try_again(self, func: Callable[[str, Union[str, int, Version], Session], _T]) -> _T:
+		name, version = self.config["name"], self.config["version"]
+
+		try:
+			with self.timings.phase("pypi_lookup"):
+				return self.retry_policy.call(func, name, version, self.resolver.session)
+		except ReleaseNotFound as e:
+			raise InvalidRequirement(f"Cannot find {name} version {version} on PyPI.") from e
+
+	async def _atry_again(self, func: Callable[[str, Union[str, int, Version]], Awaitable[_T]]) -> _T:
+		name, version = self.config["name"], self.config["version"]
+
+		try:
+			with self.timings.phase("pypi_lookup"):
+				return await self.retry_policy.acall(func, name, version)
+		except ReleaseNotFound as e:
+			raise InvalidRequirement(f"Cannot find {name} version {version} on PyPI.") from e
+
+	def get_runtime_requirements(self) -> List[ComparableRequirement]:
+		"""
+		Returns a list of the project's runtime requirements.
+
+		.. versionchanged:: 0.10.0
+
+			* The requirements are cached until :meth:`~.invalidate` is called.
+			* The requirements are taken from the :attr:`~.lockfile` if they are recorded in it.
+		"""
+
+		def resolve() -> List[ComparableRequirement]:
+			locked = self._get_locked_requirements()
+			if locked is not None:
+				return locked
+
+			with self.timings.phase("prepare_requirements"):
+				requirements = list(self._get_requirements())
+				unvalidated = list(map(str, requirements))
+
+			with self.timings.phase("validate_requirements"):
+				return self._lock_requirements(
+						unvalidated,
+						validate_requirements(requirements, self.config["conda-channels"], self.resolver.session),
+						)
+
+		return list(self._memoized("runtime-requirements", resolve))
+
+	async def aget_runtime_requirements(self) -> List[ComparableRequirement]:
+		"""
+		Returns a list of the project's runtime requirements.
+
+		The conda channels are indexed concurrently.
+		The requirements are cached until :meth:`~.invalidate` is called,
+		and are taken from the :attr:`~.lockfile` if they are recorded in it.
+
+		.. versionadded:: 0.10.0
+		"""
+
+		if "runtime-requirements" not in self._memo:
+			locked = self._get_locked_requirements()
+
+			if locked is not None:
+				self._memo["runtime-requirements"] = locked
+				return list(locked)
+
+			# Expanding the extras of the dependencies may require network lookups.
+			with self.timings.phase("prepare_requirements"):
+				requirements = await self.resolver.run(lambda: list(self._get_requirements()))
+				unvalidated = list(map(str, requirements))
+
+			with self.timings.phase("validate_requirements"):
+				self._memo["runtime-requirements"] = self._lock_requirements(
+						unvalidated,
+						await self.resolver.validate_requirements(requirements, self.config["conda-channels"]),
+						)
+
+		return list(self._memo["runtime-requirements"])
+
+	def _get_requirements(self) -> Iterable[ComparableRequirement]:
+		# Returns the requirements which must be validated against the conda channels.
+
+		extras: List[Union[str, ComparableRequirement]] = []
+
+		if self.config["extras"] == "all":
+			extras.extend(chain.from_iterable(self.config["optional-dependencies"].values()))
+		elif self.config["extras"] != "none":
+			for extra in self.config["extras"]:
+				extras.extend(list(self.config["optional-dependencies"].get(extra, ())))
+
+		extra_requirements = [ComparableRequirement(str(r)) for r in extras]
+
+		all_requirements: List[ComparableRequirement] = list(
+				filter_reqs_with_markers(self.config, chain(self.config["dependencies"], extra_requirements)),
+				)
+		all_requirements = filter_reqs_by_py_version(self.config, all_requirements)
+
+		if self.config["expand-extras"]:
+			# The requirements of the dependencies' extras are filtered in the same way.
+			expanded = expand_extras(all_requirements, session=self.resolver.session)
+			self._memo["extras-projects"] = sorted({
+					normalize(requirement.name)
+					for requirement in chain(all_requirements, expanded)
+					if requirement.extras and not requirement.url
+					})
+			all_requirements.extend(filter_reqs_with_markers(self.config, expanded))
+			all_requirements = filter_reqs_by_py_version(self.config, all_requirements)
+
+		return prepare_requirements(all_requirements)
+
+	def _get_extras_projects(self) -> List[str]:
+		# Returns the normalized names of the projects whose metadata the extras were expanded from.
+		return list(self._memo.get("extras-projects", ()))
+
+	def _get_locked_requirements(self) -> Optional[List[ComparableRequirement]]:
+		if self.lockfile is None:
+			return None
+
+		validated = self.lockfile.get_requirements(self.config)
+		if validated is None:
+			return None
+
+		return self._finalise_requirements([ComparableRequirement(req) for req in validated.values()])
+
+	def _lock_requirements(
+			self,
+			requirements: List[str],
+			validated: List[ComparableRequirement],
+			) -> List[ComparableRequirement]:
+		# Records the validated requirements in the lockfile, keyed by the requirements before validation.
+
+		if self.lockfile is not None:
+			self.lockfile.set_requirements(self.config, dict(zip(requirements, map(str, validated))))
+
+		return self._finalise_requirements(validated)
+
+	@staticmethod
+	def _finalise_requirements(all_requirements: List[ComparableRequirement]) -> List[ComparableRequirement]:
+		requirements_entries = [req for req in all_requirements if req and req != "numpy"]
+
+		if [v.specifier for v in all_requirements if v == "numpy"]:
+			requirements_entries.append(ComparableRequirement("numpy>=1.19.0"))
+
+		return requirements_entries
+
+	def get_maintainers(self) -> Iterable[str]:
+		"""
+		Returns an iterable over the names of the project's maintainers.
+
+		:rtype:
+
+		.. latex:clearpage::
+		"""
+
+		return {repr(name) for name in self._get_maintainer_names()}
+
+	def _get_maintainer_names(self) -> Set[str]:
+		return set(self._memoized("maintainers", self._find_maintainer_names))
+
+	def _find_maintainer_names(self) -> Set[str]:
+		all_maintainers = set()
+
+		if self.config["maintainers"]:
+			for maintainer in self.config["maintainers"]:
+				if "name" in maintainer:
+					all_maintainers.add(maintainer["name"])
+		elif self.config["authors"]:
+			for maintainer in self.config["authors"]:
+				if "name" in maintainer:
+					all_maintainers.add(maintainer["name"])
+
+		return all_maintainers
+
+	def make_conda_description(self) -> str:
+		"""
+		Create a description for the Conda package from its summary and a list of channels required to install it.
+		"""
+
+		return self._memoized(
+				"conda-description",
+				lambda: make_conda_description(self.config["description"], self.config["conda-channels"]),
+				)
+
+	def get_urls(self) -> Iterable[str]:
+		"""
+		Returns an iterable of URL entries for the "about" section of the recipe.
+		"""
+
+		for key, url in self._get_url_entries():
+			yield f"{key}: {url!r}"
+
+	def _get_url_entries(self) -> Iterator[Tuple[str, str]]:
+		return iter(self._memoized("urls", lambda: list(self._find_url_entries())))
+
+	def _find_url_entries(self) -> Iterator[Tuple[str, str]]:
+		for label, url in self.config["urls"].items():
+			if label.lower() == "homepage":
+				yield "home", str(url)
+			# elif re.match("issue[s\s_-]*(tracker)?", label, flags=re.IGNORECASE):
+			# 	yield "home", str(url)
+			elif _source_code_re.match(label):  # pylint: disable=W8202
+				yield "dev_url", str(url)
+			elif _documentation_re.match(label):  # pylint: disable=W8202
+				yield "doc_url", str(url)
+
+
+def _check_artifact_types(artifact_types: Iterable[str]) -> List[str]:
+	# Returns the artifact types without duplicates, raising an error for unknown types.
+
+	checked: List[str] = []
+
+	for artifact_type in artifact_types:
+		if artifact_type not in _artifact_types:
+			raise ValueError(f"Unknown artifact type {artifact_type!r}")
+		if artifact_type not in checked:
+			checked.append(artifact_type)
+
+	if not checked:
+		raise ValueError("No artifact types given.")
+
+	return checked
+
+
+_source_code_re = re.compile(r"source[\s_-]*(code)?", flags=re.IGNORECASE)
+_documentation_re = re.compile(r"doc(s|umentation)?", flags=re.IGNORECASE)
+
+
+def make_recipe(
+		project_dir: PathLike,
+		recipe_file: PathLike,
+		artifact_type: "Literal['sdist', 'wheel']" = "sdist",
+		retry_policy: Optional[RetryPolicy] = None,
+		incremental: bool = False,
+		timings: Optional[Timings] = None,
+		lock: Optional[bool] = None,
+		refresh: bool = False,
+		) -> bool:
+	"""
+	Make a Conda ``meta.yaml`` recipe.
+
+	:param project_dir: The project directory.
+	:param recipe_file: The file to save the recipe as.
+	:param artifact_type: The type of release artifact to build the conda package from.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+	:param incremental: Skip creating the recipe if its inputs have not changed since it was last created,
+		and leave the recipe file untouched if its content has not changed. See :mod:`mkrecipe.incremental`.
+	:param timings: The object to record the time spent in each phase of creating the recipe in.
+		See :mod:`mkrecipe.timings`.
+	:param lock: Whether to create the recipe from the project's lockfile, recording anything not in it.
+		See :mod:`mkrecipe.lock`.
+		By default the lockfile is used if it exists, or if ``refresh`` is :py:obj:`True`.
+	:param refresh: Look up everything recorded in the lockfile again, and record the results afresh.
+
+	:returns: Whether the recipe file was written.
+
+	.. versionchanged:: 0.10.0
+
+		Added the ``artifact_type``, ``retry_policy``, ``incremental``, ``timings``,
+		``lock`` and ``refresh`` arguments.
+	"""
+
+	written = make_recipes(
+			project_dir,
+			{artifact_type: recipe_file},
+			retry_policy,
+			incremental,
+			timings,
+			lock,
+			refresh,
+			)
+
+	return written[artifact_type]
+
+
+def make_recipes(
+		project_dir: PathLike,
+		recipe_files: Mapping[str, PathLike],
+		retry_policy: Optional[RetryPolicy] = None,
+		incremental: bool = False,
+		timings: Optional[Timings] = None,
+		lock: Optional[bool] = None,
+		refresh: bool = False,
+		) -> Dict[str, bool]:
+	"""
+	Make Conda ``meta.yaml`` recipes for several types of release artifact,
+	resolving the data they share only once (see :meth:`MaryBerry.make_multiple`).
+
+	.. versionadded:: 0.10.0
+
+	:param project_dir: The project directory.
+	:param recipe_files: Mapping of artifact types (``'sdist'`` or ``'wheel'``) to the files to save the recipes as.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+	:param incremental: Skip creating recipes whose inputs have not changed since they were last created,
+		and leave recipe files untouched if their content has not changed. See :mod:`mkrecipe.incremental`.
+	:param timings: The object to record the time spent in each phase of creating the recipes in.
+		See :mod:`mkrecipe.timings`.
+	:param lock: Whether to create the recipes from the project's lockfile, recording anything not in it.
+		See :mod:`mkrecipe.lock`.
+		By default the lockfile is used if it exists, or if ``refresh`` is :py:obj:`True`.
+	:param refresh: Look up everything recorded in the lockfile again, and record the results afresh.
+		Recipes are then created even if ``incremental`` is :py:obj:`True`.
+
+	:returns: Mapping of artifact types to whether the recipe file was written.
+	"""  # noqa: D400
+
+	to_write: Dict[str, PathPlus] = {
+			artifact_type: PathPlus(recipe_file)
+			for artifact_type, recipe_file in recipe_files.items()
+			}
+	_check_artifact_types(to_write)
+
+	written = {artifact_type: False for artifact_type in to_write}
+
+	if lock is None:
+		lock = refresh or get_lock_path(project_dir).is_file()
+
+	lockfile = Lockfile.for_project(project_dir, refresh) if lock else None
+
+	# When refreshing everything is looked up again, so the recipes may have changed even if their inputs haven't.
+	if incremental and not refresh:
+		to_write = {
+				artifact_type: recipe_file
+				for artifact_type, recipe_file in to_write.items()
+				if not is_up_to_date(project_dir, recipe_file, artifact_type)
+				}
+
+		if not to_write:
+			return written
+
+	berry = MaryBerry(project_dir, retry_policy, timings, lockfile=lockfile)
+
+	if list(to_write) == ["sdist"]:
+		recipes = {"sdist": berry.make()}
+	elif list(to_write) == ["wheel"]:
+		recipes = {"wheel": berry.make_for_wheel()}
+	else:
+		recipes = berry.make_multiple(to_write)
+
+	if lockfile is not None:
+		# Saved before the manifests are written, as the lockfile is one of the inputs to the recipes.
+		lockfile.save()
+
+	for artifact_type, recipe_file in to_write.items():
+		with berry.timings.phase("write"):
+			buf = StringIO()
+			clean_writer(recipes[artifact_type], buf)
+			recipe = buf.getvalue()
+
+			written[artifact_type] = not (incremental and recipe_file.is_file() and recipe_file.read_text() == recipe)
+
+			if written[artifact_type]:
+				recipe_file.parent.maybe_make(parents=True)
+				recipe_file.write_text(recipe)
+
+			if incremental:
+				write_manifest(berry, recipe_file, artifact_type)
+
+	return written
+
+
+def filter_reqs_with_markers(
+		config: Dict[str, Any],
+		reqs: Iterable[ComparableRequirement],
+		) -> Iterable[ComparableRequirement]:
+	"""
+	Remove Windows, pypy, aarch64 etc. specific requirements.
+
+	:param config:
+	:param reqs:
+
+	:returns: An iterable of remaining requirements.
+
+	.. versionadded:: 0.9.0
+	"""
+
+	for req in chain(config["dependencies"], reqs):  # pylint: disable=W8201
+		if req.marker is not None:
+			marker = str(req.marker).lower()
+			reject_markers = [
+					'platform_system != "linux"',
+					'platform_system == "windows"',
+					'platform_python_implementation != "cpython"',
+					'platform_machine == "aarch64"',
+					]
+			if any(rm in marker for rm in reject_markers):
+				continue
+
+		yield req
+
+
+def filter_reqs_by_py_version(
+		config: Dict[str, Any],
+		reqs: List[ComparableRequirement],
+		) -> List[ComparableRequirement]:
+	"""
+	Exclude requirements based on a used-specified (partial) range of Python versions.
+	E.g. to skip Python 3.6-only requirements or requirements for prerelease Pythons.
+
+	:param config:
+	:param reqs:
+
+	:returns: The remaining requirements.
+
+	.. versionadded:: 0.9.0
+
+	.. versionchanged:: 0.10.0
+
+		The Python version clauses of the markers are now evaluated symbolically,
+		so the range is no longer limited to Python 3.20 and includes every patch release.
+	"""
+
+	max_version = config["max-python-version"]
+	min_version = config["min-python-version"]
+
+	if max_version is None and min_version is None:
+		return reqs
+
+	filtered_reqs = []
+
+	for requirement in reqs:
+		# Include the requirement if its marker is valid for any of the range
+		if not requirement.marker or marker_in_python_range(requirement.marker, min_version, max_version):
+			filtered_reqs.append(requirement)
+
+	return filtered_reqs
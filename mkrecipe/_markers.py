@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+#
+#  _markers.py
+"""
+Symbolic evaluation of the Python version clauses of environment markers.
+
+Rather than evaluating a marker once for each Python version in a range,
+the ``python_version`` and ``python_full_version`` clauses are converted into sets of version intervals,
+which are combined according to the ``and`` and ``or`` operators and intersected with the range in one pass.
+Clauses for other variables do not depend on the Python version, so are evaluated once for the current environment.
+
+The ``extra`` clauses of the markers of a dependency's requirements can also be removed,
+to determine which requirements belong to which of the dependency's extras.
+
+.. versionadded:: 0.10.0
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import re
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+# 3rd party
+from packaging.markers import Marker, Op, Value, Variable
+from packaging.version import InvalidVersion, Version
+from shippinglabel import normalize
+
+__all__ = ("marker_in_python_range", "marker_for_extras")
+
+# The bounds of the intervals are ``(0, version, 0)`` for the point at ``version``,
+# ``(0, version, 1)`` for the point immediately after it, and ``(1, )`` for positive infinity.
+# Intervals are half-open, including their lower bound but not their upper bound.
+_Bound = Tuple[Any, ...]
+_Interval = Tuple[_Bound, _Bound]
+
+_NEGATIVE_INFINITY: _Bound = (0, Version('0'), 0)
+_POSITIVE_INFINITY: _Bound = (1, )
+_ALL: List[_Interval] = [(_NEGATIVE_INFINITY, _POSITIVE_INFINITY)]
+
+_python_variables = {"python_version", "python_full_version"}
+_flipped_ops = {'<': '>', "<=": ">=", '>': '<', ">=": "<=", "==": "==", "!=": "!="}
+_version_re = re.compile(r"\b3\.(\d+)")
+
+
+class _CannotReason(Exception):
+	"""
+	Raised for markers which cannot be converted into intervals.
+	"""
+
+
+def _at(version: Version, after: bool = False) -> _Bound:
+	return (0, version, int(after))
+
+
+def _normalise(intervals: Sequence[_Interval]) -> List[_Interval]:
+	# Sort the intervals, dropping any which are empty and merging any which overlap or are adjacent.
+
+	merged: List[_Interval] = []
+
+	for lower, upper in sorted(interval for interval in intervals if interval[0] < interval[1]):
+		if merged and lower <= merged[-1][1]:
+			merged[-1] = (merged[-1][0], max(merged[-1][1], upper))
+		else:
+			merged.append((lower, upper))
+
+	return merged
+
+
+def _union(a: Sequence[_Interval], b: Sequence[_Interval]) -> List[_Interval]:
+	return _normalise([*a, *b])
+
+
+def _intersection(a: Sequence[_Interval], b: Sequence[_Interval]) -> List[_Interval]:
+	return _normalise([
+			(max(a_lower, b_lower), min(a_upper, b_upper)) for a_lower, a_upper in a for b_lower, b_upper in b
+			])
+
+
+def _complement(intervals: Sequence[_Interval]) -> List[_Interval]:
+	complement = []
+	lower = _NEGATIVE_INFINITY
+
+	for start, end in intervals:
+		complement.append((lower, start))
+		lower = end
+
+	complement.append((lower, _POSITIVE_INFINITY))
+
+	return _normalise(complement)
+
+
+def _full_version_intervals(op: str, version: Version) -> List[_Interval]:
+	if op == ">=":
+		return [(_at(version), _POSITIVE_INFINITY)]
+	elif op == '>':
+		return [(_at(version, after=True), _POSITIVE_INFINITY)]
+	elif op == "<=":
+		return [(_NEGATIVE_INFINITY, _at(version, after=True))]
+	elif op == '<':
+		return [(_NEGATIVE_INFINITY, _at(version))]
+	elif op == "==":
+		return [(_at(version), _at(version, after=True))]
+	else:  # !=
+		return _complement([(_at(version), _at(version, after=True))])
+
+
+def _first_release(version: Version, inclusive: bool) -> Version:
+	# Returns the first ``X.Y`` release which is greater than (or equal to, if ``inclusive``) ``version``.
+
+	major, minor = (*version.release, 0)[:2]
+	release = Version(f"{major}.{minor}")
+
+	if release > version or (inclusive and release == version):
+		return release
+	else:
+		return Version(f"{major}.{minor + 1}")
+
+
+def _python_version_intervals(op: str, version: Version) -> List[_Interval]:
+	# ``python_version`` is the ``X.Y`` part of the full version,
+	# so each comparison is satisfied from (or up to) the start of an ``X.Y`` release series.
+
+	if op == ">=":
+		return [(_at(_first_release(version, inclusive=True)), _POSITIVE_INFINITY)]
+	elif op == '>':
+		return [(_at(_first_release(version, inclusive=False)), _POSITIVE_INFINITY)]
+	elif op == '<':
+		return _complement(_python_version_intervals(">=", version))
+	elif op == "<=":
+		return _complement(_python_version_intervals('>', version))
+	elif op == "==":
+		return _intersection(_python_version_intervals(">=", version), _python_version_intervals("<=", version))
+	else:  # !=
+		return _complement(_python_version_intervals("==", version))
+
+
+def _atom_intervals(lhs: Any, op: Op, rhs: Any) -> List[_Interval]:
+	if isinstance(lhs, Variable) and isinstance(rhs, Value):
+		variable, operator, value = lhs.value, op.value, rhs.value
+	elif isinstance(lhs, Value) and isinstance(rhs, Variable):
+		variable, operator, value = rhs.value, _flipped_ops.get(op.value, op.value), lhs.value
+	else:
+		raise _CannotReason
+
+	if variable not in _python_variables:
+		# Does not depend on the Python version.
+		return _ALL if _evaluate_atom(f"{lhs.serialize()} {op.serialize()} {rhs.serialize()}") else []
+
+	return _version_clause_intervals(variable, operator, value)
+
+
+@lru_cache()
+def _version_clause_intervals(variable: str, operator: str, value: str) -> List[_Interval]:
+	# The same clauses appear in many markers, so the results are cached. They must not be modified.
+
+	if operator not in _flipped_ops or '*' in value:
+		raise _CannotReason
+
+	try:
+		version = Version(value)
+	except InvalidVersion:
+		raise _CannotReason from None
+
+	if variable == "python_full_version":
+		return _full_version_intervals(operator, version)
+	else:
+		return _python_version_intervals(operator, version)
+
+
+@lru_cache()
+def _evaluate_atom(atom: str) -> bool:
+	return Marker(atom).evaluate()
+
+
+def _marker_intervals(markers: Sequence[Any]) -> List[_Interval]:
+	# ``and`` binds more tightly than ``or``, so the marker is a union of intersections.
+	groups = [_ALL]
+
+	for item in markers:
+		if isinstance(item, list):
+			groups[-1] = _intersection(groups[-1], _marker_intervals(item))
+		elif isinstance(item, tuple):
+			groups[-1] = _intersection(groups[-1], _atom_intervals(*item))
+		elif item == "or":
+			groups.append(_ALL)
+		elif item != "and":
+			raise _CannotReason
+
+	intervals: List[_Interval] = []
+	for group in groups:
+		intervals = _union(intervals, group)
+
+	return intervals
+
+
+def _evaluate_in_range(marker: Marker, min_version: int, max_version: Optional[int]) -> bool:
+	# Fallback for markers which can't be reasoned about symbolically.
+	# The result can only change at versions which appear in the marker,
+	# so without a maximum version there is no need to look beyond the newest of them.
+
+	if max_version is None:
+		max_version = max([min_version, *(int(minor) + 1 for minor in _version_re.findall(str(marker)))])
+
+	for minor_version in range(min_version, max_version + 1):
+		if marker.evaluate({
+				"python_full_version": f"3.{minor_version}",
+				"python_version": f"3.{minor_version}",
+				}):
+			return True
+
+	return False
+
+
+def marker_in_python_range(marker: Marker, min_version: Optional[int], max_version: Optional[int]) -> bool:
+	"""
+	Returns whether the marker is satisfied by any Python 3 version in the given range.
+
+	The range includes every release of ``3.{min_version}`` and ``3.{max_version}``,
+	and is unbounded if ``max_version`` is :py:obj:`None`.
+
+	:param marker:
+	:param min_version: The minimum Python 3.x version.
+	:param max_version: The maximum Python 3.x version.
+	"""
+
+	lower = _at(Version(f"3.{min_version or 0}"))
+	upper = _POSITIVE_INFINITY if max_version is None else _at(Version(f"3.{max_version + 1}"))
+
+	try:
+		intervals = _marker_intervals(marker._markers)
+	except _CannotReason:
+		return _evaluate_in_range(marker, min_version or 0, max_version)
+
+	return bool(_intersection(intervals, [(lower, upper)]))
+
+
+def _without_extra(markers: Sequence[Any], extra: Optional[str]) -> Union[bool, str]:
+	# Evaluate the ``extra`` clauses of the marker for the given extra (or no extra),
+	# returning the marker formed from the remaining clauses, or a boolean if none remain.
+
+	groups: List[Optional[List[str]]] = [[]]
+
+	for item in markers:
+		if item == "or":
+			groups.append([])
+			continue
+		elif item == "and":
+			continue
+		elif isinstance(item, list):
+			value = _without_extra(item, extra)
+			text = f"({value})"
+		else:
+			lhs, op, rhs = item
+			value = _extra_atom(lhs, op, rhs, extra)
+			text = str(value)
+
+		if value is False:
+			groups[-1] = None
+		elif value is not True and groups[-1] is not None:
+			groups[-1].append(text)
+
+	remaining = []
+	for group in groups:
+		if group is None:
+			continue
+		elif not group:
+			return True
+		remaining.append(" and ".join(group))
+
+	return " or ".join(remaining) if remaining else False
+
+
+def _extra_atom(lhs: Any, op: Op, rhs: Any, extra: Optional[str]) -> Union[bool, str]:
+	if isinstance(lhs, Variable) and lhs.value == "extra":
+		value = rhs.value
+	elif isinstance(rhs, Variable) and rhs.value == "extra":
+		value = lhs.value
+	else:
+		return f"{lhs.serialize()} {op.serialize()} {rhs.serialize()}"
+
+	if op.value == "==":
+		return extra is not None and normalize(value) == extra
+	elif op.value == "!=":
+		return extra is None or normalize(value) != extra
+	else:
+		return False
+
+
+def marker_for_extras(marker: Marker, extras: Iterable[str]) -> Tuple[bool, Optional[Marker]]:
+	"""
+	Determine whether a requirement of a dependency is only needed for some of the dependency's extras.
+
+	:param marker: The marker of the requirement, from the ``Requires-Dist`` field of the dependency's metadata.
+	:param extras: The names of the extras.
+
+	:returns: A tuple of whether the requirement is needed by any of the extras (but not the dependency itself),
+		and the marker which remains once the ``extra`` clauses are removed,
+		or :py:obj:`None` if the requirement is needed unconditionally.
+	"""
+
+	without = _without_extra(marker._markers, None)
+	remaining = []
+
+	# As with installers, the marker is evaluated for each extra in turn.
+	for extra in sorted({normalize(extra) for extra in extras}):
+		value = _without_extra(marker._markers, extra)
+
+		if value is False or value == without:
+			continue
+		elif value is True:
+			return True, None
+		elif value not in remaining:
+			remaining.append(value)
+
+	if not remaining:
+		return False, None
+
+	return True, Marker(" or ".join(f"({value})" for value in remaining) if len(remaining) > 1 else remaining[0])
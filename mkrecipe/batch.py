@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+#
+#  batch.py
+"""
+Create recipes for many projects in a single invocation.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# 3rd party
+import dom_toml
+from dom_toml.parser import BadConfigError
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+
+if TYPE_CHECKING:
+	# this package
+	from mkrecipe.retry import RetryPolicy
+
+__all__ = ("BatchJob", "BatchResult", "load_manifest", "run_batch")
+
+_artifact_types = ("sdist", "wheel")
+
+
+class BatchJob(NamedTuple):
+	"""
+	The recipes to create for a single project as part of a batch.
+
+	The project's requirements are resolved once and shared between the recipes for each type of release artifact.
+	"""
+
+	#: The project directory.
+	project: str
+
+	#: The types of release artifact to build conda packages from.
+	artifact_types: Tuple[str, ...] = ("sdist", )
+
+	#: The files to save the recipes as, in the same order as :attr:`~.artifact_types`.
+	outfiles: Tuple[str, ...] = ("conda/meta.yaml", )
+
+	@property
+	def recipe_files(self) -> Dict[str, str]:
+		"""
+		Mapping of artifact types to the files to save the recipes as.
+		"""
+
+		return dict(zip(self.artifact_types, self.outfiles))
+
+
+class BatchResult(NamedTuple):
+	"""
+	The outcome of a :class:`~.BatchJob`.
+	"""
+
+	#: The job this is the result of.
+	job: BatchJob
+
+	#: A description of the error which occurred, or :py:obj:`None` if the recipes were created successfully.
+	error: Optional[str] = None
+
+	#: Mapping of artifact types to whether the recipe file was written,
+	#: or :py:obj:`None` if the recipes could not be created.
+	#: A recipe which was already up to date is not written.
+	written: Optional[Dict[str, bool]] = None
+
+	#: The time spent in each phase of creating the recipes, as returned by :meth:`mkrecipe.timings.Timings.as_dict`.
+	timings: Optional[Dict[str, Dict[str, float]]] = None
+
+	#: The network requests made while creating the recipes,
+	#: as returned by :meth:`mkrecipe.network.NetworkStats.as_dict`.
+	#: This is only recorded when the jobs run in separate processes,
+	#: as otherwise the requests of concurrent jobs can't be told apart.
+	network: Optional[Dict[str, Dict[str, Any]]] = None
+
+	@property
+	def success(self) -> bool:
+		"""
+		Whether the recipes were created successfully.
+		"""
+
+		return self.error is None
+
+
+def _get_recipe_files(outfile: PathLike, artifact_types: Sequence[str]) -> Dict[str, str]:
+	# Recipes for multiple artifact types are written to subdirectories named after the type.
+
+	recipe_file = PathPlus(outfile)
+
+	if len(artifact_types) == 1:
+		return {artifact_types[0]: recipe_file.as_posix()}
+
+	return {
+			artifact_type: (recipe_file.parent / artifact_type / recipe_file.name).as_posix()
+			for artifact_type in artifact_types
+			}
+
+
+def load_manifest(filename: PathLike) -> List[BatchJob]:
+	"""
+	Load a list of jobs from a TOML manifest.
+
+	The manifest consists of an array of ``[[recipe]]`` tables, each with a ``project`` key
+	and optional ``type`` and ``outfile`` keys:
+
+	.. code-block:: TOML
+
+		[[recipe]]
+		project = "consolekit"
+
+		[[recipe]]
+		project = "whey"
+		type = "wheel"
+		outfile = "recipes/whey/meta.yaml"
+
+		[[recipe]]
+		project = "hatch-requirements-txt"
+		type = ["sdist", "wheel"]
+
+	Relative paths are resolved relative to the directory containing the manifest.
+	If ``outfile`` is omitted the recipe is written to :file:`conda/meta.yaml` within the project directory.
+	If ``type`` is an array the recipe for each type of artifact is written to a subdirectory
+	named after the type, such as :file:`conda/sdist/meta.yaml` and :file:`conda/wheel/meta.yaml`.
+
+	:param filename:
+	"""
+
+	filename = PathPlus(filename)
+	manifest_dir = filename.parent
+	config = dom_toml.load(filename)
+
+	recipes = config.get("recipe", [])
+	if not isinstance(recipes, list):
+		raise BadConfigError(f"Invalid type for 'recipe' in {filename.as_posix()!r}: expected an array of tables.")
+
+	jobs = []
+
+	for idx, recipe in enumerate(recipes):
+		if not isinstance(recipe, dict) or not isinstance(recipe.get("project"), str):
+			raise BadConfigError(f"'recipe[{idx}].project' must be provided and must be a string.")
+
+		artifact_types = recipe.get("type", "sdist")
+		if isinstance(artifact_types, str):
+			artifact_types = [artifact_types]
+
+		if not isinstance(artifact_types, list) or not artifact_types or not all(
+				artifact_type in _artifact_types for artifact_type in artifact_types
+				):
+			raise BadConfigError(f"Invalid value for 'recipe[{idx}].type': Expected 'sdist' or 'wheel'.")
+
+		project = manifest_dir / recipe["project"]
+
+		if "outfile" in recipe:
+			outfile = manifest_dir / recipe["outfile"]
+		else:
+			outfile = project / "conda" / "meta.yaml"
+
+		recipe_files = _get_recipe_files(outfile, list(dict.fromkeys(artifact_types)))
+		jobs.append(BatchJob(project.as_posix(), tuple(recipe_files), tuple(recipe_files.values())))
+
+	return jobs
+
+
+def _run_job(
+		job: BatchJob,
+		retry_policy: Optional["RetryPolicy"],
+		incremental: bool,
+		record_network: bool = False,
+		lock: Optional[bool] = None,
+		refresh: bool = False,
+		) -> BatchResult:
+	# this package
+	from mkrecipe import make_recipes
+	from mkrecipe.network import get_stats
+	from mkrecipe.timings import Timings
+
+	timings = Timings()
+
+	if record_network:
+		# Each worker process runs one job at a time, so the process-wide stats cover just this job.
+		get_stats().reset()
+
+	def result(**kwargs: Any) -> BatchResult:
+		network = get_stats().as_dict() if record_network else None
+		return BatchResult(job, timings=timings.as_dict(), network=network, **kwargs)
+
+	try:
+		written = make_recipes(
+				job.project,
+				job.recipe_files,
+				retry_policy,
+				incremental,
+				timings,
+				lock,
+				refresh,
+				)
+	except Exception as e:  # pylint: disable=broad-except
+		return result(error=f"{type(e).__name__}: {e}")
+
+	return result(written=written)
+
+
+def run_batch(
+		jobs: Iterable[BatchJob],
+		max_workers: Optional[int] = None,
+		retry_policy: Optional["RetryPolicy"] = None,
+		incremental: bool = False,
+		threads: bool = False,
+		lock: Optional[bool] = None,
+		refresh: bool = False,
+		) -> Iterator[BatchResult]:
+	"""
+	Create the recipes for the given jobs using a pool of worker processes.
+
+	A failure in one job does not prevent the remaining jobs from running.
+	If a worker process dies the jobs which had not finished are reported as failures.
+
+	:param jobs:
+	:param max_workers: The maximum number of worker processes to use.
+		Defaults to the number of CPUs on the machine.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+		Give the policy a ``global_deadline`` to limit the time spent retrying across the whole batch.
+	:param incremental: Skip recipes whose inputs have not changed. See :mod:`mkrecipe.incremental`.
+	:param threads: Use a pool of threads rather than processes.
+		Most of the time creating a recipe is spent waiting for the network,
+		so threads avoid the cost of starting processes and share the in-memory caches.
+	:param lock: Whether to create the recipes from each project's lockfile, recording anything not in it.
+		See :mod:`mkrecipe.lock`. By default the lockfile is used if it exists.
+	:param refresh: Look up everything recorded in the lockfiles again, and record the results afresh.
+
+	:returns: An iterator over the results of the jobs, in the order in which they complete.
+	"""
+
+	executor: Executor
+
+	if threads:
+		executor = ThreadPoolExecutor(max_workers=max_workers)
+	else:
+		executor = ProcessPoolExecutor(max_workers=max_workers)
+
+	with executor:
+		futures: Dict["Future[BatchResult]", BatchJob] = {
+				executor.submit(_run_job, job, retry_policy, incremental, not threads, lock, refresh): job
+				for job in jobs
+				}
+
+		for future in as_completed(futures):
+			try:
+				result = future.result()
+			except BrokenProcessPool as e:
+				# The worker process died (e.g. it was killed for using too much memory).
+				result = BatchResult(futures[future], error=f"{type(e).__name__}: {e}")
+
+			yield result
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+#
+#  conda.py
+"""
+Validate requirements against a local index of the packages in conda channels.
+
+The package names in each channel are downloaded once and stored in the user's cache directory,
+indexed by their normalized name. Each subdirectory of the channel (``noarch`` and ``linux-64``)
+is revalidated independently with a conditional request once it is older than :envvar:`MKRECIPE_CACHE_TTL` seconds,
+so only the parts of the channel which have changed are downloaded again.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+# 3rd party
+import requests
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.stringlist import DelimitedList
+from packaging.requirements import InvalidRequirement
+from shippinglabel import normalize
+from shippinglabel.requirements import ComparableRequirement
+from shippinglabel_conda import alias_mapping
+
+# this package
+from mkrecipe import network
+from mkrecipe._cache import get_cache_dir, get_cache_ttl, read_json, write_json
+
+__all__ = ("CONDA_URL", "SUBDIRS", "clear_cache", "get_channel_index", "validate_requirements")
+
+CONDA_URL = "https://conda.anaconda.org/"
+"""
+The base URL of the server hosting the conda channels.
+"""
+
+SUBDIRS = ("noarch", "linux-64")
+"""
+The subdirectories (platforms) of each channel which are indexed.
+"""
+
+# In-memory copies of the indexes, to avoid re-reading them from disk for each project.
+_indexes: Dict[str, Tuple[float, Dict[str, List[str]]]] = {}
+
+
+def clear_cache(*channel_name: str) -> None:
+	r"""
+	Clear the cached channel indexes.
+
+	:param \*channel_name: The name(s) of the channels to clear the cache for.
+
+	If no arguments are given the cache is cleared for all channels.
+	"""
+
+	cache_dir = get_cache_dir("conda")
+	_indexes.clear()
+
+	if channel_name:
+		filenames = [filename for name in channel_name for filename in (cache_dir / name).glob("*.json")]
+	else:
+		filenames = list(cache_dir.glob("*/*.json"))
+
+	for filename in filenames:
+		filename.unlink()
+
+
+def _get_repodata(
+		channel_name: str,
+		subdir: str,
+		headers: Dict[str, str],
+		session: network.Session,
+		) -> Optional[requests.Response]:
+	# current_repodata.json lists only the latest version of each package, so is much smaller than repodata.json
+	# but still contains every package name. Not all channels provide it though.
+
+	for filename in ("current_repodata.json", "repodata.json"):
+		url = urljoin(CONDA_URL, f"{channel_name}/{subdir}/{filename}")
+		response = session.fetch("conda", url, headers=headers)
+
+		if response.status_code != 404:
+			response.raise_for_status()
+			return response
+
+	return None
+
+
+def _get_cache_file(channel_name: str, subdir: str) -> PathPlus:
+	return get_cache_dir("conda", channel_name) / f"{subdir}.json"
+
+
+def _refresh_subdir(channel_name: str, subdir: str, session: network.Session) -> Optional[Dict[str, List[str]]]:
+	cache_file = _get_cache_file(channel_name, subdir)
+	cached = read_json(cache_file)
+
+	if cached is not None and time.time() - cached["fetched"] < get_cache_ttl():
+		network.get_stats().record_lookup("conda", cached=True)
+		return cached["packages"]
+
+	headers = {}
+
+	if cached is not None and cached["packages"] is not None:
+		if cached.get("etag"):
+			headers["If-None-Match"] = cached["etag"]
+		if cached.get("last_modified"):
+			headers["If-Modified-Since"] = cached["last_modified"]
+
+	response = _get_repodata(channel_name, subdir, headers, session)
+
+	if response is None:
+		# Many channels have no packages for some platforms. Remembering that the subdirectory doesn't exist
+		# avoids requesting it again (twice, as both repodata files are tried) until the entry expires.
+		write_json(cache_file, {"fetched": time.time(), "packages": None})
+		return None
+
+	network.get_stats().record_lookup("conda", cached=response.status_code == 304 and cached is not None)
+
+	if response.status_code == 304 and cached is not None:
+		cached["fetched"] = time.time()
+		write_json(cache_file, cached)
+		return cached["packages"]
+
+	repodata = response.json()
+	packages: Dict[str, List[str]] = {}
+
+	for package in (*repodata.get("packages", {}).values(), *repodata.get("packages.conda", {}).values()):
+		names = packages.setdefault(normalize(package["name"]), [])
+		if package["name"] not in names:
+			names.append(package["name"])
+
+	write_json(
+			cache_file,
+			{
+					"fetched": time.time(),
+					"etag": response.headers.get("ETag"),
+					"last_modified": response.headers.get("Last-Modified"),
+					"packages": packages,
+					},
+			)
+
+	return packages
+
+
+def get_channel_index(channel_name: str, session: Optional[network.Session] = None) -> Dict[str, List[str]]:
+	"""
+	Returns a mapping of normalized package names to the names of packages in the given conda channel.
+
+	More than one package in the channel may have the same normalized name
+	(e.g. ``typing-extensions`` and ``typing_extensions``).
+
+	:param channel_name:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+
+	:raises ValueError: if the channel can't be found.
+	"""
+
+	if session is None:
+		session = network.get_session()
+
+	if channel_name in _indexes:
+		loaded, index = _indexes[channel_name]
+		if time.time() - loaded < get_cache_ttl():
+			network.get_stats().record_lookup("conda", cached=True)
+			return index
+
+	index = {}
+
+	for subdir in SUBDIRS:
+		packages = _refresh_subdir(channel_name, subdir, session)
+
+		if packages is None:
+			if subdir == "noarch":
+				raise ValueError(f"Conda channel {channel_name!r} not found.")
+			continue
+
+		for normalized_name, names in packages.items():
+			index_names = index.setdefault(normalized_name, [])
+			index_names.extend(name for name in names if name not in index_names)
+
+	_indexes[channel_name] = (time.time(), index)
+
+	return index
+
+
+def validate_requirements(
+		requirements: Iterable[ComparableRequirement],
+		conda_channels: Iterable[str],
+		session: Optional[network.Session] = None,
+		) -> List[ComparableRequirement]:
+	"""
+	Ensure that all requirements are available from the given conda channels,
+	and normalize the names to those in the conda channel.
+
+	:param requirements:
+	:param conda_channels:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+
+	:raises packaging.requirements.InvalidRequirement: if a requirement is not available from any of the channels.
+	"""  # noqa: D400
+
+	channels = DelimitedList(conda_channels)
+
+	return _validate_against(requirements, channels, [get_channel_index(channel, session) for channel in channels])
+
+
+def _validate_against(
+		requirements: Iterable[ComparableRequirement],
+		channels: DelimitedList,
+		indexes: List[Dict[str, List[str]]],
+		) -> List[ComparableRequirement]:
+
+	validated_requirements = []
+
+	for requirement in requirements:
+
+		# Check alias_mapping first
+		if requirement.name in alias_mapping:
+			requirement.name = alias_mapping[requirement.name]
+		else:
+			normalized_name = normalize(requirement.name)
+			names = [name for index in indexes for name in index.get(normalized_name, ())]
+
+			if not names:
+				raise InvalidRequirement(
+						f"Cannot satisfy the requirement {requirement.name!r} "
+						f"from any of the channels: '{channels:', '}'.",
+						)
+			elif requirement.name not in names:
+				requirement.name = names[0]
+
+		validated_requirements.append(requirement)
+
+	return validated_requirements
@@ -5,6 +5,10 @@
 :pep:`621` configuration parser.
 
 .. versionchanged:: 0.2.0  ``BuildSystemParser`` moved to :mod:`pyproject_parser.parsers`
+.. versionchanged:: 0.10.0
+
+	Parsed configuration is cached, keyed on the content of every file consulted while parsing it.
+	Set the :envvar:`MKRECIPE_CONFIG_CACHE` environment variable to also cache it on disk.
 .. autosummary-widths:: 5/16 11/16
 """
 #
@@ -30,14 +34,17 @@
 #
 
 # stdlib
-from typing import Any, ClassVar, Dict, List, Union
+import hashlib
+import os
+import pickle
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 
 # 3rd party
 import dom_toml
 import whey.config
 from dom_toml.parser import TOML_TYPES, AbstractConfigParser, BadConfigError, construct_path
 from domdf_python_tools.iterative import natmin
-from domdf_python_tools.paths import PathPlus, in_directory
+from domdf_python_tools.paths import PathPlus
 from domdf_python_tools.typing import PathLike
 from packaging.specifiers import Specifier
 from packaging.version import Version
@@ -46,7 +53,10 @@ from pyproject_parser.type_hints import ProjectDict
 from shippinglabel.requirements import ComparableRequirement, combine_requirements, read_requirements
 from typing_extensions import Literal
 
-__all__ = ("MkrecipeParser", "PEP621Parser", "load_toml")
+# this package
+from mkrecipe._cache import get_cache_dir, write_bytes
+
+__all__ = ("MkrecipeParser", "PEP621Parser", "clear_cache", "load_toml")
 
 
 class PEP621Parser(whey.config.PEP621Parser):
@@ -142,6 +152,8 @@ class MkrecipeParser(AbstractConfigParser):
 			"conda-channels": ("conda-forge", ),
 			"min-python-version": None,
 			"max-python-version": None,
+			"expand-extras": False,
+			"sha256": False,
 			}
 
 	def parse_package(self, config: Dict[str, TOML_TYPES]) -> str:
@@ -253,6 +265,37 @@ class MkrecipeParser(AbstractConfigParser):
 		assert v.major == 3
 		return v.minor
 
+	def parse_expand_extras(self, config: Dict[str, TOML_TYPES]) -> bool:
+		"""
+		Parse the ``expand-extras`` key, giving whether to include the requirements of the extras
+		of the project's dependencies (such as ``bar`` in ``foo[bar]``).
+
+		:param config: The unparsed TOML config for the ``[tool.mkrecipe]`` table.
+
+		.. versionadded:: 0.10.0
+		"""  # noqa: D400
+
+		expand_extras = config["expand-extras"]
+
+		self.assert_type(expand_extras, bool, [*self.table_name, "expand-extras"])
+
+		return expand_extras
+
+	def parse_sha256(self, config: Dict[str, TOML_TYPES]) -> bool:
+		"""
+		Parse the ``sha256`` key, giving whether to include the SHA256 digest of the source distribution in the recipe.
+
+		:param config: The unparsed TOML config for the ``[tool.mkrecipe]`` table.
+
+		.. versionadded:: 0.10.0
+		"""
+
+		sha256 = config["sha256"]
+
+		self.assert_type(sha256, bool, [*self.table_name, "sha256"])
+
+		return sha256
+
 	@property
 	def keys(self) -> List[str]:
 		"""
@@ -266,34 +309,134 @@ class MkrecipeParser(AbstractConfigParser):
 				"extras",
 				"min-python-version",
 				"max-python-version",
+				"expand-extras",
+				"sha256",
 				]
 
 
+# Mapping of absolute paths of ``pyproject.toml`` files to the inputs the configuration was parsed from
+# (as ``(filename, content hash)`` pairs) and the pickled configuration.
+_CacheEntry = Tuple[List[Tuple[str, Optional[str]]], bytes]
+_config_cache: Dict[str, _CacheEntry] = {}
+
+
+def clear_cache() -> None:
+	"""
+	Clear the cache of parsed configuration, both in memory and on disk.
+
+	.. versionadded:: 0.10.0
+	"""
+
+	_config_cache.clear()
+
+	cache_dir = get_cache_dir("config")
+	if cache_dir.is_dir():
+		for cache_file in cache_dir.glob("*.pickle"):
+			cache_file.unlink()
+
+
+def _hash_file(filename: PathPlus) -> Optional[str]:
+	try:
+		return hashlib.sha256(filename.read_bytes()).hexdigest()
+	except OSError:
+		return None
+
+
+def _get_disk_cache_file(filename: PathPlus) -> Optional[PathPlus]:
+	if os.environ.get("MKRECIPE_CONFIG_CACHE", '').lower() not in {'1', "true", "yes", "on"}:
+		return None
+
+	# this package
+	from mkrecipe import __version__
+
+	key = hashlib.sha256(f"{__version__}\0{filename.as_posix()}".encode("UTF-8")).hexdigest()
+	return get_cache_dir("config") / f"{key}.pickle"
+
+
+def _read_disk_cache(cache_file: PathPlus) -> Optional[_CacheEntry]:
+	try:
+		entry = pickle.loads(cache_file.read_bytes())  # nosec: B301
+	except Exception:  # pylint: disable=broad-except
+		return None
+
+	if not (isinstance(entry, tuple) and len(entry) == 2):
+		return None
+
+	return entry
+
+
+def _is_current(entry: _CacheEntry) -> bool:
+	return all(_hash_file(PathPlus(filename)) == content_hash for filename, content_hash in entry[0])
+
+
 def load_toml(filename: PathLike) -> Dict[str, Any]:  # TODO: TypedDict
 	"""
 	Load the ``mkrecipe`` configuration mapping from the given TOML file.
 
 	:param filename:
+
+	.. versionchanged:: 0.10.0
+
+		The result is cached until the file, or any other file read while parsing it, changes.
+		Each call returns a new copy which may be modified freely.
+
+	.. versionchanged:: 0.10.0
+
+		No longer changes the current working directory while parsing the file,
+		so configuration may be loaded from several threads at once.
 	"""
 
 	filename = PathPlus(filename)
+	key = filename.abspath().as_posix()
+
+	entry = _config_cache.get(key)
+	disk_cache_file = _get_disk_cache_file(filename.abspath())
+
+	if entry is None and disk_cache_file is not None:
+		entry = _read_disk_cache(disk_cache_file)
+
+	if entry is None or not _is_current(entry):
+		entry = _parse_toml(filename)
+
+		if disk_cache_file is not None:
+			try:
+				write_bytes(disk_cache_file, pickle.dumps(entry))
+			except OSError:
+				pass
+
+	_config_cache[key] = entry
+
+	return pickle.loads(entry[1])  # nosec: B301
+
+
+def _parse_toml(filename: PathPlus) -> _CacheEntry:
+	# The inputs are hashed before they are parsed, so if one changes while it is being parsed
+	# the cache entry is out of date rather than wrong.
 
 	project_dir = filename.parent
-	config = dom_toml.load(filename)
+	content = filename.read_bytes()
+	config = dom_toml.loads(content.decode("UTF-8").replace("\r\n", '\n'))
+
+	requirements_file = project_dir / "requirements.txt"
+	inputs: List[Tuple[str, Optional[str]]] = [
+			(filename.abspath().as_posix(), hashlib.sha256(content).hexdigest()),
+			(requirements_file.abspath().as_posix(), _hash_file(requirements_file)),
+			]
 
 	parsed_config: Dict[str, Any] = {}
 	tool_table = config.get("tool", {})
 
-	with in_directory(filename.parent):
-
-		parsed_config.update(BuildSystemParser().parse(config.get("build-system", {}), set_defaults=True))
-		parsed_config.update(whey.config.WheyParser().parse(tool_table.get("whey", {})))
-		parsed_config.update(MkrecipeParser().parse(tool_table.get("mkrecipe", {}), set_defaults=True))
+	# None of the keys parsed here refer to other files, so they can be parsed without changing
+	# into the project directory. Files which are read (such as requirements.txt) are located
+	# relative to ``project_dir`` explicitly, so configuration can be loaded from several threads at once.
+	parsed_config.update(BuildSystemParser().parse(config.get("build-system", {}), set_defaults=True))
+	parsed_config.update(whey.config.WheyParser().parse(tool_table.get("whey", {})))
+	parsed_config.update(MkrecipeParser().parse(tool_table.get("mkrecipe", {}), set_defaults=True))
 
-		if "project" in config:
-			parsed_config.update(PEP621Parser().parse(config["project"], set_defaults=True))
-		else:
-			raise KeyError(f"'project' table not found in '{filename!s}'")
+	if "project" in config:
+		parsed_config.update(PEP621Parser().parse(config["project"], set_defaults=True))
+	else:
+		raise KeyError(f"'project' table not found in '{filename!s}'")
 
 	# set defaults
 	parsed_config.setdefault("package", config["project"]["name"].split('.', 1)[0])
@@ -324,4 +467,4 @@ def load_toml(filename: PathLike) -> Dict[str, Any]:  # TODO: TypedDict
 					),
 			)
 
-	return parsed_config
+	return inputs, pickle.dumps(parsed_config)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+#
+#  incremental.py
+"""
+Skip regenerating recipes whose inputs have not changed.
+
+After a recipe is created in incremental mode a small manifest is written alongside it,
+recording a fingerprint of the inputs to the recipe:
+
+* the project's ``pyproject.toml`` and ``requirements.txt`` files, and any readme or license file they refer to;
+* the project's lockfile (see :mod:`mkrecipe.lock`);
+* the version of ``mkrecipe``, the recipe template and the index the artifacts were looked up in;
+* the cached PyPI and conda channel data the recipe was created from,
+  including the metadata of the dependencies whose extras were expanded (see :conf:`expand-extras`).
+
+If the fingerprint still matches the next time the recipe is created, and the recipe itself has not been modified,
+the whole pipeline is skipped without accessing the network and the recipe is left untouched.
+A recipe which is regenerated but does not change is also left untouched,
+so its modification time only changes when its content does.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+from urllib.parse import urljoin, urlparse
+from urllib.request import url2pathname
+
+# 3rd party
+import dom_toml
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from packaging.version import Version
+from shippinglabel import normalize
+
+# this package
+from mkrecipe import __version__, conda, metadata, pypi
+from mkrecipe._cache import read_json, write_json
+from mkrecipe.lock import LOCK_FILENAME
+from mkrecipe.template import read_template_source
+
+if TYPE_CHECKING:
+	# this package
+	from mkrecipe import MaryBerry
+
+__all__ = ("get_manifest_path", "is_up_to_date", "write_manifest")
+
+_MANIFEST_VERSION = 1
+
+
+def get_manifest_path(recipe_file: PathLike) -> PathPlus:
+	"""
+	Returns the path of the manifest for the given recipe file.
+
+	For :file:`conda/meta.yaml` this is :file:`conda/.meta.yaml.mkrecipe.json`.
+
+	:param recipe_file:
+	"""
+
+	recipe_file = PathPlus(recipe_file)
+	return recipe_file.parent / f".{recipe_file.name}.mkrecipe.json"
+
+
+def _hash_file(filename: PathPlus) -> Optional[str]:
+	try:
+		return hashlib.sha256(filename.read_bytes()).hexdigest()
+	except OSError:
+		return None
+
+
+def _fingerprint(project_dir: PathPlus, inputs: Sequence[str], artifact_type: str) -> str:
+	sha256 = hashlib.sha256()
+
+	for part in (__version__, artifact_type, pypi.get_index_url(), read_template_source()):
+		sha256.update(part.encode("UTF-8"))
+		sha256.update(b'\0')
+
+	for filename in inputs:
+		sha256.update(f"{filename}\0{_hash_file(project_dir / filename)}\0".encode("UTF-8"))
+
+	return sha256.hexdigest()
+
+
+def _get_inputs(berry: "MaryBerry") -> List[str]:
+	# The files which the recipe is created from, relative to the project directory.
+
+	inputs = ["pyproject.toml", "requirements.txt", LOCK_FILENAME]
+	project = dom_toml.load(berry.project_dir / "pyproject.toml").get("project", {})
+
+	readme = project.get("readme")
+	if isinstance(readme, dict):
+		readme = readme.get("file")
+	if isinstance(readme, str):
+		inputs.append(readme)
+
+	license_table = project.get("license")
+	if isinstance(license_table, dict) and isinstance(license_table.get("file"), str):
+		inputs.append(license_table["file"])
+
+	index_url = pypi.get_index_url()
+	if index_url.startswith("file:"):
+		# Lookups in a local mirror aren't cached, so the mirror's pages for the project
+		# and for the dependencies whose extras were expanded are inputs instead.
+		for name in (normalize(berry.config["name"]), *berry._get_extras_projects()):
+			project_page = urljoin(index_url, f"{name}/index.html")
+			inputs.append(PathPlus(url2pathname(urlparse(project_page).path)).as_posix())
+
+	return inputs
+
+
+def _cache_identity(cache_file: PathPlus) -> Optional[str]:
+	# Identifies the content of a cache entry, ignoring when it was last revalidated.
+
+	data = read_json(cache_file)
+
+	if data is None:
+		return None
+	elif data.get("etag") or data.get("last_modified"):
+		return f"{data.get('etag')} {data.get('last_modified')}"
+
+	content = {key: value for key, value in data.items() if key != "fetched"}
+	return hashlib.sha256(json.dumps(content, sort_keys=True).encode("UTF-8")).hexdigest()
+
+
+def _get_cache_files(berry: "MaryBerry") -> List[PathPlus]:
+	# The cached resolver results which the recipe was created from.
+
+	cache_files = []
+
+	if not pypi.get_index_url().startswith("file:"):
+		cache_files.append(pypi._get_cache_file(berry.config["name"], Version(str(berry.config["version"]))))
+
+		# The newest matching wheel of each dependency whose extras were expanded is chosen from its project page,
+		# and the requirements of the extras are read from that wheel's metadata.
+		for name in berry._get_extras_projects():
+			cache_files.append(pypi._get_project_cache_file(name))
+			cache_files.extend(sorted(metadata._get_cache_dir(name).glob("*.json")))
+
+	for channel in berry.config["conda-channels"]:
+		cache_files.extend(conda._get_cache_file(channel, subdir) for subdir in conda.SUBDIRS)
+
+	return cache_files
+
+
+def is_up_to_date(project_dir: PathLike, recipe_file: PathLike, artifact_type: str = "sdist") -> bool:
+	"""
+	Returns whether the recipe is up to date with its inputs, and so does not need to be created again.
+
+	:param project_dir: The project directory.
+	:param recipe_file: The recipe file.
+	:param artifact_type: The type of release artifact the conda package is built from.
+	"""
+
+	project_dir = PathPlus(project_dir)
+	recipe_file = PathPlus(recipe_file)
+	manifest = read_json(get_manifest_path(recipe_file))
+
+	if manifest is None or manifest.get("manifest-version") != _MANIFEST_VERSION:
+		return False
+
+	try:
+		if _hash_file(recipe_file) != manifest["recipe"]:
+			return False
+
+		if _fingerprint(project_dir, manifest["inputs"], artifact_type) != manifest["fingerprint"]:
+			return False
+
+		for cache_file, identity in manifest["cache"].items():
+			if _cache_identity(PathPlus(cache_file)) != identity:
+				return False
+
+	except (KeyError, TypeError, AttributeError):
+		# The manifest is malformed.
+		return False
+
+	return True
+
+
+def write_manifest(berry: "MaryBerry", recipe_file: PathLike, artifact_type: str = "sdist") -> None:
+	"""
+	Write the manifest for a recipe which has just been created.
+
+	:param berry: The :class:`~mkrecipe.MaryBerry` which created the recipe.
+	:param recipe_file: The recipe file.
+	:param artifact_type: The type of release artifact the conda package is built from.
+	"""
+
+	inputs = _get_inputs(berry)
+	manifest: Dict[str, Any] = {
+			"manifest-version": _MANIFEST_VERSION,
+			"fingerprint": _fingerprint(berry.project_dir, inputs, artifact_type),
+			"inputs": inputs,
+			"cache": {cache_file.as_posix(): _cache_identity(cache_file) for cache_file in _get_cache_files(berry)},
+			"recipe": _hash_file(PathPlus(recipe_file)),
+			}
+
+	write_json(get_manifest_path(recipe_file), manifest)
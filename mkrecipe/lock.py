@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+#
+#  lock.py
+"""
+Record the data looked up on the network to create a project's recipes, so they can be recreated without it.
+
+The lockfile, :file:`mkrecipe.lock` in the project directory, records:
+
+* the URL of each release artifact, and the SHA256 digest of the source distribution
+  if the :conf:`sha256` option is enabled;
+* the requirements which were validated against the conda channels, and the name of each in the channels.
+
+Each entry also records what it was looked up for (the project's name and version, the index,
+and the requirements and conda channels from its configuration), and is only used while they still match.
+A recipe whose entries all match is created without accessing the network,
+so the same recipe is created on every machine the lockfile is shared with.
+Anything else is looked up as usual and recorded in the lockfile.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Mapping, Optional, Set, Union
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from domdf_python_tools.typing import PathLike
+from packaging.version import Version
+
+# this package
+from mkrecipe import pypi
+from mkrecipe._cache import read_json, write_bytes
+
+__all__ = ("LOCK_FILENAME", "Lockfile", "get_lock_path")
+
+#: The name of the lockfile in the project directory.
+LOCK_FILENAME = "mkrecipe.lock"
+
+_LOCK_VERSION = 1
+
+# The configuration which the validated requirements are derived from.
+_requirements_keys = (
+		"dependencies",
+		"optional-dependencies",
+		"extras",
+		"expand-extras",
+		"min-python-version",
+		"max-python-version",
+		"conda-channels",
+		)
+
+
+def get_lock_path(project_dir: PathLike) -> PathPlus:
+	"""
+	Returns the path of the lockfile for the given project.
+
+	:param project_dir: The project directory.
+	"""
+
+	return PathPlus(project_dir) / LOCK_FILENAME
+
+
+def _requirements_key(config: Mapping[str, Any]) -> str:
+	inputs = {key: config[key] for key in _requirements_keys}
+
+	if config["expand-extras"]:
+		# The extras are expanded using the metadata from the index.
+		inputs["index-url"] = pypi.get_index_url()
+
+	return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode("UTF-8")).hexdigest()
+
+
+class Lockfile:
+	"""
+	The data looked up on the network to create a project's recipes.
+
+	:param filename: The lockfile, which need not exist yet.
+	:param refresh: Ignore the data already in the lockfile, so everything is looked up again and recorded afresh.
+
+	The recorded data is only written to the file by :meth:`~.Lockfile.save`.
+	"""
+
+	def __init__(self, filename: PathLike, refresh: bool = False) -> None:
+		self.filename = PathPlus(filename)
+
+		#: Whether the data already in the lockfile was ignored.
+		self.refresh = refresh
+
+		data = {} if refresh else self._read()
+
+		self._artifacts: Dict[str, Dict[str, Any]] = data.get("artifacts", {})
+		self._requirements: Optional[Dict[str, Any]] = data.get("requirements")
+		self._changed: Set[str] = set()
+		self._lock = threading.Lock()
+
+	@classmethod
+	def for_project(cls, project_dir: PathLike, refresh: bool = False) -> "Lockfile":
+		"""
+		Returns the lockfile for the given project.
+
+		:param project_dir: The project directory.
+		:param refresh: Ignore the data already in the lockfile.
+		"""
+
+		return cls(get_lock_path(project_dir), refresh)
+
+	def _read(self) -> Dict[str, Any]:
+		data = read_json(self.filename)
+
+		if data is None or data.get("lock-version") != _LOCK_VERSION:
+			return {}
+
+		if not isinstance(data.get("artifacts", {}), dict) or not isinstance(data.get("requirements", {}), dict):
+			return {}
+
+		return data
+
+	def get_artifact(
+			self,
+			artifact_type: str,
+			name: str,
+			version: Union[str, int, Version],
+			) -> Optional[Dict[str, Any]]:
+		"""
+		Returns the recorded ``url`` (and for source distributions, ``sha256``) of a release artifact,
+		or :py:obj:`None` if it has not been recorded for this version of the project and the current index.
+
+		:param artifact_type: The type of release artifact (``'sdist'`` or ``'wheel'``).
+		:param name: The name of the project on PyPI.
+		:param version:
+		"""  # noqa: D400
+
+		with self._lock:
+			entry = self._artifacts.get(artifact_type)
+
+		if not isinstance(entry, dict) or not isinstance(entry.get("url"), str):
+			return None
+
+		recorded_for = (entry.get("name"), entry.get("version"), entry.get("index-url"))
+		if recorded_for != (name, str(version), pypi.get_index_url()):
+			return None
+
+		return entry
+
+	def set_artifact(
+			self,
+			artifact_type: str,
+			name: str,
+			version: Union[str, int, Version],
+			url: str,
+			sha256: Optional[str] = None,
+			) -> None:
+		"""
+		Record the URL of a release artifact.
+
+		:param artifact_type: The type of release artifact (``'sdist'`` or ``'wheel'``).
+		:param name: The name of the project on PyPI.
+		:param version:
+		:param url:
+		:param sha256: The SHA256 digest of the artifact, if known.
+		"""
+
+		entry = {"name": name, "version": str(version), "index-url": pypi.get_index_url(), "url": url}
+
+		if sha256 is not None:
+			entry["sha256"] = sha256
+
+		with self._lock:
+			self._artifacts[artifact_type] = entry
+			self._changed.add(artifact_type)
+
+	def get_requirements(self, config: Mapping[str, Any]) -> Optional[Dict[str, str]]:
+		"""
+		Returns the recorded mapping of the project's requirements to their names in the conda channels,
+		or :py:obj:`None` if they have not been recorded for the requirements and conda channels in ``config``.
+
+		:param config: The ``mkrecipe`` configuration.
+		"""  # noqa: D400
+
+		with self._lock:
+			entry = self._requirements
+
+		if not isinstance(entry, dict) or entry.get("key") != _requirements_key(config):
+			return None
+
+		validated = entry.get("validated")
+
+		if not isinstance(validated, dict):
+			return None
+
+		return dict(validated)
+
+	def set_requirements(self, config: Mapping[str, Any], validated: Mapping[str, str]) -> None:
+		"""
+		Record the result of validating the project's requirements against the conda channels.
+
+		:param config: The ``mkrecipe`` configuration.
+		:param validated: Mapping of the requirements (as strings) to the requirements with their names in
+			the conda channels, in the order they appear in the recipe.
+		"""
+
+		entry = {
+				"key": _requirements_key(config),
+				"conda-channels": list(config["conda-channels"]),
+				"validated": dict(validated),
+				}
+
+		with self._lock:
+			self._requirements = entry
+			self._changed.add("requirements")
+
+	def save(self) -> bool:
+		"""
+		Write anything recorded since the lockfile was read to the file.
+
+		Entries written to the file by other processes in the meantime,
+		such as for another type of artifact, are kept.
+
+		:returns: Whether the file was written.
+		"""
+
+		with self._lock:
+			if not self._changed:
+				return False
+
+			# Merge with the file as it is now, rather than as it was when read.
+			data = self._read()
+			artifacts = data.get("artifacts", {})
+			requirements = data.get("requirements")
+
+			for artifact_type in self._changed:
+				if artifact_type == "requirements":
+					requirements = self._requirements
+				else:
+					artifacts[artifact_type] = self._artifacts[artifact_type]
+
+			data = {"lock-version": _LOCK_VERSION, "artifacts": dict(sorted(artifacts.items()))}
+			if requirements is not None:
+				data["requirements"] = requirements
+
+			write_bytes(self.filename, f"{json.dumps(data, indent=2)}\n".encode("UTF-8"))
+			self._changed.clear()
+
+		return True
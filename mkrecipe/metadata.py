@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+#
+#  metadata.py
+"""
+Expand the extras of dependencies, such as ``bar`` in ``foo[bar]``, using their metadata on PyPI.
+
+The ``Requires-Dist`` fields are read from the core metadata of the newest wheel matching the requirement.
+Where the index provides it the metadata file is downloaded on its own (see :pep:`658` and :pep:`714`).
+Otherwise only the parts of the wheel containing its ``METADATA`` file are read with HTTP range requests,
+so the wheel itself is never downloaded.
+
+The metadata of a release file never changes, so the requirements read from it are cached
+in memory and in the user's cache directory indefinitely.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import io
+import re
+import threading
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from packaging.markers import Marker
+from packaging.requirements import InvalidRequirement
+from packaging.specifiers import SpecifierSet
+from shippinglabel import normalize
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from mkrecipe import network, pypi
+from mkrecipe._cache import get_cache_dir, read_json, write_json
+from mkrecipe._markers import marker_for_extras
+
+__all__ = ("clear_cache", "expand_extras", "get_requires_dist")
+
+# Mapping of ``(project name, URL)`` for release files to the ``Requires-Dist`` fields of their metadata.
+_requires_dist: Dict[Tuple[str, str], List[str]] = {}
+
+# Held while looking up the metadata of each file, so concurrent lookups of the same file only fetch it once.
+_file_locks: Dict[Tuple[str, str], threading.Lock] = defaultdict(threading.Lock)
+_file_locks_lock = threading.Lock()
+
+_content_range_re = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class _RangesNotSupported(Exception):
+	pass
+
+
+class _RangeReader(io.RawIOBase):
+	# A seekable read-only file over a remote file, which fetches the parts which are read with HTTP range requests.
+	# The end of the file, which holds the central directory of a zip file, is fetched up front.
+
+	def __init__(self, url: str, session: network.Session, block_size: int = 65536) -> None:
+		super().__init__()
+		self._url = url
+		self._session = session
+		self._block_size = block_size
+		self._position = 0
+
+		start, data, self._length = self._get(f"-{block_size}")
+		self._blocks: List[Tuple[int, bytes]] = [(start, data)]
+
+	def _get(self, byte_range: str) -> Tuple[int, bytes, int]:
+		# Returns the start of the range which was fetched, its content, and the length of the whole file.
+
+		response = self._session.fetch(
+				"pypi",
+				self._url,
+				headers={"Range": f"bytes={byte_range}", "Accept-Encoding": "identity"},
+				stream=True,
+				)
+
+		with response:
+			# Don't download the whole file if the server ignores the range.
+			if response.status_code != 206:
+				response.raise_for_status()
+				raise _RangesNotSupported
+
+			match = _content_range_re.fullmatch(response.headers.get("Content-Range", '').strip())
+			if match is None:
+				raise _RangesNotSupported
+
+			return int(match.group(1)), response.content, int(match.group(3))
+
+	def readable(self) -> bool:
+		return True
+
+	def seekable(self) -> bool:
+		return True
+
+	def tell(self) -> int:
+		return self._position
+
+	def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+		if whence == io.SEEK_CUR:
+			offset += self._position
+		elif whence == io.SEEK_END:
+			offset += self._length
+
+		if offset < 0:
+			raise ValueError(f"Negative seek position {offset}")
+
+		self._position = offset
+		return offset
+
+	def readinto(self, buffer) -> int:  # noqa: MAN001
+		end = min(self._position + len(buffer), self._length)
+		if end <= self._position:
+			return 0
+
+		for block_start, block in self._blocks:
+			if block_start <= self._position and end <= block_start + len(block):
+				data = block[self._position - block_start:end - block_start]
+				break
+		else:
+			# Read ahead, as the data of a member follows its header.
+			block_end = min(max(end, self._position + self._block_size), self._length)
+			block_start, block, _ = self._get(f"{self._position}-{block_end - 1}")
+			self._blocks.append((block_start, block))
+			data = block[self._position - block_start:end - block_start]
+
+		buffer[:len(data)] = data
+		self._position += len(data)
+		return len(data)
+
+
+def _read_wheel_metadata(wheel: Union[_RangeReader, PathPlus]) -> bytes:
+	with zipfile.ZipFile(wheel) as zip_file:
+		for name in zip_file.namelist():
+			directory, _, filename = name.partition('/')
+			if directory.endswith(".dist-info") and filename == "METADATA":
+				return zip_file.read(name)
+
+	raise zipfile.BadZipFile("The wheel has no METADATA file.")
+
+
+def _fetch_core_metadata(file: pypi.ReleaseFile, session: network.Session) -> Optional[bytes]:
+	# Returns the core metadata of the wheel, or None if it cannot be obtained without downloading the wheel.
+
+	if file.url.startswith("file:"):
+		return _read_wheel_metadata(PathPlus(url2pathname(urlparse(file.url).path)))
+
+	if file.core_metadata is not None:
+		response = session.fetch("pypi", f"{file.url}.metadata")
+
+		if response.status_code == 200:
+			expected = file.core_metadata.get("sha256")
+
+			# Some indexes have served metadata which doesn't match its hash (hence PEP 714),
+			# in which case the metadata is read from the wheel instead.
+			if expected is None or hashlib.sha256(response.content).hexdigest() == expected:
+				return response.content
+
+	try:
+		return _read_wheel_metadata(_RangeReader(file.url, session))
+	except _RangesNotSupported:
+		return None
+
+
+def _get_cache_dir(name: str) -> PathPlus:
+	return get_cache_dir("metadata", normalize(name))
+
+
+def _load_requires_dist(name: str, file: pypi.ReleaseFile, session: network.Session) -> Optional[List[str]]:
+	use_cache = not file.url.startswith("file:")
+	cache_file = _get_cache_dir(name) / f"{file.filename}.json"
+
+	if use_cache:
+		cached = read_json(cache_file)
+		network.get_stats().record_lookup("pypi", cached=cached is not None)
+		if cached is not None:
+			return cached["requires_dist"]
+
+	metadata = _fetch_core_metadata(file, session)
+	if metadata is None:
+		return None
+
+	requires_dist = BytesParser().parsebytes(metadata, headersonly=True).get_all("Requires-Dist") or []
+	requires_dist = [str(entry) for entry in requires_dist]
+
+	if use_cache:
+		write_json(cache_file, {"requires_dist": requires_dist})
+
+	return requires_dist
+
+
+def _select_file(files: Iterable[pypi.ReleaseFile], specifier: SpecifierSet) -> Optional[pypi.ReleaseFile]:
+	wheels = [file for file in files if file.filename.endswith(".whl") and not file.yanked and file.version is not None]
+
+	# As with installers, pre-releases are only considered if requested or if there are no other matches.
+	versions = set(specifier.filter({file.version for file in wheels}))
+	candidates = [file for file in wheels if file.version in versions]
+
+	if not candidates:
+		return None
+
+	# Prefer wheels whose metadata can be downloaded on its own.
+	return max(candidates, key=lambda file: (file.version, file.core_metadata is not None))
+
+
+def get_requires_dist(
+		name: str,
+		specifier: Union[str, SpecifierSet] = '',
+		session: Optional[network.Session] = None,
+		) -> Optional[List[str]]:
+	"""
+	Returns the ``Requires-Dist`` fields from the metadata of the newest wheel of the project
+	on PyPI (or the index given by :func:`mkrecipe.pypi.get_index_url`) which matches ``specifier``.
+
+	:param name: The name of the project on PyPI.
+	:param specifier: The versions of the project to consider.
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+
+	:returns: The fields, or :py:obj:`None` if no matching wheel was found
+		or its metadata cannot be read without downloading the whole wheel.
+
+	:raises:
+
+		* :exc:`~.NotYetPublished` if the project cannot be found on PyPI.
+		* :exc:`requests.HTTPError` if an error occurs when communicating with PyPI.
+	"""
+
+	if session is None:
+		session = network.get_session()
+
+	file = _select_file(pypi.get_project_files(name, session), SpecifierSet(str(specifier)))
+	if file is None:
+		return None
+
+	key = (normalize(name), file.url)
+
+	with _file_locks_lock:
+		lock = _file_locks[key]
+
+	with lock:
+		if key in _requires_dist:
+			network.get_stats().record_lookup("pypi", cached=True)
+		else:
+			requires_dist = _load_requires_dist(name, file, session)
+			if requires_dist is None:
+				return None
+			_requires_dist[key] = requires_dist
+
+	return list(_requires_dist[key])
+
+
+def _requirement_for_extras(
+		entry: str,
+		extras: Set[str],
+		marker: Optional[Marker],
+		) -> Optional[ComparableRequirement]:
+	# Returns the requirement if it is needed by the extras, with the extra clauses removed from its marker
+	# and combined with ``marker`` (from the requirement the extras were requested by).
+
+	try:
+		requirement = ComparableRequirement(entry)
+	except InvalidRequirement:
+		return None
+
+	if requirement.marker is None:
+		return None
+
+	needed, requirement.marker = marker_for_extras(requirement.marker, extras)
+	if not needed:
+		return None
+
+	if marker is not None:
+		if requirement.marker is None:
+			requirement.marker = marker
+		else:
+			requirement.marker = Marker(f"({marker}) and ({requirement.marker})")
+
+	return requirement
+
+
+def expand_extras(
+		requirements: Iterable[ComparableRequirement],
+		max_workers: int = 8,
+		session: Optional[network.Session] = None,
+		) -> List[ComparableRequirement]:
+	"""
+	Returns the requirements of the extras of the given requirements, such as ``bar`` in ``foo[bar]``.
+
+	The extras of the returned requirements are expanded in turn.
+	Each project's metadata is looked up once, however many of the requirements refer to it,
+	and the lookups for different projects are performed concurrently.
+
+	The ``extra`` clauses are removed from the markers of the returned requirements,
+	and the remainder combined with the marker of the requirement the extra was requested by.
+
+	:param requirements:
+	:param max_workers: The maximum number of projects to look up at once.
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+	"""
+
+	expanded: Dict[str, Set[str]] = defaultdict(set)
+	extra_requirements: List[ComparableRequirement] = []
+	pending = list(requirements)
+
+	with ThreadPoolExecutor(max_workers, thread_name_prefix="mkrecipe-metadata") as executor:
+		while pending:
+			todo: List[Tuple[ComparableRequirement, Set[str]]] = []
+			specifiers: Dict[str, SpecifierSet] = {}
+
+			for requirement in pending:
+				name = normalize(requirement.name)
+				extras = {normalize(extra) for extra in requirement.extras} - expanded[name]
+
+				if requirement.url or not extras:
+					continue
+
+				expanded[name].update(extras)
+				todo.append((requirement, extras))
+				specifiers[name] = specifiers.get(name, SpecifierSet()) & requirement.specifier
+
+			futures = {
+					name: executor.submit(get_requires_dist, name, specifier, session)
+					for name, specifier in specifiers.items()
+					}
+			pending = []
+
+			for requirement, extras in todo:
+				for entry in futures[normalize(requirement.name)].result() or ():
+					extra_requirement = _requirement_for_extras(entry, extras, requirement.marker)
+					if extra_requirement is not None:
+						extra_requirements.append(extra_requirement)
+						pending.append(extra_requirement)
+
+	return extra_requirements
+
+
+def clear_cache(*project_name: str) -> None:
+	r"""
+	Clear the cached metadata.
+
+	:param \*project_name: The name(s) of the projects to clear the cache for.
+
+	If no arguments are given the cache is cleared for all projects.
+	"""
+
+	cache_dir = get_cache_dir("metadata")
+
+	if project_name:
+		names = {normalize(name) for name in project_name}
+		filenames = [filename for name in names for filename in (cache_dir / name).glob("*.json")]
+	else:
+		names = set()
+		filenames = list(cache_dir.glob("*/*.json"))
+
+	for filename in filenames:
+		filename.unlink()
+
+	for key in list(_requires_dist):
+		if not names or key[0] in names:
+			del _requires_dist[key]
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+#
+#  network.py
+"""
+Make, account for, and limit the network requests made when creating recipes.
+
+The requests are made with a :class:`~.Session`, which keeps connections alive between requests.
+
+All requests to PyPI (or the index given by :envvar:`MKRECIPE_INDEX_URL`) and to the conda channels
+are recorded in the process-wide :class:`~.NetworkStats` returned by :func:`~.get_stats`,
+grouped by service (``pypi`` or ``conda``).
+Requests to a local mirror are not network requests and are not recorded.
+
+Each lookup of data which can be cached (project pages, wheel metadata and conda channel indexes)
+is recorded as either a cache hit or a cache miss.
+A lookup whose cached copy is revalidated with the server (returning ``304 Not Modified``)
+counts as both a request and a cache hit.
+
+Setting :attr:`NetworkStats.max_requests` limits the total number of requests.
+Once the limit is reached further requests raise :exc:`~.RequestBudgetExceeded` instead of being sent,
+so a large batch stops before the servers start rate-limiting it.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import atexit
+import io
+import mimetypes
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, NamedTuple, Optional
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+# 3rd party
+import requests
+from domdf_python_tools.paths import PathPlus
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+__all__ = (
+		"NetworkStats",
+		"RequestBudgetExceeded",
+		"ServiceStats",
+		"Session",
+		"get_session",
+		"get_stats",
+		"total",
+		)
+
+
+class RequestBudgetExceeded(Exception):
+	"""
+	Raised when a request would exceed :attr:`NetworkStats.max_requests`.
+
+	:param max_requests: The maximum number of requests.
+	"""
+
+	def __init__(self, max_requests: int):
+		super().__init__(f"The budget of {max_requests} network requests has been used up.")
+
+		#: The maximum number of requests.
+		self.max_requests: int = max_requests
+
+
+class ServiceStats(NamedTuple):
+	"""
+	The network requests made to a service.
+	"""
+
+	#: The number of requests made.
+	requests: int = 0
+
+	#: The number of bytes received in response bodies.
+	bytes: int = 0  # noqa: A003  # pylint: disable=redefined-builtin
+
+	#: The total time spent waiting for responses, in seconds.
+	latency: float = 0.0
+
+	#: The number of lookups answered from the cache, including those revalidated with the server.
+	cache_hits: int = 0
+
+	#: The number of lookups whose data had to be downloaded.
+	cache_misses: int = 0
+
+	@property
+	def cache_hit_ratio(self) -> Optional[float]:
+		"""
+		The proportion of lookups answered from the cache, or :py:obj:`None` if there were no lookups.
+		"""
+
+		lookups = self.cache_hits + self.cache_misses
+		return self.cache_hits / lookups if lookups else None
+
+
+class NetworkStats:
+	"""
+	Records the network requests made to each service.
+
+	Requests may be recorded from several threads at once.
+
+	:param max_requests: The maximum number of requests which may be made.
+	"""
+
+	def __init__(self, max_requests: Optional[int] = None):
+		#: Mapping of service names to the requests made to them.
+		self.services: Dict[str, ServiceStats] = {}
+
+		#: The maximum number of requests which may be made, or :py:obj:`None` for no limit.
+		self.max_requests: Optional[int] = max_requests
+
+		self._lock = threading.Lock()
+
+	@property
+	def requests(self) -> int:
+		"""
+		The total number of requests made to all services.
+		"""
+
+		with self._lock:
+			return sum(stats.requests for stats in self.services.values())
+
+	def _update(self, service: str, **values: Any) -> None:
+		# Must be called with the lock held.
+		stats = self.services.get(service, ServiceStats())
+		self.services[service] = stats._replace(**{key: getattr(stats, key) + value for key, value in values.items()})
+
+	def start_request(self, service: str) -> None:
+		"""
+		Count a request to ``service`` which is about to be sent.
+
+		:param service:
+
+		:raises RequestBudgetExceeded: if the request would exceed :attr:`~.max_requests`.
+		"""
+
+		with self._lock:
+			if self.max_requests is not None:
+				if sum(stats.requests for stats in self.services.values()) >= self.max_requests:
+					raise RequestBudgetExceeded(self.max_requests)
+
+			self._update(service, requests=1)
+
+	def record_response(self, service: str, size: int, latency: float) -> None:
+		"""
+		Record the response to a request to ``service``.
+
+		:param service:
+		:param size: The size of the response body, in bytes.
+		:param latency: The time spent waiting for the response, in seconds.
+		"""
+
+		with self._lock:
+			self._update(service, bytes=size, latency=latency)
+
+	def record_lookup(self, service: str, cached: bool) -> None:
+		"""
+		Record a lookup of data which can be cached.
+
+		:param service:
+		:param cached: Whether the lookup was answered from the cache.
+		"""
+
+		with self._lock:
+			if cached:
+				self._update(service, cache_hits=1)
+			else:
+				self._update(service, cache_misses=1)
+
+	def reset(self) -> None:
+		"""
+		Discard the recorded requests and lookups. :attr:`~.max_requests` is unchanged.
+		"""
+
+		with self._lock:
+			self.services.clear()
+
+	def as_dict(self) -> Dict[str, Dict[str, Any]]:
+		"""
+		Returns the recorded requests as a JSON-serialisable mapping of service names to mappings with the keys
+		``requests``, ``bytes``, ``latency``, ``cache_hits``, ``cache_misses`` and ``cache_hit_ratio``.
+		"""  # noqa: D400
+
+		with self._lock:
+			return {
+					service: {**stats._asdict(), "cache_hit_ratio": stats.cache_hit_ratio}
+					for service, stats in self.services.items()
+					}
+
+
+_stats = NetworkStats()
+
+
+def get_stats() -> NetworkStats:
+	"""
+	Returns the :class:`~.NetworkStats` recording the requests made by this process.
+	"""
+
+	return _stats
+
+
+def total(stats: Iterable[Mapping[str, Mapping[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+	"""
+	Add up the requests made by several processes, such as the worker processes in batch mode.
+
+	:param stats: The requests made by each process, as returned by :meth:`NetworkStats.as_dict`.
+
+	:returns: The combined requests, in the same format.
+	"""
+
+	totals: Dict[str, ServiceStats] = {}
+
+	for process_stats in stats:
+		for service, values in process_stats.items():
+			current = totals.get(service, ServiceStats())
+			totals[service] = ServiceStats(*(a + values[field] for field, a in zip(ServiceStats._fields, current)))
+
+	return {
+			service: {**service_stats._asdict(), "cache_hit_ratio": service_stats.cache_hit_ratio}
+			for service, service_stats in totals.items()
+			}
+
+
+class _LocalFileAdapter(BaseAdapter):
+	# Serves ``file://`` URLs, so a simple index on the filesystem can be used in place of PyPI.
+	# As with a web server, the page for a directory is the ``index.html`` file within it.
+
+	def send(self, request: requests.PreparedRequest, *args, **kwargs) -> requests.Response:  # noqa: MAN002
+		path = PathPlus(url2pathname(urlparse(str(request.url)).path))
+		if path.is_dir():
+			path = path / "index.html"
+
+		response = requests.Response()
+		response.request = request
+		response.url = request.url  # type: ignore[assignment]
+
+		try:
+			response.raw = io.BytesIO(path.read_bytes())
+		except OSError:
+			response.status_code = 404
+			response.raw = io.BytesIO()
+		else:
+			response.status_code = 200
+			response.headers["Content-Type"] = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+		return response
+
+	def close(self) -> None:
+		pass
+
+
+class Session(requests.Session):
+	"""
+	An HTTP session which keeps a pool of connections to each host alive between requests.
+
+	A single session is shared by all the lookups made by a :class:`mkrecipe.resolver.Resolver`,
+	and may be used from several threads at once.
+
+	:param pool_size: The maximum number of connections to keep alive to each host.
+		This should be at least the number of threads making requests at once.
+	:param connect_timeout: The time in seconds to wait for a connection to be established.
+	:param read_timeout: The time in seconds to wait for the server to send data.
+	"""
+
+	def __init__(self, pool_size: int = 10, connect_timeout: float = 10, read_timeout: float = 60):
+		super().__init__()
+
+		#: The time in seconds to wait for a connection to be established.
+		self.connect_timeout: float = connect_timeout
+
+		#: The time in seconds to wait for the server to send data.
+		self.read_timeout: float = read_timeout
+
+		adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+		self.mount("http://", adapter)
+		self.mount("https://", adapter)
+		self.mount("file://", _LocalFileAdapter())
+
+	def fetch(self, service: str, url: str, **kwargs: Any) -> requests.Response:
+		r"""
+		Send a ``GET`` request to ``service``, recording it in the stats returned by :func:`~.get_stats`.
+
+		Requests for ``file://`` URLs are not network requests, and are not recorded.
+
+		:param service: The name of the service, such as ``pypi`` or ``conda``.
+		:param url:
+		:param \*\*kwargs: Keyword arguments for :meth:`requests.Session.get`.
+
+		:raises RequestBudgetExceeded: if the request would exceed :attr:`NetworkStats.max_requests`.
+		"""
+
+		kwargs.setdefault("timeout", (self.connect_timeout, self.read_timeout))
+
+		if url.startswith("file:"):
+			return self.get(url, **kwargs)
+
+		_stats.start_request(service)
+
+		start = time.perf_counter()
+		size = 0
+
+		try:
+			response = self.get(url, **kwargs)
+
+			if "Content-Length" in response.headers:
+				size = int(response.headers["Content-Length"])
+			elif not kwargs.get("stream", False):
+				size = len(response.content)
+
+			return response
+		finally:
+			_stats.record_response(service, size, time.perf_counter() - start)
+
+
+_session = Session()
+atexit.register(_session.close)
+
+
+def get_session() -> Session:
+	"""
+	Returns the process-wide :class:`~.Session`, which is used by the default :class:`mkrecipe.resolver.Resolver`
+	and by the lookups in :mod:`mkrecipe.pypi`, :mod:`mkrecipe.conda` and :mod:`mkrecipe.metadata`
+	when no session is given.
+	"""  # noqa: D400
+
+	return _session
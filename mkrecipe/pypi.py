@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+#
+#  pypi.py
+"""
+Lookup release artifacts on PyPI, with a persistent on-disk cache.
+
+The files for each release are obtained from PyPI's :pep:`691` Simple API
+(or the :pep:`503` HTML variant if the index does not support JSON),
+and cached in the user's cache directory for :envvar:`MKRECIPE_CACHE_TTL` seconds.
+Each index has its own cache, so switching between indexes never serves the files found in another.
+Once that time has elapsed the entry is revalidated with a conditional request
+using the ``ETag`` and ``Last-Modified`` headers from the original response.
+
+A local mirror of PyPI (a :pep:`503` simple index on the filesystem) can be used instead
+by setting :envvar:`MKRECIPE_INDEX_URL` to the path of the index or a ``file://`` URL.
+Lookups against a local index are never cached, so the results always reflect the current contents of the mirror.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import urldefrag, urljoin, urlparse
+from urllib.request import url2pathname
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus
+from packaging.requirements import InvalidRequirement
+from packaging.tags import Tag, sys_tags
+from packaging.utils import (
+		InvalidSdistFilename,
+		InvalidWheelFilename,
+		parse_sdist_filename,
+		parse_wheel_filename,
+		)
+from packaging.version import InvalidVersion, Version
+from shippinglabel import normalize
+
+# this package
+from mkrecipe import network
+from mkrecipe._cache import get_cache_dir, get_cache_ttl, read_json, write_json
+
+__all__ = (
+		"NotYetPublished",
+		"PYPI_SIMPLE_URL",
+		"ReleaseFile",
+		"ReleaseNotFound",
+		"clear_cache",
+		"get_index_url",
+		"get_project_files",
+		"get_release_files",
+		"get_sdist",
+		"get_sdist_url",
+		"get_sha256",
+		"get_wheel_url",
+		"parse_project_page",
+		)
+
+PYPI_SIMPLE_URL = "https://pypi.org/simple/"
+"""
+The base URL of PyPI's Simple API.
+"""
+
+_accept = "application/vnd.pypi.simple.v1+json, application/vnd.pypi.simple.v1+html;q=0.2, text/html;q=0.01"
+_chunk_size = 65536
+
+# Held while fetching the files for each cache file, so concurrent lookups
+# (such as of the sdist and wheel of the same release) only fetch the project page once.
+_fetch_locks: Dict[PathPlus, threading.Lock] = defaultdict(threading.Lock)
+_fetch_locks_lock = threading.Lock()
+
+
+class ReleaseNotFound(InvalidRequirement):
+	"""
+	Raised when the requested release of a project cannot be found on PyPI.
+	"""
+
+
+class NotYetPublished(ReleaseNotFound):
+	"""
+	Raised when the requested release cannot be found on PyPI, but may yet be published.
+
+	This is the case when the project does not exist, or when all published versions are older than the one requested.
+	"""
+
+
+class ReleaseFile(NamedTuple):
+	"""
+	A file belonging to a release on PyPI.
+	"""
+
+	#: The name of the file.
+	filename: str
+
+	#: The URL the file can be downloaded from.
+	url: str
+
+	#: Mapping of hash names to hex digests of the file's contents.
+	hashes: Dict[str, str]
+
+	#: The ``Requires-Python`` value for the file, if any.
+	requires_python: Optional[str] = None
+
+	#: Whether the file has been yanked.
+	yanked: bool = False
+
+	#: Mapping of hash names to hex digests of the file's core metadata, which is available from
+	#: the file's URL with ``.metadata`` appended (see :pep:`658`), or :py:obj:`None` if it is not available.
+	core_metadata: Optional[Dict[str, str]] = None
+
+	@property
+	def version(self) -> Optional[Version]:
+		"""
+		The version of the project the file belongs to,
+		or :py:obj:`None` if it cannot be determined from the filename.
+		"""  # noqa: D400
+
+		try:
+			if self.filename.endswith(".whl"):
+				return parse_wheel_filename(self.filename)[1]
+			else:
+				return parse_sdist_filename(self.filename)[1]
+		except (InvalidSdistFilename, InvalidWheelFilename, InvalidVersion):
+			return None
+
+
+def get_index_url() -> str:
+	"""
+	Returns the base URL of the simple index to look up release files in.
+
+	This is :data:`~.PYPI_SIMPLE_URL` unless overridden by the :envvar:`MKRECIPE_INDEX_URL` environment variable,
+	which may be a URL or the path to a local mirror.
+	"""
+
+	index_url = os.environ.get("MKRECIPE_INDEX_URL") or PYPI_SIMPLE_URL
+
+	if "://" not in index_url:
+		index_url = PathPlus(index_url).abspath().as_uri()
+
+	if not index_url.endswith('/'):
+		index_url = f"{index_url}/"
+
+	return index_url
+
+
+def clear_cache(*project_name: str) -> None:
+	r"""
+	Clear the cached release files.
+
+	:param \*project_name: The name(s) of the projects to clear the cache for.
+
+	If no arguments are given the cache is cleared for all projects.
+	"""
+
+	cache_dir = get_cache_dir("pypi")
+
+	# The cache for each index is in its own subdirectory.
+	if project_name:
+		filenames = [filename for name in project_name for filename in cache_dir.glob(f"*/{normalize(name)}/*.json")]
+	else:
+		filenames = list(cache_dir.glob("*/*/*.json"))
+
+	for filename in filenames:
+		filename.unlink()
+
+
+class _LinkParser(HTMLParser):
+
+	def __init__(self) -> None:
+		super().__init__()
+		self.links: List[Dict[str, Optional[str]]] = []
+		self._current: Optional[Dict[str, Optional[str]]] = None
+
+	def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+		if tag == 'a':
+			self._current = {**dict(attrs), "text": ''}
+
+	def handle_data(self, data: str) -> None:
+		if self._current is not None:
+			self._current["text"] = f"{self._current['text']}{data}"
+
+	def handle_endtag(self, tag: str) -> None:
+		if tag == 'a' and self._current is not None:
+			self.links.append(self._current)
+			self._current = None
+
+
+def parse_project_page(content: Union[str, bytes], content_type: str, page_url: str) -> List[ReleaseFile]:
+	"""
+	Parse a project page from a :pep:`503` or :pep:`691` simple repository.
+
+	:param content: The body of the page.
+	:param content_type: The value of the page's ``Content-Type`` header.
+	:param page_url: The URL of the page, used to resolve relative links.
+	"""
+
+	files = []
+
+	if "json" in content_type:
+		for file in json.loads(content)["files"]:
+			# PEP 714 renamed the key, but some indexes only provide the old name.
+			core_metadata = file.get("core-metadata", file.get("dist-info-metadata", False))
+
+			files.append(
+					ReleaseFile(
+							filename=file["filename"],
+							url=urljoin(page_url, file["url"]),
+							hashes=file.get("hashes", {}),
+							requires_python=file.get("requires-python"),
+							yanked=bool(file.get("yanked", False)),
+							core_metadata=_parse_core_metadata(core_metadata),
+							)
+					)
+
+	else:
+		if isinstance(content, bytes):
+			content = content.decode("UTF-8")
+
+		parser = _LinkParser()
+		parser.feed(content)
+
+		for link in parser.links:
+			if not link.get("href"):
+				continue
+
+			url, fragment = urldefrag(urljoin(page_url, link["href"]))
+			hashes = {}
+
+			if '=' in fragment:
+				hash_name, digest = fragment.split('=', 1)
+				hashes[hash_name] = digest
+
+			files.append(
+					ReleaseFile(
+							filename=(link["text"] or url.rsplit('/', 1)[-1]).strip(),
+							url=url,
+							hashes=hashes,
+							requires_python=link.get("data-requires-python"),
+							yanked="data-yanked" in link,
+							core_metadata=_parse_core_metadata(
+									link.get("data-core-metadata", link.get("data-dist-info-metadata", False)),
+									),
+							)
+					)
+
+	return files
+
+
+def _parse_core_metadata(value: Union[bool, str, Dict[str, str], None]) -> Optional[Dict[str, str]]:
+	# The value is a mapping of hashes (JSON), "<hash name>=<digest>" or "true" (HTML),
+	# or a boolean indicating whether the metadata is available without giving its hash.
+
+	if isinstance(value, dict):
+		return value
+	elif value is True or value == "true":
+		return {}
+	elif isinstance(value, str) and '=' in value:
+		hash_name, digest = value.split('=', 1)
+		return {hash_name: digest}
+	else:
+		return None
+
+
+def _index_key() -> str:
+	# Identifies the index in the names of cache directories.
+	return hashlib.sha256(get_index_url().encode("UTF-8")).hexdigest()[:16]
+
+
+def _get_cache_file(name: str, version: Version) -> PathPlus:
+	return get_cache_dir("pypi", _index_key(), normalize(name)) / f"{version}.json"
+
+
+def _get_project_cache_file(name: str) -> PathPlus:
+	return get_cache_dir("pypi", _index_key(), normalize(name)) / "project.json"
+
+
+def _fetch_release_files(name: str, version: Version, session: network.Session) -> List[ReleaseFile]:
+
+	def select(all_files: List[ReleaseFile]) -> List[ReleaseFile]:
+		files = [file for file in all_files if file.version == version]
+
+		if not files:
+			msg = f"No such project/version {name!r} {version}"
+			published_versions = [v for v in (file.version for file in all_files) if v is not None]
+
+			if published_versions and max(published_versions) > version:
+				raise ReleaseNotFound(msg)
+			else:
+				raise NotYetPublished(msg)
+
+		return files
+
+	return _fetch_files(name, _get_cache_file(name, version), select, session)
+
+
+def _fetch_files(
+		name: str,
+		cache_file: PathPlus,
+		select: Callable[[List[ReleaseFile]], List[ReleaseFile]],
+		session: network.Session,
+		) -> List[ReleaseFile]:
+	# Fetch the project page, and cache the files chosen from it by ``select``.
+
+	with _fetch_locks_lock:
+		lock = _fetch_locks[cache_file]
+
+	with lock:
+		return _fetch_and_cache(name, cache_file, select, session)
+
+
+def _fetch_and_cache(
+		name: str,
+		cache_file: PathPlus,
+		select: Callable[[List[ReleaseFile]], List[ReleaseFile]],
+		session: network.Session,
+		) -> List[ReleaseFile]:
+	project_name = normalize(name)
+	page_url = urljoin(get_index_url(), f"{project_name}/")
+	use_cache = not page_url.startswith("file:")
+
+	cached = read_json(cache_file) if use_cache else None
+
+	if cached is not None and time.time() - cached["fetched"] < get_cache_ttl():
+		network.get_stats().record_lookup("pypi", cached=True)
+		return [ReleaseFile(**file) for file in cached["files"]]
+
+	headers = {"Accept": _accept}
+
+	if cached is not None:
+		if cached.get("etag"):
+			headers["If-None-Match"] = cached["etag"]
+		if cached.get("last_modified"):
+			headers["If-Modified-Since"] = cached["last_modified"]
+
+	response = session.fetch("pypi", page_url, headers=headers)
+
+	if use_cache:
+		network.get_stats().record_lookup("pypi", cached=response.status_code == 304 and cached is not None)
+
+	if response.status_code == 304 and cached is not None:
+		cached["fetched"] = time.time()
+		write_json(cache_file, cached)
+		return [ReleaseFile(**file) for file in cached["files"]]
+	elif response.status_code == 404:
+		raise NotYetPublished(f"No such project {name!r}")
+
+	response.raise_for_status()
+
+	files = select(
+			parse_project_page(
+					response.content,
+					response.headers.get("Content-Type", "text/html"),
+					response.url,
+					)
+			)
+
+	if not use_cache:
+		return files
+
+	write_json(
+			cache_file,
+			{
+					"fetched": time.time(),
+					"etag": response.headers.get("ETag"),
+					"last_modified": response.headers.get("Last-Modified"),
+					"files": [file._asdict() for file in files],
+					},
+			)
+
+	return files
+
+
+def get_release_files(
+		name: str,
+		version: Union[str, int, Version],
+		session: Optional[network.Session] = None,
+		) -> List[ReleaseFile]:
+	"""
+	Returns the files for the given release of the project on PyPI (or the index given by :func:`~.get_index_url`).
+
+	:param name: The name of the project on PyPI.
+	:param version:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+
+	:raises:
+
+		* :exc:`~.ReleaseNotFound` if the version cannot be found on PyPI.
+		* :exc:`~.NotYetPublished` if the project or version cannot be found on PyPI, but may be published later.
+		* :exc:`requests.HTTPError` if an error occurs when communicating with PyPI.
+	"""
+
+	if session is None:
+		session = network.get_session()
+
+	return _fetch_release_files(name, Version(str(version)), session)
+
+
+def get_project_files(name: str, session: Optional[network.Session] = None) -> List[ReleaseFile]:
+	"""
+	Returns the files for all releases of the project on PyPI (or the index given by :func:`~.get_index_url`).
+
+	:param name: The name of the project on PyPI.
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+
+	:raises:
+
+		* :exc:`~.NotYetPublished` if the project cannot be found on PyPI.
+		* :exc:`requests.HTTPError` if an error occurs when communicating with PyPI.
+	"""
+
+	if session is None:
+		session = network.get_session()
+
+	return _fetch_files(name, _get_project_cache_file(name), list, session)
+
+
+def get_sdist(name: str, version: Union[str, int, Version], session: Optional[network.Session] = None) -> ReleaseFile:
+	"""
+	Returns the project's source distribution on PyPI.
+
+	If no ``.tar.gz`` source distribution is found this function may return a ``.zip`` sdist or a wheel.
+
+	:param name: The name of the project on PyPI.
+	:param version:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+	"""
+
+	files = get_release_files(name, version, session)
+
+	for extension in (".tar.gz", ".zip"):
+		for file in files:
+			if file.filename.endswith(extension):
+				return file
+
+	return files[0]
+
+
+def get_sdist_url(name: str, version: Union[str, int, Version], session: Optional[network.Session] = None) -> str:
+	"""
+	Returns the URL of the project's source distribution on PyPI.
+
+	If no ``.tar.gz`` source distribution is found this function may return a ``.zip`` sdist or a wheel.
+
+	:param name: The name of the project on PyPI.
+	:param version:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+	"""
+
+	return get_sdist(name, version, session).url
+
+
+def get_sha256(file: ReleaseFile, session: Optional[network.Session] = None) -> str:
+	"""
+	Returns the SHA256 digest of the given release file.
+
+	The digest published by the index is used where available, so the file is not downloaded.
+	Otherwise, such as with a local mirror which doesn't list digests, the file is hashed as it is read,
+	without holding the whole file in memory.
+
+	:param file:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+
+	:raises requests.HTTPError: if an error occurs when downloading the file.
+	"""
+
+	if file.hashes.get("sha256"):
+		return file.hashes["sha256"].lower()
+
+	sha256 = hashlib.sha256()
+
+	if file.url.startswith("file:"):
+		with open(url2pathname(urlparse(file.url).path), "rb") as fp:
+			for chunk in iter(lambda: fp.read(_chunk_size), b''):
+				sha256.update(chunk)
+
+	else:
+		if session is None:
+			session = network.get_session()
+
+		# The digest is of the file as stored, so it must not be decompressed in transit.
+		headers = {"Accept-Encoding": "identity"}
+
+		with session.fetch("pypi", file.url, headers=headers, stream=True) as response:
+			response.raise_for_status()
+			for chunk in response.iter_content(_chunk_size):
+				sha256.update(chunk)
+
+	return sha256.hexdigest()
+
+
+def get_wheel_url(name: str, version: Union[str, int, Version], session: Optional[network.Session] = None) -> str:
+	"""
+	Returns the URL of the project's wheel on PyPI which best matches the current platform.
+
+	If no wheels are found this function may return a source distribution.
+
+	:param name: The name of the project on PyPI.
+	:param version:
+	:param session: The session to make requests with. Defaults to :func:`mkrecipe.network.get_session`.
+	"""
+
+	files = get_release_files(name, version, session)
+	tag_url_map: Dict[Tag, str] = {}
+
+	for file in files:
+		if file.filename.endswith(".whl"):
+			for tag in parse_wheel_filename(file.filename)[3]:
+				tag_url_map.setdefault(tag, file.url)
+
+	for tag in sys_tags():
+		if tag in tag_url_map:
+			return tag_url_map[tag]
+
+	return files[0].url
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+#
+#  recipe.py
+"""
+A structured representation of a conda ``meta.yaml`` recipe.
+
+:meth:`MaryBerry.get_recipe() <mkrecipe.MaryBerry.get_recipe>` returns a :class:`~.Recipe`,
+whose fields can be modified before it is serialised with :meth:`Recipe.to_yaml() <.Recipe.to_yaml>`.
+This avoids rendering the recipe and then parsing it again to make changes.
+
+The serialised recipe is identical to the one created from the template by :func:`mkrecipe.make_recipe`,
+but is serialised directly rather than by rendering the template, which is several times faster.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+__all__ = ("About", "Build", "Extra", "Package", "Recipe", "Requirements", "Source", "Test")
+
+
+@dataclass
+class Package:
+	"""
+	The ``package`` section of a recipe.
+	"""
+
+	#: The name of the conda package.
+	name: str
+
+	#: The version of the conda package.
+	version: str
+
+
+@dataclass
+class Source:
+	"""
+	The ``source`` section of a recipe.
+	"""
+
+	#: The URL of the source distribution.
+	url: str
+
+	#: The SHA256 digest of the source distribution.
+	sha256: Optional[str] = None
+
+
+@dataclass
+class Build:
+	"""
+	The ``build`` section of a recipe.
+	"""
+
+	#: The command which installs the package.
+	script: str
+
+	#: The type of ``noarch`` package.
+	noarch: str = "python"
+
+
+@dataclass
+class Requirements:
+	"""
+	The ``requirements`` section of a recipe.
+	"""
+
+	#: The requirements to build the package.
+	build: List[str] = field(default_factory=list)
+
+	#: The requirements of the environment the package is installed into while it is built.
+	host: List[str] = field(default_factory=list)
+
+	#: The requirements to run the package.
+	run: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Test:
+	"""
+	The ``test`` section of a recipe.
+	"""
+
+	#: The modules which must be importable once the package is installed.
+	imports: List[str] = field(default_factory=list)
+
+
+@dataclass
+class About:
+	"""
+	The ``about`` section of a recipe.
+	"""
+
+	#: A short summary of the package.
+	summary: str
+
+	#: The full description of the package.
+	description: str
+
+	#: The package's license.
+	license: Optional[str] = None  # noqa: A003  # pylint: disable=redefined-builtin
+
+	#: Mapping of the keys ``home``, ``dev_url`` and ``doc_url`` to URLs.
+	urls: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Extra:
+	"""
+	The ``extra`` section of a recipe.
+	"""
+
+	#: The names of the package's maintainers.
+	maintainers: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Recipe:
+	"""
+	A conda ``meta.yaml`` recipe.
+	"""
+
+	package: Package
+
+	#: The ``source`` section. This is :py:obj:`None` for packages built from wheels, which are installed by URL.
+	source: Optional[Source]
+
+	build: Build
+	requirements: Requirements
+	test: Test
+	about: About
+	extra: Extra
+
+	def to_yaml(self) -> str:
+		"""
+		Serialise the recipe as YAML.
+		"""
+
+		lines = [
+				"package:",
+				f"  name: {_quote(self.package.name)}",
+				f"  version: {_quote(self.package.version)}",
+				'',
+				]
+
+		if self.source is not None:
+			lines.extend(["source:", f"  url: {_quote(self.source.url)}"])
+			if self.source.sha256:
+				lines.append(f"  sha256: {self.source.sha256}")
+			lines.append('')
+
+		lines.extend([
+				"build:",
+				f"  noarch: {self.build.noarch}",
+				f"  script: {_quote(self.build.script)}",
+				'',
+				"requirements:",
+				"  build:",
+				*(f"    - {requirement}" for requirement in self.requirements.build),
+				"  host:",
+				*(f"    - {requirement}" for requirement in self.requirements.host),
+				"  run:",
+				*(f"    - {requirement}" for requirement in self.requirements.run),
+				'',
+				"test:",
+				"  imports:",
+				*(f"    - {module}" for module in self.test.imports),
+				'',
+				"about:",
+				f"  license: {_quote(self.about.license)}" if self.about.license else '',
+				f"  summary: {_quote(self.about.summary)}",
+				f"  description: {_quote(self.about.description)}",
+				*(f"  {key}: {url!r}" for key, url in self.about.urls.items()),
+				'',
+				"extra:",
+				"  maintainers:",
+				*(f"    - {name!r}" for name in self.extra.maintainers),
+				'',
+				])
+
+		return '\n'.join(lines)
+
+
+def _quote(value: str) -> str:
+	# Double quoted, as in the template, without trailing whitespace on any lines of multi-line values.
+	if '\n' in value:
+		value = '\n'.join(line.rstrip() for line in value.split('\n'))
+	return f'"{value}"'
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+#
+#  resolver.py
+"""
+:mod:`asyncio` engine for the network lookups needed to create a recipe.
+
+The lookups are performed by a pool of worker threads, sharing the pooled HTTP connections
+of :mod:`mkrecipe.pypi` and :mod:`mkrecipe.conda`, so independent lookups
+(such as the artifact URL and the index of each conda channel) run concurrently
+without blocking the event loop.
+
+.. versionadded:: 0.10.0
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import Callable, Dict, Iterable, List, Optional, Type, TypeVar, Union
+
+# 3rd party
+from domdf_python_tools.stringlist import DelimitedList
+from packaging.version import Version
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from mkrecipe import conda, network, pypi
+
+__all__ = ("Resolver", "get_resolver")
+
+_T = TypeVar("_T")
+
+
+class Resolver:
+	"""
+	Performs the network lookups needed to create a recipe concurrently.
+
+	:param max_workers: The maximum number of lookups to perform at once.
+	:param session: The session to make requests with, which keeps connections alive between lookups.
+		Give a :class:`mkrecipe.network.Session` to configure the size of its connection pool and its timeouts.
+		If not given the process-wide session from :func:`mkrecipe.network.get_session` is used.
+
+	The worker threads are started when first needed, and stopped by :meth:`~.Resolver.close`.
+	The session is not closed, so it may be shared with other resolvers.
+	"""
+
+	def __init__(self, max_workers: int = 8, session: Optional[network.Session] = None) -> None:
+		self.max_workers = max_workers
+
+		#: The session used for every lookup made by the resolver.
+		self.session = network.get_session() if session is None else session
+
+		self._executor: Optional[ThreadPoolExecutor] = None
+		self._lock = threading.Lock()
+
+	def _get_executor(self) -> ThreadPoolExecutor:
+		with self._lock:
+			if self._executor is None:
+				self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="mkrecipe")
+			return self._executor
+
+	async def run(self, func: Callable[..., _T], *args) -> _T:
+		r"""
+		Run a blocking function in the resolver's pool of worker threads.
+
+		:param func:
+		:param \*args: Positional arguments to pass to ``func``.
+		"""
+
+		loop = asyncio.get_running_loop()
+		return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args))
+
+	async def get_sdist_url(self, name: str, version: Union[str, int, Version]) -> str:
+		"""
+		Returns the URL of the project's source distribution on PyPI.
+
+		:param name: The name of the project on PyPI.
+		:param version:
+		"""
+
+		return await self.run(pypi.get_sdist_url, name, version, self.session)
+
+	async def get_sdist(self, name: str, version: Union[str, int, Version]) -> pypi.ReleaseFile:
+		"""
+		Returns the project's source distribution on PyPI.
+
+		:param name: The name of the project on PyPI.
+		:param version:
+		"""
+
+		return await self.run(pypi.get_sdist, name, version, self.session)
+
+	async def get_wheel_url(self, name: str, version: Union[str, int, Version]) -> str:
+		"""
+		Returns the URL of the project's wheel on PyPI which best matches the current platform.
+
+		:param name: The name of the project on PyPI.
+		:param version:
+		"""
+
+		return await self.run(pypi.get_wheel_url, name, version, self.session)
+
+	async def get_channel_indexes(self, conda_channels: Iterable[str]) -> List[Dict[str, List[str]]]:
+		"""
+		Returns the indexes of the given conda channels, which are loaded concurrently.
+
+		:param conda_channels:
+		"""
+
+		indexes = [self.run(conda.get_channel_index, channel, self.session) for channel in conda_channels]
+		return list(await asyncio.gather(*indexes))
+
+	async def validate_requirements(
+			self,
+			requirements: Iterable[ComparableRequirement],
+			conda_channels: Iterable[str],
+			) -> List[ComparableRequirement]:
+		"""
+		Ensure that all requirements are available from the given conda channels,
+		and normalize the names to those in the conda channel.
+
+		:param requirements:
+		:param conda_channels:
+		"""  # noqa: D400
+
+		channels = DelimitedList(conda_channels)
+		indexes = await self.get_channel_indexes(channels)
+
+		return conda._validate_against(requirements, channels, indexes)
+
+	def close(self) -> None:
+		"""
+		Stop the resolver's worker threads.
+		"""
+
+		with self._lock:
+			if self._executor is not None:
+				self._executor.shutdown(wait=True)
+				self._executor = None
+
+	def __enter__(self) -> "Resolver":
+		return self
+
+	def __exit__(
+			self,
+			exc_type: Optional[Type[BaseException]],
+			exc_val: Optional[BaseException],
+			exc_tb: Optional[TracebackType],
+			) -> None:
+		self.close()
+
+
+_default_resolver = Resolver()
+
+
+def get_resolver() -> Resolver:
+	"""
+	Returns the process-wide default :class:`~.Resolver`.
+	"""
+
+	return _default_resolver
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+#
+#  retry.py
+"""
+Policies for retrying failed lookups.
+
+Failures are retried with exponential backoff and jitter, honouring any ``Retry-After`` header sent by the server.
+Three kinds of failure are distinguished:
+
+* transient errors (connection errors, timeouts, rate limiting and server errors), which are retried;
+* releases which have not yet been published (:exc:`~mkrecipe.pypi.NotYetPublished`),
+  which are retried in case the release is in the process of being uploaded;
+* everything else, including releases which will never be published (:exc:`~mkrecipe.pypi.ReleaseNotFound`),
+  which fail immediately.
+
+.. versionadded:: 0.10.0
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import asyncio
+import copy
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+# 3rd party
+import requests
+from click import echo
+
+# this package
+from mkrecipe.pypi import NotYetPublished
+
+__all__ = ("RetryPolicy", "is_transient")
+
+_T = TypeVar("_T")
+
+
+def is_transient(exception: BaseException) -> bool:
+	"""
+	Returns whether the exception represents a transient error which is worth retrying.
+
+	:param exception:
+	"""
+
+	if isinstance(exception, (requests.ConnectionError, requests.Timeout)):
+		return True
+	elif isinstance(exception, requests.HTTPError) and exception.response is not None:
+		status_code = exception.response.status_code
+		return status_code in {408, 429} or status_code >= 500
+	else:
+		return False
+
+
+def _get_retry_after(exception: BaseException) -> Optional[float]:
+	response = getattr(exception, "response", None)
+	if response is None:
+		return None
+
+	retry_after = response.headers.get("Retry-After")
+	if not retry_after:
+		return None
+
+	try:
+		return max(float(retry_after), 0)
+	except ValueError:
+		pass
+
+	try:
+		return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+	except (TypeError, ValueError):
+		return None
+
+
+class RetryPolicy:
+	"""
+	Determines whether, and after how long, failed lookups are retried.
+
+	:param attempts: The maximum number of attempts.
+	:param base_delay: The delay in seconds before the first retry. This doubles with each subsequent retry.
+	:param max_delay: The maximum delay in seconds between attempts.
+	:param jitter: Whether to randomise the delays, to avoid many workers retrying in lockstep.
+	:param deadline: The maximum time in seconds to spend on each project, including retries.
+		This is counted from when :meth:`~.for_project` was called,
+		or from the start of each call if the policy is not for a single project.
+	:param global_deadline: A time (as given by :func:`time.time`) after which no further attempts are made.
+		This can be shared between the projects in a batch.
+	:param retry_not_published: Whether to retry lookups for releases which have not yet been published.
+	"""
+
+	def __init__(
+			self,
+			attempts: int = 4,
+			base_delay: float = 1.0,
+			max_delay: float = 10.0,
+			jitter: bool = True,
+			deadline: Optional[float] = None,
+			global_deadline: Optional[float] = None,
+			retry_not_published: bool = True,
+			) -> None:
+		self.attempts = attempts
+		self.base_delay = base_delay
+		self.max_delay = max_delay
+		self.jitter = jitter
+		self.deadline = deadline
+		self.global_deadline = global_deadline
+		self.retry_not_published = retry_not_published
+		self._started: Optional[float] = None
+
+	@classmethod
+	def from_environment(cls, **kwargs: Any) -> "RetryPolicy":
+		r"""
+		Construct a :class:`~.RetryPolicy` configured from environment variables.
+
+		The number of retries is given by :envvar:`MKRECIPE_HTTP_RETRIES`,
+		the maximum delay by :envvar:`MKRECIPE_RETRY_DELAY`,
+		the per-project deadline by :envvar:`MKRECIPE_DEADLINE`,
+		and the global deadline (counted from now) by :envvar:`MKRECIPE_GLOBAL_DEADLINE`.
+
+		:param \*\*kwargs: Keyword arguments for the class, which override the values from the environment.
+		"""
+
+		if "MKRECIPE_HTTP_RETRIES" in os.environ:
+			kwargs.setdefault("attempts", int(os.environ["MKRECIPE_HTTP_RETRIES"]) + 1)
+		if "MKRECIPE_RETRY_DELAY" in os.environ:
+			kwargs.setdefault("max_delay", float(os.environ["MKRECIPE_RETRY_DELAY"]))
+		if "MKRECIPE_DEADLINE" in os.environ:
+			kwargs.setdefault("deadline", float(os.environ["MKRECIPE_DEADLINE"]))
+		if "MKRECIPE_GLOBAL_DEADLINE" in os.environ:
+			kwargs.setdefault("global_deadline", time.time() + float(os.environ["MKRECIPE_GLOBAL_DEADLINE"]))
+
+		return cls(**kwargs)
+
+	def for_project(self) -> "RetryPolicy":
+		"""
+		Returns a copy of the policy for looking up a single project, whose :attr:`~.deadline` starts now.
+
+		The deadline is shared between all the calls made with the returned policy.
+		"""
+
+		policy = copy.copy(self)
+		policy._started = time.time()
+		return policy
+
+	def should_retry(self, exception: BaseException) -> bool:
+		"""
+		Returns whether a call which raised the given exception should be retried.
+
+		:param exception:
+		"""
+
+		if isinstance(exception, NotYetPublished):
+			return self.retry_not_published
+		else:
+			return is_transient(exception)
+
+	def get_delay(self, attempt: int, exception: Optional[BaseException] = None) -> float:
+		"""
+		Returns the time in seconds to wait before the next attempt.
+
+		:param attempt: The number of the attempt which failed, starting from zero.
+		:param exception: The exception raised by the failed attempt.
+		"""
+
+		delay = min(self.base_delay * 2**attempt, self.max_delay)
+
+		if self.jitter:
+			delay = random.uniform(delay / 2, delay)  # nosec: B311
+
+		if exception is not None:
+			retry_after = _get_retry_after(exception)
+			if retry_after is not None:
+				delay = max(delay, retry_after)
+
+		return delay
+
+	def _get_deadline(self, start: float) -> Optional[float]:
+		if self.deadline is None:
+			return self.global_deadline
+
+		deadline = (start if self._started is None else self._started) + self.deadline
+
+		if self.global_deadline is None:
+			return deadline
+		else:
+			return min(deadline, self.global_deadline)
+
+	def _next_delay(self, attempt: int, exception: BaseException, deadline: Optional[float]) -> Optional[float]:
+		# Returns None if the call should not be retried.
+
+		if attempt + 1 >= self.attempts or not self.should_retry(exception):
+			return None
+
+		delay = self.get_delay(attempt, exception)
+
+		if deadline is not None and time.time() + delay >= deadline:
+			return None
+
+		echo(f"{exception} Trying again in {delay:.1f}s", err=True)
+
+		return delay
+
+	def call(self, func: Callable[..., _T], *args: Any) -> _T:
+		r"""
+		Call ``func`` with the given arguments, retrying as permitted by the policy.
+
+		:param func:
+		:param \*args: Positional arguments to pass to ``func``.
+
+		:raises: The exception raised by the final attempt.
+		"""
+
+		deadline = self._get_deadline(time.time())
+		attempt = 0
+
+		while True:
+			try:
+				return func(*args)
+			except Exception as e:
+				delay = self._next_delay(attempt, e, deadline)
+				if delay is None:
+					raise
+
+			time.sleep(delay)
+			attempt += 1
+
+	async def acall(self, func: Callable[..., Awaitable[_T]], *args: Any) -> _T:
+		r"""
+		Await ``func`` with the given arguments, retrying as permitted by the policy.
+
+		:param func:
+		:param \*args: Positional arguments to pass to ``func``.
+
+		:raises: The exception raised by the final attempt.
+		"""
+
+		deadline = self._get_deadline(time.time())
+		attempt = 0
+
+		while True:
+			try:
+				return await func(*args)
+			except Exception as e:
+				delay = self._next_delay(attempt, e, deadline)
+				if delay is None:
+					raise
+
+			await asyncio.sleep(delay)
+			attempt += 1
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+#
+#  server.py
+"""
+A long-running service which creates recipes on request.
+
+The server keeps the parsed recipe template and the PyPI and conda channel caches warm in memory between requests,
+and handles requests concurrently, each in its own thread.
+It listens on either a localhost TCP port or a Unix socket, and speaks plain HTTP:
+
+.. code-block:: bash
+
+	$ mkrecipe --serve unix:/tmp/mkrecipe.sock &
+	$ curl --unix-socket /tmp/mkrecipe.sock http://localhost/recipe -d '{"project": "/path/to/project"}'
+
+Recipes are requested with a ``POST`` to ``/recipe`` with a JSON object containing either:
+
+* ``project`` -- the path to a project directory on the server, or
+* ``pyproject`` -- the content of a ``pyproject.toml`` file,
+  and optionally ``requirements`` -- the content of a ``requirements.txt`` file.
+
+The optional key ``type`` gives the type of release artifact to build the conda package from,
+either ``sdist`` (the default) or ``wheel``.
+
+The response is the ``meta.yaml`` recipe. If the recipe cannot be created the response is a
+JSON object with the key ``error``, with the status ``400`` for invalid requests and configuration,
+``404`` if the release could not be found, or ``500`` for other errors.
+A ``GET`` request to ``/health`` can be used to check the server is running.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import json
+import os
+import socketserver
+import stat
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Mapping, Optional, Tuple, Type, Union
+
+# 3rd party
+from dom_toml.parser import BadConfigError
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from mkrecipe import MaryBerry
+from mkrecipe.pypi import ReleaseNotFound
+from mkrecipe.retry import RetryPolicy
+from mkrecipe.template import get_template
+
+__all__ = ("BadRequest", "make_server", "parse_address", "render_recipe", "serve")
+
+
+class BadRequest(ValueError):
+	"""
+	Raised for requests which are malformed.
+	"""
+
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+	"""
+	Parse the address for the server to listen on.
+
+	The address may be ``unix:<path>`` for a Unix socket,
+	or ``<host>:<port>`` or ``<port>`` for a TCP socket (listening on ``127.0.0.1`` by default).
+
+	:param address:
+
+	:returns: The path to the Unix socket, or a ``(host, port)`` tuple.
+	"""
+
+	if address.startswith("unix:"):
+		path = address[5:]
+		if not path:
+			raise ValueError("No path given for the Unix socket.")
+		return path
+
+	host, _, port = address.rpartition(':')
+
+	try:
+		return host or "127.0.0.1", int(port)
+	except ValueError:
+		raise ValueError(f"Invalid address {address!r}") from None
+
+
+def render_recipe(request: Mapping[str, Any], retry_policy: Optional[RetryPolicy] = None) -> str:
+	"""
+	Create the recipe for a request to the server.
+
+	:param request: The decoded JSON body of the request.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+
+	:raises BadRequest: if the request is malformed.
+
+	:returns: The ``meta.yaml`` recipe as a string.
+	"""
+
+	if not isinstance(request, Mapping):
+		raise BadRequest("The request must be a JSON object.")
+
+	artifact_type = request.get("type", "sdist")
+	if artifact_type not in {"sdist", "wheel"}:
+		raise BadRequest(f"Unknown artifact type {artifact_type!r}")
+
+	if isinstance(request.get("project"), str):
+		return _render(PathPlus(request["project"]), artifact_type, retry_policy)
+
+	elif isinstance(request.get("pyproject"), str):
+		requirements = request.get("requirements", '')
+		if not isinstance(requirements, str):
+			raise BadRequest("'requirements' must be a string.")
+
+		with tempfile.TemporaryDirectory() as tmpdir:
+			project_dir = PathPlus(tmpdir)
+			(project_dir / "pyproject.toml").write_text(request["pyproject"])
+			(project_dir / "requirements.txt").write_text(requirements)
+			return _render(project_dir, artifact_type, retry_policy)
+
+	else:
+		raise BadRequest("Either 'project' or 'pyproject' must be given.")
+
+
+def _render(project_dir: PathPlus, artifact_type: str, retry_policy: Optional[RetryPolicy]) -> str:
+	berry = MaryBerry(project_dir, retry_policy)
+
+	if artifact_type == "sdist":
+		return berry.make()
+	else:
+		return berry.make_for_wheel()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+
+	server: "_RecipeServerMixin"  # type: ignore[assignment]
+
+	def address_string(self) -> str:
+		if isinstance(self.client_address, str):
+			# Unix socket
+			return self.client_address or "unix"
+		return super().address_string()
+
+	def _send(self, status: int, content_type: str, body: str) -> None:
+		data = body.encode("UTF-8")
+		self.send_response(status)
+		self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+		self.send_header("Content-Length", str(len(data)))
+		self.end_headers()
+		self.wfile.write(data)
+
+	def _send_error(self, status: int, exception: BaseException) -> None:
+		self._send(status, "application/json", json.dumps({"error": f"{type(exception).__name__}: {exception}"}))
+
+	def do_GET(self) -> None:  # noqa: N802
+		if self.path == "/health":
+			self._send(200, "text/plain", "OK")
+		else:
+			self._send(404, "application/json", json.dumps({"error": f"Not Found: {self.path}"}))
+
+	def do_POST(self) -> None:  # noqa: N802
+		if self.path != "/recipe":
+			self._send(404, "application/json", json.dumps({"error": f"Not Found: {self.path}"}))
+			return
+
+		try:
+			length = int(self.headers.get("Content-Length", 0))
+			request = json.loads(self.rfile.read(length).decode("UTF-8"))
+			recipe = render_recipe(request, self.server.retry_policy)
+		except (ValueError, KeyError, BadConfigError, FileNotFoundError) as e:
+			# Includes BadRequest, JSON decoding errors and invalid configuration.
+			if isinstance(e, ReleaseNotFound) or isinstance(e.__cause__, ReleaseNotFound):
+				self._send_error(404, e)
+			else:
+				self._send_error(400, e)
+		except Exception as e:  # pylint: disable=broad-except
+			self._send_error(500, e)
+		else:
+			self._send(200, "text/yaml", recipe)
+
+
+class _RecipeServerMixin:
+	retry_policy: Optional[RetryPolicy] = None
+	daemon_threads = True
+
+
+class _TCPServer(_RecipeServerMixin, ThreadingHTTPServer):
+	pass
+
+
+class _UnixServer(_RecipeServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+	def __init__(self, socket_path: str, handler_class: Type[BaseHTTPRequestHandler]) -> None:
+		# Set before the base class binds the socket.
+		self.socket_path = socket_path
+		super().__init__(socket_path, handler_class)
+
+	def server_bind(self) -> None:
+		# Remove the socket left behind by a previous server.
+		try:
+			if stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+				os.unlink(self.socket_path)
+		except FileNotFoundError:
+			pass
+
+		super().server_bind()
+
+	def server_close(self) -> None:
+		super().server_close()
+
+		try:
+			os.unlink(self.socket_path)
+		except FileNotFoundError:
+			pass
+
+
+def make_server(address: str, retry_policy: Optional[RetryPolicy] = None) -> socketserver.BaseServer:
+	"""
+	Create the server, without starting it.
+
+	:param address: The address to listen on. See :func:`~.parse_address` for the format.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+		If not given the policy is configured from environment variables.
+
+	:returns: A server whose :meth:`~socketserver.BaseServer.serve_forever` method handles requests until
+		:meth:`~socketserver.BaseServer.shutdown` is called.
+	"""
+
+	server_address = parse_address(address)
+	server: _RecipeServerMixin
+
+	if isinstance(server_address, str):
+		server = _UnixServer(server_address, _RequestHandler)
+	else:
+		server = _TCPServer(server_address, _RequestHandler)
+
+	server.retry_policy = retry_policy or RetryPolicy.from_environment()
+
+	# Parse the template now rather than on the first request.
+	get_template()
+
+	return server
+
+
+def serve(address: str, retry_policy: Optional[RetryPolicy] = None) -> None:
+	"""
+	Run the server until interrupted.
+
+	:param address: The address to listen on. See :func:`~.parse_address` for the format.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+		If not given the policy is configured from environment variables.
+	"""
+
+	with make_server(address, retry_policy) as server:
+		try:
+			server.serve_forever()
+		except KeyboardInterrupt:
+			pass
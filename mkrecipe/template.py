@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+#
+#  template.py
+"""
+The compiled ``meta.yaml`` recipe template.
+
+The template is compiled once per process and shared between all :class:`~mkrecipe.MaryBerry` instances.
+It can also be precompiled into Python modules with :func:`~.compile_template`,
+which are loaded instead of the template source if the :envvar:`MKRECIPE_TEMPLATE_MODULES`
+environment variable points to the directory containing them.
+
+.. versionadded:: 0.10.0
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import os
+from functools import lru_cache
+from typing import Optional
+
+# 3rd party
+from domdf_python_tools.compat import importlib_resources
+from domdf_python_tools.typing import PathLike
+from jinja2 import BaseLoader, DictLoader, Environment, ModuleLoader, StrictUndefined, Template
+
+__all__ = ("TEMPLATE_NAME", "compile_template", "get_template", "read_template_source")
+
+TEMPLATE_NAME = "recipe_template.ymlt"
+"""
+The name of the recipe template within the :mod:`mkrecipe` package.
+"""
+
+
+def _make_environment(loader: BaseLoader) -> Environment:
+	return Environment(loader=loader, undefined=StrictUndefined)  # nosec: B701
+
+
+@lru_cache(1)
+def read_template_source() -> str:
+	"""
+	Returns the source of the recipe template.
+	"""
+
+	return importlib_resources.read_text("mkrecipe", TEMPLATE_NAME)
+
+
+@lru_cache()
+def _load_template(module_dir: Optional[str]) -> Template:
+	if module_dir:
+		return _make_environment(ModuleLoader(module_dir)).get_template(TEMPLATE_NAME)
+	else:
+		return _make_environment(DictLoader({TEMPLATE_NAME: read_template_source()})).get_template(TEMPLATE_NAME)
+
+
+def get_template() -> Template:
+	"""
+	Returns the compiled recipe template.
+
+	The template is only compiled on the first call; subsequent calls return the same object.
+
+	If the :envvar:`MKRECIPE_TEMPLATE_MODULES` environment variable is set,
+	the precompiled template is loaded from that directory rather than being compiled from source.
+	"""
+
+	return _load_template(os.environ.get("MKRECIPE_TEMPLATE_MODULES"))
+
+
+def compile_template(target: PathLike) -> None:
+	"""
+	Precompile the recipe template into a Python module in the ``target`` directory.
+
+	The directory can then be used with the :envvar:`MKRECIPE_TEMPLATE_MODULES` environment variable.
+
+	.. attention::
+
+		The compiled module is specific to the installed versions of ``mkrecipe`` and ``jinja2``,
+		and must be recompiled whenever either is upgraded.
+
+	:param target:
+	"""
+
+	environment = _make_environment(DictLoader({TEMPLATE_NAME: read_template_source()}))
+	environment.compile_templates(os.fspath(target), zip=None, ignore_errors=False)
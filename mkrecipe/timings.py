@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+#
+#  timings.py
+"""
+Measure the time spent in each phase of creating a recipe.
+
+:class:`~mkrecipe.MaryBerry` records the wall and CPU time of each phase in its :attr:`~mkrecipe.MaryBerry.timings`.
+The phases are:
+
+* ``load_config`` -- parsing ``pyproject.toml`` and ``requirements.txt``.
+* ``pypi_lookup`` -- looking up the release artifact on PyPI, including retries.
+* ``sha256`` -- computing the digest of the source distribution, if the index does not publish it
+  (only when the :conf:`sha256` option is enabled).
+* ``prepare_requirements`` -- filtering the requirements, and expanding the extras of dependencies.
+* ``validate_requirements`` -- validating the requirements against the conda channels.
+* ``render`` -- rendering the recipe.
+* ``write`` -- writing the recipe file (by :func:`mkrecipe.make_recipe` and :func:`mkrecipe.make_recipes`).
+
+A :class:`~.Timings` object can be passed to :class:`~mkrecipe.MaryBerry` or :func:`mkrecipe.make_recipes`
+to collect the timings of several recipes, or subclassed to receive each measurement as it is made.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Sequence
+
+__all__ = ("PhaseTiming", "Timings", "summarise")
+
+
+class PhaseTiming(NamedTuple):
+	"""
+	The total time spent in a phase.
+	"""
+
+	#: The elapsed wall-clock time, in seconds.
+	wall: float
+
+	#: The CPU time used by the thread the phase ran in, in seconds.
+	cpu: float
+
+	#: The number of times the phase ran.
+	calls: int = 1
+
+
+class Timings:
+	"""
+	Records the wall and CPU time spent in each phase of creating a recipe.
+
+	Measurements may be recorded from several threads at once.
+	"""
+
+	def __init__(self) -> None:
+		#: Mapping of phase names to the total time spent in them, in the order the phases first ran.
+		self.phases: Dict[str, PhaseTiming] = {}
+		self._lock = threading.Lock()
+
+	@contextmanager
+	def phase(self, name: str) -> Iterator[None]:
+		"""
+		Context manager which measures the time spent in its body as the phase ``name``.
+
+		The time is recorded even if the body raises an exception.
+
+		:param name:
+		"""
+
+		wall, cpu = time.perf_counter(), time.thread_time()
+
+		try:
+			yield
+		finally:
+			self.record(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+	def record(self, name: str, wall: float, cpu: float) -> None:
+		"""
+		Add a measurement of the phase ``name`` to the totals.
+
+		Override this method to receive each measurement as it is made.
+
+		:param name:
+		:param wall: The elapsed wall-clock time, in seconds.
+		:param cpu: The CPU time used, in seconds.
+		"""
+
+		with self._lock:
+			if name in self.phases:
+				total = self.phases[name]
+				self.phases[name] = PhaseTiming(total.wall + wall, total.cpu + cpu, total.calls + 1)
+			else:
+				self.phases[name] = PhaseTiming(wall, cpu)
+
+	def as_dict(self) -> Dict[str, Dict[str, float]]:
+		"""
+		Returns the totals as a JSON-serialisable mapping of phase names to mappings
+		with the keys ``wall``, ``cpu`` and ``calls``.
+		"""  # noqa: D400
+
+		with self._lock:
+			return {name: timing._asdict() for name, timing in self.phases.items()}
+
+
+def _percentile(values: Sequence[float], percent: float) -> float:
+	# Linear interpolation between the closest ranks, as with numpy's default method.
+
+	values = sorted(values)
+	position = (len(values) - 1) * percent / 100
+	lower, upper = math.floor(position), math.ceil(position)
+	return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def summarise(timings: Iterable[Mapping[str, Mapping[str, float]]]) -> Dict[str, Dict[str, float]]:
+	"""
+	Summarise the timings of several recipes, such as those created in batch mode.
+
+	:param timings: The timings of each recipe, as returned by :meth:`Timings.as_dict`.
+
+	:returns: A mapping of phase names to mappings with the keys ``calls`` (the number of recipes which
+		included the phase) and ``wall_p50``, ``wall_p95``, ``cpu_p50`` and ``cpu_p95``
+		(the median and 95th percentile times, in seconds).
+	"""
+
+	wall: Dict[str, List[float]] = {}
+	cpu: Dict[str, List[float]] = {}
+
+	for recipe_timings in timings:
+		for name, timing in recipe_timings.items():
+			wall.setdefault(name, []).append(timing["wall"])
+			cpu.setdefault(name, []).append(timing["cpu"])
+
+	return {
+			name: {
+					"calls": len(wall[name]),
+					"wall_p50": _percentile(wall[name], 50),
+					"wall_p95": _percentile(wall[name], 95),
+					"cpu_p50": _percentile(cpu[name], 50),
+					"cpu_p95": _percentile(cpu[name], 95),
+					}
+			for name in wall
+			}
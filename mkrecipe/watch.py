@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+#
+#  watch.py
+"""
+Recreate a recipe whenever the project's configuration changes.
+
+The ``pyproject.toml`` and ``requirements.txt`` files are watched with ``inotify`` on Linux,
+or by polling their modification times elsewhere.
+The process stays alive between changes, and only the stages of the recipe affected by a change are rerun:
+the URL of the release artifact is looked up again only if the project's name or version changes,
+and the requirements are validated again only if they (or the conda channels) change.
+
+.. versionadded:: 0.10.0
+.. autosummary-widths:: 5/16 11/16
+"""
+#
+#  Copyright © 2026 Dominic Davis-Foster <dominic@davis-foster.co.uk>
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in all
+#  copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+#  MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+#  IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,
+#  DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR
+#  OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE
+#  OR OTHER DEALINGS IN THE SOFTWARE.
+#
+
+# stdlib
+import abc
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from io import StringIO
+from typing import Dict, Generator, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# 3rd party
+from domdf_python_tools.paths import PathPlus, clean_writer
+from domdf_python_tools.typing import PathLike
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from mkrecipe.retry import RetryPolicy
+
+__all__ = (
+		"FileWatcher",
+		"InotifyWatcher",
+		"PollingWatcher",
+		"RecipeSession",
+		"WatchResult",
+		"get_watcher",
+		"watch",
+		)
+
+# The configuration keys which affect the runtime requirements.
+_requirements_keys = (
+		"dependencies",
+		"optional-dependencies",
+		"extras",
+		"conda-channels",
+		"min-python-version",
+		"max-python-version",
+		"expand-extras",
+		)
+
+
+class FileWatcher(abc.ABC):
+	"""
+	Base class for watching files for changes.
+
+	:param files: The files to watch. The files need not exist yet.
+	"""
+
+	def __init__(self, files: Iterable[PathLike]) -> None:
+		self.files = [PathPlus(file).abspath() for file in files]
+
+	@abc.abstractmethod
+	def wait(self, timeout: Optional[float] = None) -> bool:
+		"""
+		Wait for one of the files to be created, modified or deleted.
+
+		:param timeout: The maximum time to wait, in seconds. If :py:obj:`None` wait indefinitely.
+
+		:returns: :py:obj:`True` if a file changed, or :py:obj:`False` if the timeout expired.
+		"""
+
+	def close(self) -> None:
+		"""
+		Stop watching the files.
+		"""
+
+	def __enter__(self) -> "FileWatcher":
+		return self
+
+	def __exit__(self, *args) -> None:  # noqa: MAN002
+		self.close()
+
+
+class PollingWatcher(FileWatcher):
+	"""
+	Watches files by polling their modification times and sizes.
+
+	:param files: The files to watch. The files need not exist yet.
+	:param interval: The time in seconds between polls.
+	"""
+
+	def __init__(self, files: Iterable[PathLike], interval: float = 0.2) -> None:
+		super().__init__(files)
+		self.interval = interval
+		self._state = self._snapshot()
+
+	def _snapshot(self) -> Dict[PathPlus, Optional[Tuple[int, int]]]:
+		state: Dict[PathPlus, Optional[Tuple[int, int]]] = {}
+
+		for file in self.files:
+			try:
+				stat = file.stat()
+				state[file] = (stat.st_mtime_ns, stat.st_size)
+			except OSError:
+				state[file] = None
+
+		return state
+
+	def wait(self, timeout: Optional[float] = None) -> bool:  # noqa: D102
+		deadline = None if timeout is None else time.monotonic() + timeout
+
+		while True:
+			state = self._snapshot()
+			if state != self._state:
+				self._state = state
+				return True
+
+			if deadline is not None and time.monotonic() >= deadline:
+				return False
+
+			time.sleep(self.interval)
+
+
+# Constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_event_header = struct.Struct("iIII")
+
+
+class InotifyWatcher(FileWatcher):
+	"""
+	Watches files using the Linux ``inotify`` API.
+
+	The directories containing the files are watched, so files which are replaced
+	(as many editors do when saving) continue to be watched.
+
+	:param files: The files to watch. The files need not exist yet.
+
+	:raises OSError: if ``inotify`` is not available.
+	"""
+
+	#: The time in seconds to wait for further events after a change, so a burst of changes is reported once.
+	debounce: float = 0.05
+
+	def __init__(self, files: Iterable[PathLike]) -> None:
+		super().__init__(files)
+
+		if not sys.platform.startswith("linux"):
+			raise OSError("inotify is only available on Linux.")
+
+		libc = ctypes.CDLL(ctypes.util.find_library('c') or "libc.so.6", use_errno=True)
+		self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+		if self._fd < 0:
+			raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+		self._names: Dict[int, Set[str]] = {}
+		mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+
+		try:
+			for directory in {file.parent for file in self.files}:
+				wd = libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+				if wd < 0:
+					errno = ctypes.get_errno()
+					raise OSError(errno, f"Cannot watch {directory.as_posix()!r}: {os.strerror(errno)}")
+				self._names[wd] = {file.name for file in self.files if file.parent == directory}
+		except BaseException:
+			os.close(self._fd)
+			raise
+
+	def _read_events(self, timeout: Optional[float]) -> Optional[bool]:
+		# Returns whether any of the events were for a watched file, or None if the timeout expired.
+
+		readable, _, _ = select.select([self._fd], [], [], timeout)
+		if not readable:
+			return None
+
+		changed = False
+
+		try:
+			data = os.read(self._fd, 65536)
+		except BlockingIOError:  # pragma: no cover
+			return False
+
+		offset = 0
+		while offset < len(data):
+			wd, _, _, length = _event_header.unpack_from(data, offset)
+			offset += _event_header.size
+			name = data[offset:offset + length].rstrip(b'\0').decode(sys.getfilesystemencoding())
+			offset += length
+			changed = changed or name in self._names.get(wd, ())
+
+		return changed
+
+	def wait(self, timeout: Optional[float] = None) -> bool:  # noqa: D102
+		deadline = None if timeout is None else time.monotonic() + timeout
+
+		while True:
+			remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+			changed = self._read_events(remaining)
+
+			if changed is None:
+				return False
+			elif changed:
+				while self._read_events(self.debounce) is not None:
+					pass
+				return True
+
+	def close(self) -> None:  # noqa: D102
+		if self._fd >= 0:
+			os.close(self._fd)
+			self._fd = -1
+
+
+def get_watcher(files: Iterable[PathLike]) -> FileWatcher:
+	"""
+	Returns an :class:`~.InotifyWatcher` for the given files if possible, or a :class:`~.PollingWatcher` otherwise.
+
+	:param files:
+	"""
+
+	files = list(files)
+
+	try:
+		return InotifyWatcher(files)
+	except (OSError, AttributeError):
+		return PollingWatcher(files)
+
+
+class WatchResult(NamedTuple):
+	"""
+	The outcome of recreating a recipe in watch mode.
+	"""
+
+	#: Whether the recipe file was written. This is :py:obj:`False` if its content did not change, or on error.
+	written: bool
+
+	#: The time taken to recreate the recipe, in seconds.
+	elapsed: float
+
+	#: A description of the error which occurred, or :py:obj:`None` if the recipe was created successfully.
+	error: Optional[str] = None
+
+
+class RecipeSession:
+	"""
+	Recreates a recipe, reusing the results of earlier stages when the inputs to them are unchanged.
+
+	:param project_dir: The project directory.
+	:param recipe_file: The file to save the recipe as.
+	:param artifact_type: The type of release artifact to build the conda package from.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+	"""
+
+	def __init__(
+			self,
+			project_dir: PathLike,
+			recipe_file: PathLike,
+			artifact_type: str = "sdist",
+			retry_policy: Optional[RetryPolicy] = None,
+			) -> None:
+
+		if artifact_type not in {"sdist", "wheel"}:
+			raise ValueError(f"Unknown artifact type {artifact_type!r}")
+
+		self.project_dir = PathPlus(project_dir)
+		self.recipe_file = PathPlus(recipe_file)
+		self.artifact_type = artifact_type
+		self.retry_policy = retry_policy
+
+		self._artifact: Optional[Tuple[Tuple[str, str, bool], Tuple[str, Optional[str]]]] = None
+		self._requirements: Optional[Tuple[str, List[ComparableRequirement]]] = None
+
+	def make(self) -> str:
+		"""
+		Make the recipe, reusing the artifact URL and requirements from the previous call if possible.
+
+		:returns: The ``meta.yaml`` recipe as a string.
+		"""
+
+		# this package
+		from mkrecipe import MaryBerry
+
+		berry = MaryBerry(self.project_dir, self.retry_policy)
+
+		artifact_key = (berry.config["name"], str(berry.config["version"]), berry.config["sha256"])
+		if self._artifact is None or self._artifact[0] != artifact_key:
+			if self.artifact_type == "sdist":
+				self._artifact = (artifact_key, berry.get_sdist())
+			else:
+				self._artifact = (artifact_key, (berry.get_wheel_url(), None))
+
+		requirements_key = repr([berry.config[key] for key in _requirements_keys])
+		if self._requirements is None or self._requirements[0] != requirements_key:
+			self._requirements = (requirements_key, berry.get_runtime_requirements())
+
+		url, sha256 = self._artifact[1]
+
+		if self.artifact_type == "sdist":
+			return berry.render_sdist(url, self._requirements[1], sha256)
+		else:
+			return berry.render_wheel(url, self._requirements[1])
+
+	def update(self) -> WatchResult:
+		"""
+		Recreate the recipe, writing it to :attr:`~.recipe_file` if it has changed.
+		"""
+
+		start = time.perf_counter()
+
+		try:
+			buf = StringIO()
+			clean_writer(self.make(), buf)
+			recipe = buf.getvalue()
+		except Exception as e:  # pylint: disable=broad-except
+			return WatchResult(False, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+		written = not (self.recipe_file.is_file() and self.recipe_file.read_text() == recipe)
+
+		if written:
+			self.recipe_file.parent.maybe_make(parents=True)
+			self.recipe_file.write_text(recipe)
+
+		return WatchResult(written, time.perf_counter() - start)
+
+
+def watch(
+		project_dir: PathLike,
+		recipe_file: PathLike,
+		artifact_type: str = "sdist",
+		retry_policy: Optional[RetryPolicy] = None,
+		watcher: Optional[FileWatcher] = None,
+		) -> Generator[WatchResult, None, None]:
+	"""
+	Create the recipe, and recreate it each time the project's configuration changes.
+
+	Errors (such as an invalid ``pyproject.toml`` file) are reported in the results rather than raised,
+	so watching continues until the configuration is fixed.
+
+	:param project_dir: The project directory.
+	:param recipe_file: The file to save the recipe as.
+	:param artifact_type: The type of release artifact to build the conda package from.
+	:param retry_policy: The policy for retrying failed lookups on PyPI.
+	:param watcher: The :class:`~.FileWatcher` to use. By default the one returned by :func:`~.get_watcher`.
+
+	:returns: A generator over the result of creating the recipe initially and after each change.
+		Close the generator to stop watching.
+	"""
+
+	project_dir = PathPlus(project_dir)
+	session = RecipeSession(project_dir, recipe_file, artifact_type, retry_policy)
+
+	if watcher is None:
+		watcher = get_watcher([project_dir / "pyproject.toml", project_dir / "requirements.txt"])
+
+	with watcher:
+		yield session.update()
+
+		while True:
+			if watcher.wait():
+				yield session.update()
@@ -1 +1,29 @@
+# stdlib
+from typing import Iterator
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe.network import NetworkStats
+
 pytest_plugins = ("coincidence", )
+
+
+@pytest.fixture()
+def cache_dir(tmp_pathplus: PathPlus, monkeypatch: MonkeyPatch) -> PathPlus:
+	monkeypatch.setenv("MKRECIPE_CACHE_DIR", (tmp_pathplus / "cache").as_posix())
+	return tmp_pathplus / "cache"
+
+
+@pytest.fixture()
+def stand_in_server(monkeypatch: MonkeyPatch, cache_dir: PathPlus) -> Iterator[StandInServer]:
+	with StandInServer() as server:
+		monkeypatch.setattr("mkrecipe.pypi.PYPI_SIMPLE_URL", f"{server.url}simple/")
+		monkeypatch.setattr("mkrecipe.conda.CONDA_URL", f"{server.url}conda/")
+		monkeypatch.setattr("mkrecipe.conda._indexes", {})
+		monkeypatch.setattr("mkrecipe.network._stats", NetworkStats())
+		yield server
@@ -0,0 +1,153 @@
+# stdlib
+import os
+from typing import Any, Dict
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from dom_toml.parser import BadConfigError
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import batch
+from mkrecipe.batch import BatchJob, BatchResult, load_manifest, run_batch
+from tests.example_configs import MINIMAL_CONFIG
+
+
+def test_load_manifest(tmp_pathplus: PathPlus) -> None:
+	(tmp_pathplus / "manifest.toml").write_lines([
+			"[[recipe]]",
+			'project = "consolekit"',
+			'',
+			"[[recipe]]",
+			'project = "whey"',
+			'type = "wheel"',
+			'outfile = "recipes/whey.yaml"',
+			'',
+			"[[recipe]]",
+			'project = "hatch-requirements-txt"',
+			'type = ["sdist", "wheel"]',
+			])
+
+	assert load_manifest(tmp_pathplus / "manifest.toml") == [
+			BatchJob(
+					(tmp_pathplus / "consolekit").as_posix(),
+					("sdist", ),
+					((tmp_pathplus / "consolekit" / "conda" / "meta.yaml").as_posix(), ),
+					),
+			BatchJob(
+					(tmp_pathplus / "whey").as_posix(),
+					("wheel", ),
+					((tmp_pathplus / "recipes" / "whey.yaml").as_posix(), ),
+					),
+			BatchJob(
+					(tmp_pathplus / "hatch-requirements-txt").as_posix(),
+					("sdist", "wheel"),
+					(
+							(tmp_pathplus / "hatch-requirements-txt" / "conda" / "sdist" / "meta.yaml").as_posix(),
+							(tmp_pathplus / "hatch-requirements-txt" / "conda" / "wheel" / "meta.yaml").as_posix(),
+							),
+					),
+			]
+
+
+@pytest.mark.parametrize(
+		"manifest, match",
+		[
+				pytest.param('recipe = "consolekit"', "Invalid type for 'recipe'", id="not_array"),
+				pytest.param("[[recipe]]\ntype = 'wheel'", r"'recipe\[0\].project' must be provided", id="no_project"),
+				pytest.param(
+						"[[recipe]]\nproject = 'consolekit'\ntype = 'egg'",
+						r"Invalid value for 'recipe\[0\].type'",
+						id="bad_type",
+						),
+				pytest.param(
+						"[[recipe]]\nproject = 'consolekit'\ntype = ['sdist', 'egg']",
+						r"Invalid value for 'recipe\[0\].type'",
+						id="bad_type_array",
+						),
+				pytest.param(
+						"[[recipe]]\nproject = 'consolekit'\ntype = []",
+						r"Invalid value for 'recipe\[0\].type'",
+						id="empty_type_array",
+						),
+				],
+		)
+def test_load_manifest_errors(tmp_pathplus: PathPlus, manifest: str, match: str) -> None:
+	(tmp_pathplus / "manifest.toml").write_clean(manifest)
+
+	with pytest.raises(BadConfigError, match=match):
+		load_manifest(tmp_pathplus / "manifest.toml")
+
+
+@pytest.mark.parametrize("threads", [False, True])
+def test_run_batch_failures(tmp_pathplus: PathPlus, threads: bool) -> None:
+	(tmp_pathplus / "no-requirements").mkdir()
+	(tmp_pathplus / "no-requirements" / "pyproject.toml").write_clean(MINIMAL_CONFIG)
+	(tmp_pathplus / "empty").mkdir()
+
+	jobs = [
+			BatchJob((tmp_pathplus / "no-requirements").as_posix()),
+			BatchJob((tmp_pathplus / "empty").as_posix(), ("wheel", )),
+			]
+
+	results = sorted(run_batch(jobs, max_workers=2, threads=threads))
+	assert [result.job for result in results] == sorted(jobs)
+	assert not any(result.success for result in results)
+	assert results[0].error is not None
+	assert results[0].error.startswith("FileNotFoundError: ")
+	# The phase which failed is still timed.
+	assert all(list(result.timings or ()) == ["load_config"] for result in results)
+	# Network requests are only recorded for each job when it runs in its own process.
+	assert all(result.network == (None if threads else {}) for result in results)
+	assert results[1].error == (
+			"BadConfigError: 'project.dependencies' was listed as a dynamic field "
+			"but no 'requirements.txt' file was found."
+			)
+
+
+@pytest.mark.parametrize("threads", [False, True])
+def test_run_batch_multiple_types(tmp_pathplus: PathPlus, stand_in_server: StandInServer, threads: bool) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz", "spam-2020.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	recipe_files: Dict[str, str] = {
+			"sdist": (tmp_pathplus / "sdist.yaml").as_posix(),
+			"wheel": (tmp_pathplus / "wheel.yaml").as_posix(),
+			}
+	job = BatchJob(tmp_pathplus.as_posix(), tuple(recipe_files), tuple(recipe_files.values()))
+	(result, ) = run_batch([job], max_workers=1, threads=threads)
+
+	assert result.success, result.error
+	assert result.written == {"sdist": True, "wheel": True}
+	assert "spam-2020.0.0.tar.gz" in (tmp_pathplus / "sdist.yaml").read_text()
+	assert "spam-2020.0.0-py3-none-any.whl" in (tmp_pathplus / "wheel.yaml").read_text()
+
+	# The project is resolved once for both recipes.
+	assert result.timings is not None
+	assert result.timings["load_config"]["calls"] == 1
+	assert result.timings["validate_requirements"]["calls"] == 1
+	assert stand_in_server.requests.count("/simple/spam/") == 1
+
+
+def crash(job: BatchJob, *args: Any) -> BatchResult:
+	os._exit(1)
+
+
+def test_run_batch_broken_pool(monkeypatch: MonkeyPatch) -> None:
+	monkeypatch.setattr(batch, "_run_job", crash)
+
+	jobs = [BatchJob("spam"), BatchJob("eggs")]
+	results = sorted(run_batch(jobs, max_workers=1))
+	assert [result.job for result in results] == sorted(jobs)
+	assert all((result.error or '').startswith("BrokenProcessPool: ") for result in results)
+
+
+def test_batch_result() -> None:
+	job = BatchJob("spam")
+	assert job.recipe_files == {"sdist": "conda/meta.yaml"}
+	assert BatchResult(job).success
+	assert not BatchResult(job, "ValueError: ").success
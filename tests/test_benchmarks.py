@@ -0,0 +1,37 @@
+# this package
+from benchmarks.pipeline import Result, compare, run_benchmarks, synthetic_dependencies
+
+
+def test_synthetic_dependencies() -> None:
+	dependencies = synthetic_dependencies(10)
+	assert len(dependencies) == 10
+	assert dependencies[3] == "dep-3>=3.0; python_version < '3.8'"
+
+
+def test_run_benchmarks() -> None:
+	# A smoke test at a tiny scale, to keep the benchmarks working.
+	results = run_benchmarks(dependencies=(5, 10), projects=3, repeat=1)
+
+	assert set(results) == {
+			*(f"{stage}[{count}]" for stage in (
+					"load_toml",
+					"filter_reqs_with_markers",
+					"filter_reqs_by_py_version",
+					"get_runtime_requirements",
+					"render_template",
+					"emit_recipe",
+					"recipe_to_yaml",
+					"make_recipe",
+					) for count in (5, 10)),
+			"make_recipe[3 projects, cold cache]",
+			"make_recipe[3 projects, warm cache]",
+			"import mkrecipe",
+			}
+	assert all(result["seconds"] > 0 for result in results.values())
+
+
+def test_compare() -> None:
+	baseline: Result = {"a": {"seconds": 1.0, "items": 1}, "b": {"seconds": 1.0, "items": 1}}
+	results: Result = {"a": {"seconds": 1.4, "items": 1}, "b": {"seconds": 1.6, "items": 1}, "c": {"seconds": 9, "items": 1}}
+	assert compare(results, baseline) == ["b"]
+	assert compare(results, baseline, tolerance=1.2) == ["a", "b"]
@@ -1,15 +1,20 @@
 # stdlib
+import json
 from textwrap import dedent
+from typing import Optional
 
 # 3rd party
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 from coincidence.regressions import AdvancedFileRegressionFixture
 from consolekit.testing import CliRunner, Result, _click_version
 from dom_toml.parser import BadConfigError
 from domdf_python_tools.paths import PathPlus, in_directory
 
 # this package
+from benchmarks.stand_ins import StandInServer
 from mkrecipe.__main__ import main
+from mkrecipe.watch import PollingWatcher
 from tests.example_configs import MINIMAL_CONFIG
 
 configs_dir = PathPlus(__file__).parent / "configs"
@@ -236,3 +241,242 @@ class TestHandleTracebacks:
 			Aborted!
 			""",
 					)
+
+
+def test_mkrecipe_batch_failures(tmp_pathplus: PathPlus) -> None:
+	(tmp_pathplus / "spam").mkdir()
+	(tmp_pathplus / "spam" / "pyproject.toml").write_clean(MINIMAL_CONFIG)
+	(tmp_pathplus / "eggs").mkdir()
+
+	runner = CliRunner()
+
+	with in_directory(tmp_pathplus):
+		result: Result = runner.invoke(main, args=["spam", "eggs", "--jobs", '1'])
+
+	assert result.exit_code == 1
+	assert "Failed to create recipe for 'spam': BadConfigError: " in result.stdout
+	assert "Failed to create recipe for 'eggs': FileNotFoundError: " in result.stdout
+	assert "2 of 2 recipes could not be created." in result.stdout
+
+
+def test_mkrecipe_index_url(
+		tmp_pathplus: PathPlus,
+		stand_in_server: StandInServer,
+		monkeypatch: MonkeyPatch,
+		) -> None:
+	# Restored after the test, as the CLI sets the variable for the batch mode worker processes.
+	monkeypatch.setenv("MKRECIPE_INDEX_URL", '')
+
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+	(tmp_pathplus / "mirror" / "spam").maybe_make(parents=True)
+	(tmp_pathplus / "mirror" / "spam" / "index.html").write_text(
+			'<a href="spam-2020.0.0.tar.gz#sha256=1234">spam-2020.0.0.tar.gz</a>',
+			)
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").touch()
+
+	with in_directory(tmp_pathplus):
+		runner = CliRunner()
+		result: Result = runner.invoke(main, args=["--index-url", "mirror"])
+
+	assert result.exit_code == 0, result.stdout
+	assert result.stdout == "Recipe written to 'conda/meta.yaml'\n"
+
+	sdist_url = (tmp_pathplus / "mirror" / "spam" / "spam-2020.0.0.tar.gz").as_uri()
+	assert f'url: "{sdist_url}"' in (tmp_pathplus / "conda" / "meta.yaml").read_text()
+
+
+def test_mkrecipe_incremental(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz"])
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").touch()
+
+	with in_directory(tmp_pathplus):
+		runner = CliRunner()
+		result: Result = runner.invoke(main, args=["--incremental"])
+		assert result.exit_code == 0, result.stdout
+		assert result.stdout == "Recipe written to 'conda/meta.yaml'\n"
+
+		result = runner.invoke(main, args=["--incremental"])
+		assert result.exit_code == 0, result.stdout
+		assert result.stdout == "Recipe 'conda/meta.yaml' is up to date\n"
+
+
+def test_mkrecipe_lock(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz"])
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").touch()
+
+	with in_directory(tmp_pathplus):
+		runner = CliRunner()
+		result: Result = runner.invoke(main, args=["--lock"])
+		assert result.exit_code == 0, result.stdout
+		assert (tmp_pathplus / "mkrecipe.lock").is_file()
+
+		# The recipe is created from the lockfile, so no requests are made.
+		lockfile = tmp_pathplus / "mkrecipe.lock"
+		lockfile.write_text(lockfile.read_text().replace("spam-2020.0.0.tar.gz", "eggs-2020.0.0.tar.gz"))
+		request_count = len(stand_in_server.requests)
+
+		result = runner.invoke(main)
+		assert result.exit_code == 0, result.stdout
+		assert result.stdout == "Recipe written to 'conda/meta.yaml'\n"
+		assert "/packages/eggs-2020.0.0.tar.gz" in (tmp_pathplus / "conda" / "meta.yaml").read_text()
+		assert len(stand_in_server.requests) == request_count
+
+		result = runner.invoke(main, args=["--refresh"])
+		assert result.exit_code == 0, result.stdout
+		assert "/packages/spam-2020.0.0.tar.gz" in (tmp_pathplus / "conda" / "meta.yaml").read_text()
+		assert "/packages/spam-2020.0.0.tar.gz" in lockfile.read_text()
+
+		result = runner.invoke(main, args=["--lock", "--watch"])
+		assert result.exit_code == 2
+		assert "--lock and --refresh cannot be used with --serve or --watch." in result.stdout
+
+
+def test_mkrecipe_watch(tmp_pathplus: PathPlus, stand_in_server: StandInServer, monkeypatch: MonkeyPatch) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz"])
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").touch()
+
+	class InterruptedWatcher(PollingWatcher):
+
+		def wait(self, timeout: Optional[float] = None) -> bool:
+			raise KeyboardInterrupt
+
+	monkeypatch.setattr("mkrecipe.watch.get_watcher", InterruptedWatcher)
+
+	with in_directory(tmp_pathplus):
+		runner = CliRunner()
+		result: Result = runner.invoke(main, args=["--watch"])
+		assert result.exit_code == 0, result.stdout
+		assert result.stdout.startswith("Watching '.' for changes. Press Ctrl+C to stop.\n")
+		assert "Recipe written to 'conda/meta.yaml' in " in result.stdout
+		assert (tmp_pathplus / "conda" / "meta.yaml").is_file()
+
+		result = runner.invoke(main, args=["--watch", "spam", "eggs"])
+		assert result.exit_code == 2
+		assert "--watch cannot be used with more than one project." in result.stdout
+
+
+def test_mkrecipe_serve_errors(tmp_pathplus: PathPlus) -> None:
+	runner = CliRunner()
+
+	result: Result = runner.invoke(main, args=["--serve", "8080", "spam"])
+	assert result.exit_code == 2
+	assert "--serve cannot be used with projects, --manifest or --watch." in result.stdout
+
+	result = runner.invoke(main, args=["--serve", "localhost:spam"])
+	assert result.exit_code == 2
+	assert "Invalid address 'localhost:spam'" in result.stdout
+
+
+def test_mkrecipe_multiple_types(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz", "spam-2020.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").touch()
+
+	with in_directory(tmp_pathplus):
+		runner = CliRunner()
+		result: Result = runner.invoke(main, args=["--type", "sdist,wheel"])
+		assert result.exit_code == 0, result.stdout
+		assert result.stdout == "Recipe written to 'conda/sdist/meta.yaml'\nRecipe written to 'conda/wheel/meta.yaml'\n"
+
+	assert "spam-2020.0.0.tar.gz" in (tmp_pathplus / "conda" / "sdist" / "meta.yaml").read_text()
+	assert "spam-2020.0.0-py3-none-any.whl" in (tmp_pathplus / "conda" / "wheel" / "meta.yaml").read_text()
+
+	with in_directory(tmp_pathplus):
+		result = runner.invoke(main, args=["--type", "sdist,egg"])
+		assert result.exit_code == 2
+		assert "'egg' is not one of 'sdist', 'wheel'." in result.stdout
+
+		result = runner.invoke(main, args=["--type", "sdist,wheel", "--watch"])
+		assert result.exit_code == 2
+		assert "--watch cannot be used with more than one artifact type." in result.stdout
+
+
+def test_mkrecipe_timings(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz", "spam-2020.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+
+	for project_dir in (tmp_pathplus / "spam", tmp_pathplus / "eggs"):
+		project_dir.mkdir()
+		(project_dir / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+		(project_dir / "requirements.txt").touch()
+
+	# The lookup on PyPI runs concurrently with the requirements phases, so may finish before or after them.
+	phases = {"load_config", "pypi_lookup", "prepare_requirements", "validate_requirements", "render", "write"}
+	runner = CliRunner()
+
+	with in_directory(tmp_pathplus / "spam"):
+		result: Result = runner.invoke(main, args=["--timings"])
+		assert result.exit_code == 0, result.stdout
+
+	assert result.stdout.startswith("Recipe written to 'conda/meta.yaml'\n")
+	output = json.loads(result.stdout[result.stdout.index('{'):])
+	assert output["project"] == '.'
+	assert set(output["phases"]) == phases
+	assert set(output["phases"]["render"]) == {"wall", "cpu", "calls"}
+	assert output["network"]["pypi"]["requests"] == 1
+	assert output["network"]["conda"]["cache_misses"] == 2
+
+	with in_directory(tmp_pathplus):
+		result = runner.invoke(main, args=["spam", "eggs", "--jobs", '1', "--timings", "--type", "sdist,wheel"])
+		assert result.exit_code == 0, result.stdout
+
+	output = json.loads(result.stdout[result.stdout.index('{'):])
+	assert len(output["jobs"]) == 2
+	assert output["jobs"][0]["artifact_types"] == ["sdist", "wheel"]
+	assert output["jobs"][0]["outfiles"] == ["spam/conda/sdist/meta.yaml", "spam/conda/wheel/meta.yaml"]
+	assert all(job["success"] and set(job["phases"]) == phases for job in output["jobs"])
+	assert set(output["summary"]) == phases
+	# Each project's requirements are resolved once for both of its recipes.
+	assert output["summary"]["validate_requirements"]["calls"] == 2
+	assert output["summary"]["render"]["calls"] == 2
+	assert set(output["summary"]["render"]) == {"calls", "wall_p50", "wall_p95", "cpu_p50", "cpu_p95"}
+	assert output["network"]["pypi"]["cache_hits"] == 4
+
+	with in_directory(tmp_pathplus / "spam"):
+		result = runner.invoke(main, args=["--timings", "--watch"])
+		assert result.exit_code == 2
+		assert "--timings cannot be used with --serve or --watch." in result.stdout
+
+
+def test_mkrecipe_max_requests(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz"])
+	stand_in_server.add_project("eggs", ["eggs-2020.0.0.tar.gz"])
+	stand_in_server.add_channel("conda-forge", ["setuptools", "wheel"])
+
+	for name in ("spam", "eggs"):
+		(tmp_pathplus / name).mkdir()
+		(tmp_pathplus / name / "pyproject.toml").write_clean(
+				f'{MINIMAL_CONFIG.replace("spam", name)}\ndescription = "Spam, spam, spam"',
+				)
+		(tmp_pathplus / name / "requirements.txt").touch()
+
+	runner = CliRunner()
+
+	# The project page and the conda channel index use up the budget, so the second project's lookup fails.
+	with in_directory(tmp_pathplus):
+		result: Result = runner.invoke(main, args=["spam", "eggs", "--jobs", '1', "--max-requests", '5', "--timings"])
+		assert result.exit_code == 1
+
+	assert "Recipe written to 'spam/conda/meta.yaml'" in result.stdout
+	assert "Failed to create recipe for 'eggs': RequestBudgetExceeded: " in result.stdout
+	assert "The budget of 5 network requests has been used up." in result.stdout
+	assert "1 of 2 recipes could not be created." in result.stdout
+	assert len(stand_in_server.requests) == 5
+	assert "/simple/eggs/" not in stand_in_server.requests
+
+	output = json.loads(result.stdout[result.stdout.index('{'):result.stdout.rindex('}') + 1])
+	assert output["network"]["pypi"]["requests"] == 1
+	assert output["network"]["conda"]["requests"] == 4
+
+	with in_directory(tmp_pathplus / "spam"):
+		result = runner.invoke(main, args=["--max-requests", '3', "--watch"])
+		assert result.exit_code == 2
+		assert "--max-requests cannot be used with --serve or --watch." in result.stdout
@@ -0,0 +1,101 @@
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+from packaging.requirements import InvalidRequirement
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import conda
+from mkrecipe.conda import clear_cache, get_channel_index, validate_requirements
+
+
+@pytest.fixture()
+def channels(stand_in_server: StandInServer) -> StandInServer:
+	stand_in_server.add_channel(
+			"conda-forge",
+			["click", "typing-extensions", "typing_extensions", "ruamel.yaml", "domdf_python_tools"],
+			["numpy"],
+			)
+	stand_in_server.add_channel("domdfcoding", ["consolekit"])
+	return stand_in_server
+
+
+def test_get_channel_index(channels: StandInServer, cache_dir: PathPlus) -> None:
+	index = get_channel_index("conda-forge")
+	assert index["typing-extensions"] == ["typing-extensions", "typing_extensions"]
+	assert index["domdf-python-tools"] == ["domdf_python_tools"]
+	assert index["numpy"] == ["numpy"]
+
+	assert (cache_dir / "conda" / "conda-forge" / "noarch.json").is_file()
+	assert (cache_dir / "conda" / "conda-forge" / "linux-64.json").is_file()
+
+	with pytest.raises(ValueError, match="Conda channel 'bioconda' not found."):
+		get_channel_index("bioconda")
+
+
+def test_get_channel_index_cache(channels: StandInServer, monkeypatch: MonkeyPatch) -> None:
+	index = get_channel_index("domdfcoding")
+	n_requests = len(channels.requests)
+
+	assert get_channel_index("domdfcoding") is index
+	monkeypatch.setattr(conda, "_indexes", {})
+	assert get_channel_index("domdfcoding") == index
+	assert len(channels.requests) == n_requests
+
+	# Only the stale subdirectory is downloaded again; unchanged data gives a 304.
+	monkeypatch.setenv("MKRECIPE_CACHE_TTL", '0')
+	channels.add_channel("domdfcoding", ["consolekit", "mkrecipe"])
+	index = get_channel_index("domdfcoding")
+	assert index["mkrecipe"] == ["mkrecipe"]
+
+	clear_cache()
+	assert not list(conda.get_cache_dir("conda").glob("*/*.json"))
+
+
+def test_get_channel_index_noarch_only(
+		stand_in_server: StandInServer,
+		cache_dir: PathPlus,
+		monkeypatch: MonkeyPatch,
+		) -> None:
+	stand_in_server.add_channel("domdfcoding", ["consolekit"], None)
+	assert get_channel_index("domdfcoding") == {"consolekit": ["consolekit"]}
+	assert stand_in_server.requests.count("/conda/domdfcoding/linux-64/repodata.json") == 1
+	assert (cache_dir / "conda" / "domdfcoding" / "linux-64.json").is_file()
+	n_requests = len(stand_in_server.requests)
+
+	# As in a new process, the missing subdirectory isn't requested again until the cache expires.
+	monkeypatch.setattr(conda, "_indexes", {})
+	assert get_channel_index("domdfcoding") == {"consolekit": ["consolekit"]}
+	assert len(stand_in_server.requests) == n_requests
+
+	monkeypatch.setattr(conda, "_indexes", {})
+	monkeypatch.setenv("MKRECIPE_CACHE_TTL", '0')
+	stand_in_server.add_channel("domdfcoding", ["consolekit"], ["numpy"])
+	assert get_channel_index("domdfcoding")["numpy"] == ["numpy"]
+	assert stand_in_server.requests.count("/conda/domdfcoding/linux-64/repodata.json") == 2
+
+
+def test_validate_requirements(channels: StandInServer) -> None:
+	requirements = [
+			ComparableRequirement("click>=7.1.2"),
+			ComparableRequirement("typing-extensions>=3.7.4.3"),
+			ComparableRequirement("domdf-python-tools>=2.5.1"),
+			ComparableRequirement("ruamel-yaml"),
+			ComparableRequirement("consolekit"),
+			]
+
+	assert list(map(str, validate_requirements(requirements, ["conda-forge", "domdfcoding"]))) == [
+			"click>=7.1.2",
+			"typing-extensions>=3.7.4.3",
+			"domdf_python_tools>=2.5.1",
+			"ruamel.yaml",
+			"consolekit",
+			]
+
+	with pytest.raises(
+			InvalidRequirement,
+			match="Cannot satisfy the requirement 'consolekit' from any of the channels: 'conda-forge'.",
+			):
+		validate_requirements([ComparableRequirement("consolekit")], ["conda-forge"])
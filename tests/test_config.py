@@ -1,17 +1,21 @@
 # stdlib
+import os
 import re
-from typing import Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Type
 
 # 3rd party
 import dom_toml
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 from coincidence.regressions import AdvancedDataRegressionFixture
 from dom_toml.parser import BadConfigError
 from domdf_python_tools.paths import PathPlus, in_directory
 from packaging.version import InvalidVersion
 
 # this package
-from mkrecipe.config import BuildSystemParser, MkrecipeParser, PEP621Parser, load_toml
+import mkrecipe.config
+from mkrecipe.config import BuildSystemParser, MkrecipeParser, PEP621Parser, clear_cache, load_toml
 from tests.example_configs import (
 		AUTHORS,
 		CLASSIFIERS,
@@ -194,6 +198,8 @@ def test_buildsystem_parser_valid_config(
 						'[tool.mkrecipe]\nconda-channels = ["domdfcoding", "conda-forge"]',
 						id="conda_channels",
 						),
+				pytest.param('[tool.mkrecipe]\nexpand-extras = true', id="expand_extras"),
+				pytest.param('[tool.mkrecipe]\nsha256 = true', id="sha256"),
 				],
 		)
 def test_mkrecipe_parser_valid_config(
@@ -239,3 +245,133 @@ def test_load_toml_no_requirements(tmp_pathplus: PathPlus) -> None:
 			match="'project.dependencies' was listed as a dynamic field but no 'requirements.txt' file was found.",
 			):
 		load_toml(tmp_pathplus / "pyproject.toml")
+
+
+@pytest.fixture()
+def parse_count(monkeypatch: MonkeyPatch) -> List[PathPlus]:
+	calls = []
+	original = mkrecipe.config._parse_toml
+
+	def parse_toml(filename: PathPlus):  # noqa: MAN002
+		calls.append(filename)
+		return original(filename)
+
+	monkeypatch.setattr(mkrecipe.config, "_parse_toml", parse_toml)
+	monkeypatch.setattr(mkrecipe.config, "_config_cache", {})
+
+	return calls
+
+
+def test_load_toml_cache(tmp_pathplus: PathPlus, parse_count: List[PathPlus]) -> None:
+	pyproject_file = tmp_pathplus / "pyproject.toml"
+	pyproject_file.write_clean(MINIMAL_CONFIG)
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	config = load_toml(pyproject_file)
+	assert load_toml(pyproject_file) == config
+	assert len(parse_count) == 1
+
+	# Each call returns a copy.
+	config["dependencies"].append("eggs")
+	config["name"] = "eggs"
+	assert load_toml(pyproject_file)["dependencies"] == ["click>=7.1.2"]
+	assert load_toml(tmp_pathplus / ".." / tmp_pathplus.name / "pyproject.toml")["name"] == "spam"
+	assert len(parse_count) == 1
+
+	# Changing any of the files consulted invalidates the cache, even without changing their size.
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=7.1.3"])
+	assert load_toml(pyproject_file)["dependencies"] == ["click>=7.1.3"]
+	assert len(parse_count) == 2
+
+	pyproject_file.write_text(pyproject_file.read_text().replace("2020.0.0", "2021.0.0"))
+	assert load_toml(pyproject_file)["version"] == "2021.0.0"
+	assert len(parse_count) == 3
+
+	# Errors are not cached.
+	(tmp_pathplus / "requirements.txt").unlink()
+	with pytest.raises(BadConfigError):
+		load_toml(pyproject_file)
+	with pytest.raises(BadConfigError):
+		load_toml(pyproject_file)
+
+
+def test_load_toml_disk_cache(
+		tmp_pathplus: PathPlus,
+		parse_count: List[PathPlus],
+		cache_dir: PathPlus,
+		monkeypatch: MonkeyPatch,
+		) -> None:
+	pyproject_file = tmp_pathplus / "pyproject.toml"
+	pyproject_file.write_clean(MINIMAL_CONFIG)
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	# Not on disk by default.
+	config = load_toml(pyproject_file)
+	assert not (cache_dir / "config").exists()
+
+	monkeypatch.setenv("MKRECIPE_CONFIG_CACHE", '1')
+	monkeypatch.setattr(mkrecipe.config, "_config_cache", {})
+	assert load_toml(pyproject_file) == config
+	assert len(list((cache_dir / "config").iterdir())) == 1
+	assert len(parse_count) == 2
+
+	# As in a new process.
+	monkeypatch.setattr(mkrecipe.config, "_config_cache", {})
+	assert load_toml(pyproject_file) == config
+	assert len(parse_count) == 2
+
+	monkeypatch.setattr(mkrecipe.config, "_config_cache", {})
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=8"])
+	assert load_toml(pyproject_file)["dependencies"] == ["click>=8"]
+	assert len(parse_count) == 3
+
+	# A corrupt entry is ignored.
+	for cache_file in (cache_dir / "config").iterdir():
+		cache_file.write_bytes(b"spam")
+	monkeypatch.setattr(mkrecipe.config, "_config_cache", {})
+	assert load_toml(pyproject_file)["dependencies"] == ["click>=8"]
+	assert len(parse_count) == 4
+
+	clear_cache()
+	assert not list((cache_dir / "config").iterdir())
+	assert load_toml(pyproject_file)["dependencies"] == ["click>=8"]
+	assert len(parse_count) == 5
+
+
+def test_load_toml_threads(tmp_pathplus: PathPlus, monkeypatch: MonkeyPatch) -> None:
+	monkeypatch.setattr(mkrecipe.config, "_config_cache", {})
+
+	def chdir(path):  # noqa: MAN001,MAN002
+		raise AssertionError("load_toml changed the working directory")
+
+	monkeypatch.setattr(os, "chdir", chdir)
+
+	projects = []
+	for idx in range(50):
+		project_dir = tmp_pathplus / f"project_{idx}"
+		project_dir.mkdir()
+		(project_dir / "pyproject.toml").write_clean(
+				MINIMAL_CONFIG.replace('"spam"', f'"spam{idx}"').replace("2020.0.0", f"2020.0.{idx}"),
+				)
+		(project_dir / "requirements.txt").write_lines([f"click>={idx}"])
+		projects.append(project_dir)
+
+	def check(project_dir: PathPlus) -> None:
+		idx = int(project_dir.name.split('_')[1])
+		config = load_toml(project_dir / "pyproject.toml")
+		assert config["name"] == f"spam{idx}"
+		assert config["version"] == f"2020.0.{idx}"
+		assert config["dependencies"] == [f"click>={idx}"]
+
+	cwd = os.getcwd()
+
+	# Several rounds, so some are parsed and some are read from the cache concurrently.
+	with ThreadPoolExecutor(max_workers=16) as executor:
+		for round_ in range(4):
+			if round_ == 2:
+				mkrecipe.config._config_cache.clear()
+
+			for future in [executor.submit(check, project_dir) for project_dir in projects * 2]:
+				future.result()
+
+	assert os.getcwd() == cwd
@@ -0,0 +1,129 @@
+# stdlib
+import os
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import conda, make_recipe, pypi
+from mkrecipe.incremental import get_manifest_path, is_up_to_date
+
+PYPROJECT = """\
+[project]
+name = "spam"
+version = "1.0.0"
+description = "Lovely Spam! Wonderful Spam!"
+readme = "README.rst"
+dynamic = ["dependencies"]
+"""
+
+
+@pytest.fixture()
+def project(stand_in_server: StandInServer, tmp_pathplus: PathPlus) -> PathPlus:
+	stand_in_server.add_project("spam", ["spam-1.0.0.tar.gz", "spam-1.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "consolekit", "setuptools", "wheel"])
+
+	project_dir = tmp_pathplus / "spam"
+	project_dir.mkdir()
+	(project_dir / "pyproject.toml").write_clean(PYPROJECT)
+	(project_dir / "requirements.txt").write_lines(["click>=7.1.2"])
+	(project_dir / "README.rst").write_clean("Spam")
+
+	return project_dir
+
+
+def age(filename: PathPlus) -> None:
+	# Set the modification time to an hour ago, so any change is detectable.
+	mtime = filename.stat().st_mtime - 3600
+	os.utime(filename, (mtime, mtime))
+
+
+def test_incremental(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+
+	assert make_recipe(project, recipe_file, incremental=True)
+	assert get_manifest_path(recipe_file).is_file()
+	assert is_up_to_date(project, recipe_file)
+	assert not is_up_to_date(project, recipe_file, "wheel")
+
+	age(recipe_file)
+	mtime = recipe_file.stat().st_mtime
+	request_count = len(stand_in_server.requests)
+
+	# Nothing has changed, so the pipeline is skipped entirely.
+	conda._indexes.clear()
+	assert not make_recipe(project, recipe_file, incremental=True)
+	assert len(stand_in_server.requests) == request_count
+	assert recipe_file.stat().st_mtime == mtime
+
+	# The inputs have changed, but the recipe hasn't.
+	(project / "pyproject.toml").write_clean(f"{PYPROJECT}\n# A comment")
+	assert not is_up_to_date(project, recipe_file)
+	assert not make_recipe(project, recipe_file, incremental=True)
+	assert recipe_file.stat().st_mtime == mtime
+	assert is_up_to_date(project, recipe_file)
+
+	# The recipe has changed.
+	(project / "requirements.txt").write_lines(["click>=7.1.2", "consolekit>=1.0.0"])
+	assert make_recipe(project, recipe_file, incremental=True)
+	assert "    - consolekit>=1.0.0\n" in recipe_file.read_text()
+	assert recipe_file.stat().st_mtime != mtime
+
+
+@pytest.mark.parametrize(
+		"change",
+		[
+				pytest.param(lambda project: (project / "README.rst").write_clean("Eggs"), id="readme"),
+				pytest.param(lambda project: (project / "conda" / "meta.yaml").write_clean("Eggs"), id="recipe"),
+				pytest.param(
+						lambda project: get_manifest_path(project / "conda" / "meta.yaml").write_text("[]"),
+						id="manifest",
+						),
+				pytest.param(lambda project: conda.clear_cache(), id="cache"),
+				],
+		)
+def test_incremental_changes(project: PathPlus, change) -> None:  # noqa: MAN001
+	recipe_file = project / "conda" / "meta.yaml"
+	make_recipe(project, recipe_file, incremental=True)
+	assert is_up_to_date(project, recipe_file)
+
+	change(project)
+	assert not is_up_to_date(project, recipe_file)
+
+
+def test_not_incremental(project: PathPlus) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+
+	assert make_recipe(project, recipe_file)
+	assert not get_manifest_path(recipe_file).exists()
+	assert not is_up_to_date(project, recipe_file)
+	assert make_recipe(project, recipe_file)
+
+
+def test_incremental_expand_extras(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+	metadata = {
+			"foo-1.0.0-py3-none-any.whl": b'Metadata-Version: 2.1\nName: foo\nRequires-Dist: numpy; extra == "bar"\n',
+			"foo-1.1.0-py3-none-any.whl": b'Metadata-Version: 2.1\nName: foo\nRequires-Dist: pandas; extra == "bar"\n',
+			}
+	stand_in_server.add_project("foo", ["foo-1.0.0-py3-none-any.whl"], metadata=metadata)
+	stand_in_server.add_channel("conda-forge", ["click", "foo", "numpy", "pandas", "setuptools", "wheel"])
+	(project / "pyproject.toml").write_clean(f"{PYPROJECT}\n[tool.mkrecipe]\nexpand-extras = true")
+	(project / "requirements.txt").write_lines(["click>=7.1.2", "foo[bar]"])
+
+	assert make_recipe(project, recipe_file, incremental=True)
+	assert "    - numpy" in recipe_file.read_text()
+	assert is_up_to_date(project, recipe_file)
+
+	# A new release of the dependency changes the requirements of its extra.
+	stand_in_server.add_project("foo", list(metadata), metadata=metadata)
+	pypi.clear_cache("foo")
+	pypi.get_project_files("foo")
+	assert not is_up_to_date(project, recipe_file)
+
+	assert make_recipe(project, recipe_file, incremental=True)
+	assert "    - pandas\n" in recipe_file.read_text()
+	assert "numpy" not in recipe_file.read_text()
+	assert is_up_to_date(project, recipe_file)
@@ -0,0 +1,199 @@
+# stdlib
+import asyncio
+import hashlib
+import json
+import shutil
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from packaging.requirements import InvalidRequirement
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import MaryBerry, conda, make_recipe, make_recipes
+from mkrecipe.incremental import is_up_to_date
+from mkrecipe.lock import Lockfile, get_lock_path
+from mkrecipe.retry import RetryPolicy
+
+PYPROJECT = """\
+[project]
+name = "spam"
+version = "1.0.0"
+description = "Lovely Spam! Wonderful Spam!"
+dynamic = ["dependencies"]
+"""
+
+
+@pytest.fixture()
+def project(stand_in_server: StandInServer, tmp_pathplus: PathPlus) -> PathPlus:
+	stand_in_server.add_project("spam", ["spam-1.0.0.tar.gz", "spam-1.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "consolekit", "setuptools", "wheel"])
+
+	project_dir = tmp_pathplus / "spam"
+	project_dir.mkdir()
+	(project_dir / "pyproject.toml").write_clean(PYPROJECT)
+	(project_dir / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	return project_dir
+
+
+def go_offline(stand_in_server: StandInServer, cache_dir: PathPlus) -> None:
+	# Nothing can be looked up any more, from the network or the caches.
+	stand_in_server.routes.clear()
+	conda._indexes.clear()
+	shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_lock(project: PathPlus, stand_in_server: StandInServer, cache_dir: PathPlus) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+
+	# Not used unless asked for.
+	assert make_recipe(project, recipe_file)
+	assert not get_lock_path(project).exists()
+
+	recipe = recipe_file.read_text()
+	assert make_recipes(project, {"sdist": recipe_file, "wheel": project / "wheel.yaml"}, lock=True)
+	assert recipe_file.read_text() == recipe
+
+	lock = json.loads(get_lock_path(project).read_text())
+	assert lock["lock-version"] == 1
+	assert lock["artifacts"]["sdist"] == {
+			"name": "spam",
+			"version": "1.0.0",
+			"index-url": f"{stand_in_server.url}simple/",
+			"url": f"{stand_in_server.url}packages/spam-1.0.0.tar.gz",
+			}
+	assert lock["artifacts"]["wheel"]["url"] == f"{stand_in_server.url}packages/spam-1.0.0-py3-none-any.whl"
+	assert lock["requirements"]["conda-channels"] == ["conda-forge"]
+	assert lock["requirements"]["validated"] == {"click>=7.1.2": "click>=7.1.2"}
+
+	# Once the lockfile exists it is used, without accessing the network.
+	go_offline(stand_in_server, cache_dir)
+	request_count = len(stand_in_server.requests)
+	recipe_file.unlink()
+
+	assert make_recipes(project, {"sdist": recipe_file, "wheel": project / "wheel.yaml"})
+	assert recipe_file.read_text() == recipe
+	assert len(stand_in_server.requests) == request_count
+
+	# Unless it is ignored.
+	with pytest.raises(InvalidRequirement, match="Cannot find spam version 1.0.0 on PyPI."):
+		make_recipe(project, recipe_file, retry_policy=RetryPolicy(retry_not_published=False), lock=False)
+
+
+def test_lock_stale(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+	make_recipe(project, recipe_file, lock=True)
+	lockfile = get_lock_path(project)
+	request_count = len(stand_in_server.requests)
+
+	# Only the requirements have to be validated again.
+	(project / "requirements.txt").write_lines(["click>=7.1.2", "consolekit>=1.0.0"])
+	assert make_recipe(project, recipe_file)
+	assert "    - consolekit>=1.0.0\n" in recipe_file.read_text()
+	assert "/simple/spam/" not in stand_in_server.requests[request_count:]
+	assert json.loads(lockfile.read_text())["requirements"]["validated"] == {
+			"click>=7.1.2": "click>=7.1.2",
+			"consolekit>=1.0.0": "consolekit>=1.0.0",
+			}
+
+	# The source distribution has to be looked up again, as the digest wasn't recorded.
+	(project / "pyproject.toml").write_clean(f"{PYPROJECT}\n[tool.mkrecipe]\nsha256 = true")
+	assert make_recipe(project, recipe_file)
+	digest = hashlib.sha256(b"spam-1.0.0.tar.gz").hexdigest()
+	assert f"  sha256: {digest}\n" in recipe_file.read_text()
+	assert json.loads(lockfile.read_text())["artifacts"]["sdist"]["sha256"] == digest
+
+	# A new version.
+	stand_in_server.add_project("spam", ["spam-1.0.0.tar.gz", "spam-1.1.0.tar.gz"])
+	(project / "pyproject.toml").write_clean(PYPROJECT.replace("1.0.0", "1.1.0"))
+	assert make_recipe(project, recipe_file)
+	assert "/packages/spam-1.1.0.tar.gz" in recipe_file.read_text()
+	assert json.loads(lockfile.read_text())["artifacts"]["sdist"]["version"] == "1.1.0"
+
+
+def test_lock_refresh(project: PathPlus, stand_in_server: StandInServer, cache_dir: PathPlus) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+	make_recipe(project, recipe_file, incremental=True, lock=True)
+	lock = get_lock_path(project).read_text()
+
+	stand_in_server.add_project("spam", ["spam-1.0.0.zip", "spam-1.0.0.tar.gz"])
+	assert not make_recipe(project, recipe_file, incremental=True)
+
+	# Everything is looked up again, even though the inputs are unchanged.
+	stand_in_server.requests.clear()
+	conda._indexes.clear()
+	shutil.rmtree(cache_dir)
+	assert not make_recipe(project, recipe_file, incremental=True, refresh=True)
+	assert "/simple/spam/" in stand_in_server.requests
+	assert get_lock_path(project).read_text() == lock
+	assert is_up_to_date(project, recipe_file)
+
+	# The lockfile is one of the inputs to the recipe.
+	get_lock_path(project).write_clean("{}")
+	assert not is_up_to_date(project, recipe_file)
+
+
+def test_maryberry_lockfile(project: PathPlus, stand_in_server: StandInServer, cache_dir: PathPlus) -> None:
+	lockfile = Lockfile.for_project(project)
+	berry = MaryBerry(project, lockfile=lockfile)
+	recipes = berry.make_multiple()
+
+	# Not written until saved.
+	assert not lockfile.filename.exists()
+	assert lockfile.save()
+	assert not lockfile.save()
+
+	go_offline(stand_in_server, cache_dir)
+	request_count = len(stand_in_server.requests)
+
+	berry = MaryBerry(project, lockfile=Lockfile.for_project(project))
+	assert asyncio.run(berry.amake_multiple()) == recipes
+	assert berry.get_sdist_url() == asyncio.run(berry.aget_sdist_url())
+	assert berry.get_wheel_url() == asyncio.run(berry.aget_wheel_url())
+	assert berry.get_recipe().to_yaml() in recipes["sdist"]
+	assert len(stand_in_server.requests) == request_count
+	assert list(berry.timings.phases) == ["load_config", "render"]
+
+
+def test_lockfile(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	filename = tmp_pathplus / "mkrecipe.lock"
+	config = {
+			"dependencies": [],
+			"optional-dependencies": {},
+			"extras": "none",
+			"expand-extras": False,
+			"min-python-version": None,
+			"max-python-version": None,
+			"conda-channels": ["conda-forge"],
+			}
+
+	# Both write to the file, as when creating the recipes for each artifact type in parallel.
+	first, second = Lockfile(filename), Lockfile(filename)
+	first.set_artifact("sdist", "spam", "1.0.0", "spam-1.0.0.tar.gz")
+	second.set_artifact("wheel", "spam", "1.0.0", "spam-1.0.0-py3-none-any.whl")
+	second.set_requirements(config, {"Click>=7": "click>=7"})
+	assert first.save()
+	assert second.save()
+
+	lockfile = Lockfile(filename)
+	assert lockfile.get_artifact("sdist", "spam", "1.0.0") == {
+			"name": "spam",
+			"version": "1.0.0",
+			"index-url": f"{stand_in_server.url}simple/",
+			"url": "spam-1.0.0.tar.gz",
+			}
+	assert lockfile.get_artifact("wheel", "spam", "1.0.0") is not None
+	assert lockfile.get_artifact("sdist", "spam", "1.0.1") is None
+	assert lockfile.get_artifact("sdist", "eggs", "1.0.0") is None
+	assert lockfile.get_requirements(config) == {"Click>=7": "click>=7"}
+	assert lockfile.get_requirements({**config, "conda-channels": ["bioconda"]}) is None
+	assert lockfile.get_requirements({**config, "extras": "all"}) is None
+
+	assert Lockfile(filename, refresh=True).get_artifact("sdist", "spam", "1.0.0") is None
+
+	# Malformed lockfiles are ignored.
+	for content in ("spam", "[]", '{"lock-version": 2}', '{"lock-version": 1, "artifacts": []}'):
+		filename.write_clean(content)
+		assert Lockfile(filename).get_artifact("sdist", "spam", "1.0.0") is None
@@ -0,0 +1,110 @@
+# stdlib
+import itertools
+from typing import List, Optional
+
+# 3rd party
+import pytest
+from packaging.markers import Marker
+
+# this package
+from mkrecipe._markers import marker_for_extras, marker_in_python_range
+
+CLAUSES = [
+		f'{variable} {op} "{version}"'
+		for variable in ("python_version", "python_full_version")
+		for op in ('<', "<=", '>', ">=", "==", "!=")
+		for version in ("2.7", "3.6", "3.8", "3.10")
+		]
+
+
+def evaluate_in_range(marker: Marker, min_version: Optional[int], max_version: Optional[int]) -> bool:
+	# Evaluate the marker for each minor version in turn, as the original implementation did,
+	# and for a patch release of each as the range includes those too.
+	for minor_version in range(min_version or 0, 31 if max_version is None else max_version + 1):
+		for full_version in (f"3.{minor_version}", f"3.{minor_version}.1"):
+			if marker.evaluate({"python_full_version": full_version, "python_version": f"3.{minor_version}"}):
+				return True
+
+	return False
+
+
+@pytest.mark.parametrize("min_version, max_version", [(6, None), (7, 9), (None, 8), (9, 9), (11, None)])
+def test_matches_evaluation(min_version: Optional[int], max_version: Optional[int]) -> None:
+	markers = [*CLAUSES]
+	markers.extend(f"{a} and {b}" for a, b in itertools.combinations(CLAUSES[::3], 2))
+	markers.extend(f"{a} or {b}" for a, b in itertools.combinations(CLAUSES[1::3], 2))
+	markers.extend(f"({a} or {b}) and {c}" for a, b, c in itertools.combinations(CLAUSES[::5], 3))
+
+	for marker in map(Marker, markers):
+		expected = evaluate_in_range(marker, min_version, max_version)
+		assert marker_in_python_range(marker, min_version, max_version) is expected, marker
+
+
+@pytest.mark.parametrize(
+		"marker, min_version, max_version, expected",
+		[
+				pytest.param('"3.8" > python_version', 8, None, False, id="reversed"),
+				pytest.param('"3.8" > python_version', 7, None, True, id="reversed_match"),
+				pytest.param('python_version >= "3.25"', 7, None, True, id="no_upper_limit"),
+				pytest.param('python_version < "3.25"', 30, None, False, id="no_upper_limit_old"),
+				pytest.param('python_full_version >= "3.7.1"', 6, 7, True, id="patch_release"),
+				pytest.param('python_full_version < "3.7.1"', 8, None, False, id="patch_release_old"),
+				pytest.param('python_version == "3.7.1"', 6, 9, False, id="python_version_patch"),
+				pytest.param('python_version < "3.8" and sys_platform == "win32"', 6, 9, False, id="platform"),
+				pytest.param('python_version < "3.8" or os_name == "posix"', 9, 9, True, id="os_name"),
+				pytest.param('python_version == "3.*"', 6, 9, True, id="wildcard"),
+				pytest.param('python_version in "3.6 3.7"', 8, None, False, id="in"),
+				pytest.param('python_version in "3.6 3.7"', 7, None, True, id="in_match"),
+				],
+		)
+def test_marker_in_python_range(
+		marker: str,
+		min_version: Optional[int],
+		max_version: Optional[int],
+		expected: bool,
+		) -> None:
+	assert marker_in_python_range(Marker(marker), min_version, max_version) is expected
+
+
+@pytest.mark.parametrize(
+		"marker, extras, expected, remaining",
+		[
+				pytest.param('extra == "bar"', ["bar"], True, None, id="extra"),
+				pytest.param('extra == "Bar_Baz"', ["bar.baz"], True, None, id="normalized"),
+				pytest.param('extra == "bar"', ["baz"], False, None, id="other_extra"),
+				pytest.param('python_version < "3.8"', ["bar"], False, None, id="no_extra"),
+				pytest.param('extra != "bar"', ["baz"], False, None, id="not_equal"),
+				pytest.param(
+						'extra == "bar" and python_version < "3.8"',
+						["bar"],
+						True,
+						'python_version < "3.8"',
+						id="and",
+						),
+				pytest.param(
+						'(extra == "bar" or extra == "baz") and sys_platform == "linux"',
+						["baz"],
+						True,
+						'sys_platform == "linux"',
+						id="nested",
+						),
+				pytest.param(
+						'python_version < "3.8" and extra == "bar" or extra == "baz"',
+						["bar"],
+						True,
+						'python_version < "3.8"',
+						id="or",
+						),
+				pytest.param(
+						'python_version < "3.8" and extra == "bar" or os_name == "nt" and extra == "baz"',
+						["bar", "baz"],
+						True,
+						'python_version < "3.8" or os_name == "nt"',
+						id="multiple",
+						),
+				],
+		)
+def test_marker_for_extras(marker: str, extras: List[str], expected: bool, remaining: Optional[str]) -> None:
+	needed, remaining_marker = marker_for_extras(Marker(marker), extras)
+	assert needed is expected
+	assert remaining_marker == (None if remaining is None else Marker(remaining))
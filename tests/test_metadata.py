@@ -0,0 +1,143 @@
+# stdlib
+import io
+import zipfile
+from typing import List
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from benchmarks.stand_ins import StandInServer
+import mkrecipe.metadata
+from mkrecipe.metadata import clear_cache, expand_extras, get_requires_dist
+
+FOO_METADATA = [
+		"click>=7.1.2",
+		'numpy>=1.19.0; extra == "bar"',
+		'baz[qux]>=2.0; extra == "bar" and python_version < "3.8"',
+		'eggs; extra == "other"',
+		]
+
+
+def make_metadata(name: str, requires_dist: List[str]) -> bytes:
+	lines = ["Metadata-Version: 2.1", f"Name: {name}", "Version: 1.0.0"]
+	lines.extend(f"Requires-Dist: {requirement}" for requirement in requires_dist)
+	return '\n'.join(lines).encode("UTF-8")
+
+
+def make_wheel(name: str, requires_dist: List[str]) -> bytes:
+	# The METADATA file is at the start of the wheel, followed by enough data that it isn't in the final block.
+	buf = io.BytesIO()
+
+	with zipfile.ZipFile(buf, 'w') as wheel:
+		wheel.writestr(f"{name}-1.0.0.dist-info/METADATA", make_metadata(name, requires_dist))
+		wheel.writestr(f"{name}/data.bin", bytes(range(256)) * 1024)
+
+	return buf.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch: MonkeyPatch) -> None:
+	monkeypatch.setattr(mkrecipe.metadata, "_requires_dist", {})
+
+
+def test_get_requires_dist(stand_in_server: StandInServer, cache_dir: PathPlus) -> None:
+	wheel = "foo-1.1.0-py3-none-any.whl"
+	stand_in_server.add_project(
+			"foo",
+			["foo-1.0.0-py3-none-any.whl", "foo-1.1.0.tar.gz", wheel, "foo-2.0.0rc1-py3-none-any.whl"],
+			contents={"foo-1.0.0-py3-none-any.whl": make_wheel("foo", ["click"])},
+			metadata={wheel: make_metadata("foo", FOO_METADATA)},
+			)
+
+	assert get_requires_dist("Foo") == FOO_METADATA
+	assert f"/packages/{wheel}.metadata" in stand_in_server.requests
+	assert f"/packages/{wheel}" not in stand_in_server.requests
+	assert (cache_dir / "metadata" / "foo" / f"{wheel}.json").is_file()
+
+	# Cached in memory and on disk.
+	requests = len(stand_in_server.requests)
+	assert get_requires_dist("foo", ">=1.1") == FOO_METADATA
+	mkrecipe.metadata._requires_dist.clear()
+	assert get_requires_dist("foo", ">=1.1") == FOO_METADATA
+	assert stand_in_server.requests[requests:] == []
+
+	assert get_requires_dist("foo", "<1.1") == ["click"]
+	assert get_requires_dist("foo", ">=3") is None
+
+	clear_cache("foo")
+	assert not list((cache_dir / "metadata" / "foo").iterdir())
+
+
+def test_get_requires_dist_range_requests(stand_in_server: StandInServer) -> None:
+	wheel = make_wheel("foo", FOO_METADATA)
+	stand_in_server.add_project("foo", ["foo-1.0.0-py3-none-any.whl"], contents={"foo-1.0.0-py3-none-any.whl": wheel})
+
+	assert get_requires_dist("foo") == FOO_METADATA
+	# The final block, and the block containing the METADATA file.
+	assert stand_in_server.requests.count("/packages/foo-1.0.0-py3-none-any.whl") == 2
+
+	# The wheel is never downloaded in full.
+	clear_cache()
+	stand_in_server.accept_ranges = False
+	assert get_requires_dist("foo") is None
+
+
+def test_get_requires_dist_bad_hash(stand_in_server: StandInServer) -> None:
+	wheel = "foo-1.0.0-py3-none-any.whl"
+	stand_in_server.add_project(
+			"foo",
+			[wheel],
+			contents={wheel: make_wheel("foo", FOO_METADATA)},
+			metadata={wheel: make_metadata("foo", FOO_METADATA)},
+			)
+	stand_in_server.add(f"/packages/{wheel}.metadata", make_metadata("foo", []))
+
+	assert get_requires_dist("foo") == FOO_METADATA
+	assert f"/packages/{wheel}" in stand_in_server.requests
+
+
+def test_get_requires_dist_local_mirror(tmp_pathplus: PathPlus, monkeypatch: MonkeyPatch) -> None:
+	mirror_dir = tmp_pathplus / "mirror"
+	(mirror_dir / "simple" / "foo").maybe_make(parents=True)
+	(mirror_dir / "packages").maybe_make()
+	(mirror_dir / "packages" / "foo-1.0.0-py3-none-any.whl").write_bytes(make_wheel("foo", FOO_METADATA))
+	(mirror_dir / "simple" / "foo" / "index.html").write_text(
+			'<a href="../../packages/foo-1.0.0-py3-none-any.whl">foo-1.0.0-py3-none-any.whl</a>',
+			)
+	monkeypatch.setenv("MKRECIPE_INDEX_URL", (mirror_dir / "simple").as_posix())
+
+	assert get_requires_dist("foo") == FOO_METADATA
+
+
+def test_expand_extras(stand_in_server: StandInServer) -> None:
+	foo_wheel = "foo-1.0.0-py3-none-any.whl"
+	baz_wheel = "baz-2.0.0-py3-none-any.whl"
+	stand_in_server.add_project("foo", [foo_wheel], metadata={foo_wheel: make_metadata("foo", FOO_METADATA)})
+	stand_in_server.add_project(
+			"baz",
+			["baz-1.0.0-py3-none-any.whl", baz_wheel],
+			metadata={baz_wheel: make_metadata("baz", ['quux; extra == "qux"', 'spam; extra == "other"'])},
+			)
+
+	requirements = [
+			ComparableRequirement("foo[bar]>=1.0"),
+			ComparableRequirement("Foo[BAR,other]; sys_platform == 'linux'"),
+			ComparableRequirement("click>=7.1.2"),
+			]
+
+	assert list(map(str, expand_extras(requirements))) == [
+			"numpy>=1.19.0",
+			'baz[qux]>=2.0; python_version < "3.8"',
+			'eggs; sys_platform == "linux"',
+			'quux; python_version < "3.8"',
+			]
+
+	# Each project is only looked up once.
+	assert stand_in_server.requests.count(f"/packages/{foo_wheel}.metadata") == 1
+	assert stand_in_server.requests.count(f"/packages/{baz_wheel}.metadata") == 1
+
+	assert expand_extras([ComparableRequirement("click>=7.1.2")]) == []
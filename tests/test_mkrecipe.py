@@ -1,10 +1,22 @@
+# stdlib
+import asyncio
+import hashlib
+import threading
+from typing import List, Optional, Tuple
+
 # 3rd party
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 from coincidence.regressions import AdvancedFileRegressionFixture
 from domdf_python_tools.paths import PathPlus
+from packaging.requirements import InvalidRequirement
+from shippinglabel.requirements import ComparableRequirement
 
 # this package
-from mkrecipe import MaryBerry, make_recipe
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import MaryBerry, make_recipe, make_recipes
+from mkrecipe.recipe import Source
+from tests.example_configs import MINIMAL_CONFIG, URLS
 
 configs_dir = PathPlus(__file__).parent / "configs"
 
@@ -99,3 +111,171 @@ def test_MaryBerry_make_for_wheel(
 	recipe = MaryBerry(tmp_pathplus).make_for_wheel()
 
 	advanced_file_regression.check(recipe, extension=".yaml")
+
+
+@pytest.fixture()
+def spam(stand_in_server: StandInServer, tmp_pathplus: PathPlus) -> PathPlus:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz", "spam-2020.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=7.1.2"])
+	return tmp_pathplus
+
+
+def test_MaryBerry_make_concurrent(spam: PathPlus, stand_in_server: StandInServer) -> None:
+	# Neither stage can finish until the other has started.
+	barrier = threading.Barrier(2, timeout=5)
+
+	class ConcurrentBerry(MaryBerry):
+
+		def get_sdist(self) -> Tuple[str, Optional[str]]:
+			barrier.wait()
+			return super().get_sdist()
+
+		def get_wheel_url(self) -> str:
+			barrier.wait()
+			return super().get_wheel_url()
+
+		def get_runtime_requirements(self) -> List[ComparableRequirement]:
+			barrier.wait()
+			return super().get_runtime_requirements()
+
+	berry = ConcurrentBerry(spam)
+	assert berry.make() == MaryBerry(spam).make()
+	assert berry.make_for_wheel() == MaryBerry(spam).make_for_wheel()
+	assert berry.get_recipe() == MaryBerry(spam).get_recipe()
+
+	# Errors from the lookup take precedence.
+	(spam / "requirements.txt").write_lines(["eggs"])
+	berry = ConcurrentBerry(spam)
+	berry.config["version"] = "2019.0.0"
+
+	with pytest.raises(InvalidRequirement, match="Cannot find spam version 2019.0.0 on PyPI."):
+		berry.make()
+
+
+def test_MaryBerry_sha256(spam: PathPlus, stand_in_server: StandInServer) -> None:
+	(spam / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam"\n[tool.mkrecipe]\nsha256 = true')
+	digest = hashlib.sha256(b"spam-2020.0.0.tar.gz").hexdigest()
+
+	berry = MaryBerry(spam)
+	recipe = berry.make()
+	assert f'  url: "{stand_in_server.url}packages/spam-2020.0.0.tar.gz"\n  sha256: {digest}\n' in recipe
+	assert berry.get_recipe().source == Source(f"{stand_in_server.url}packages/spam-2020.0.0.tar.gz", digest)
+	assert asyncio.run(berry.amake()) == recipe
+	assert berry.make_multiple()["sdist"] == recipe
+	assert asyncio.run(berry.amake_multiple(["sdist"])) == {"sdist": recipe}
+
+	# The digest is published by the index, so the source distribution is never downloaded.
+	assert "/packages/spam-2020.0.0.tar.gz" not in stand_in_server.requests
+
+	# Not included unless enabled.
+	(spam / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam"')
+	assert "sha256" not in MaryBerry(spam).make()
+
+
+def test_MaryBerry_make_multiple(spam: PathPlus, stand_in_server: StandInServer) -> None:
+	berry = MaryBerry(spam)
+	recipes = berry.make_multiple()
+
+	assert list(recipes) == ["sdist", "wheel"]
+	assert recipes == {"sdist": berry.make(), "wheel": berry.make_for_wheel()}
+	assert recipes == asyncio.run(berry.amake_multiple(["sdist", "wheel"]))
+	assert berry.make_multiple(["wheel", "wheel"]) == {"wheel": recipes["wheel"]}
+
+	with pytest.raises(ValueError, match="Unknown artifact type 'egg'"):
+		berry.make_multiple(["sdist", "egg"])
+
+	with pytest.raises(ValueError, match="No artifact types given."):
+		berry.make_multiple([])
+
+
+def test_make_recipes(spam: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe_files = {"sdist": spam / "conda" / "sdist.yaml", "wheel": spam / "conda" / "wheel.yaml"}
+
+	assert make_recipes(spam, recipe_files) == {"sdist": True, "wheel": True}
+	assert "spam-2020.0.0.tar.gz" in recipe_files["sdist"].read_text()
+	assert "spam-2020.0.0-py3-none-any.whl" in recipe_files["wheel"].read_text()
+
+	# Only the changed recipe is written.
+	recipe_files["wheel"].write_clean("Eggs")
+	assert make_recipes(spam, recipe_files, incremental=True) == {"sdist": False, "wheel": True}
+	assert make_recipes(spam, recipe_files, incremental=True) == {"sdist": False, "wheel": False}
+	recipe_files["sdist"].write_clean("Eggs")
+	assert make_recipes(spam, recipe_files, incremental=True) == {"sdist": True, "wheel": False}
+
+	with pytest.raises(ValueError, match="Unknown artifact type 'egg'"):
+		make_recipes(spam, {"egg": spam / "meta.yaml"})
+
+
+def test_MaryBerry_expand_extras(spam: PathPlus, stand_in_server: StandInServer) -> None:
+	wheel = "foo-1.0.0-py3-none-any.whl"
+	metadata = b'Metadata-Version: 2.1\nName: foo\nRequires-Dist: click\nRequires-Dist: numpy>=1.20.0; extra == "bar"\n'
+	stand_in_server.add_project("foo", [wheel], metadata={wheel: metadata})
+	stand_in_server.add_channel("conda-forge", ["click", "foo", "numpy", "setuptools", "sphinx", "wheel"])
+	(spam / "requirements.txt").write_lines(["click>=7.1.2", "foo[bar]>=1.0"])
+
+	assert MaryBerry(spam).get_runtime_requirements() == ["click>=7.1.2", "foo>=1.0"]
+
+	with (spam / "pyproject.toml").open('a') as fp:
+		fp.write("\n[tool.mkrecipe]\nexpand-extras = true\n")
+
+	berry = MaryBerry(spam)
+	assert berry.get_runtime_requirements() == ["click>=7.1.2", "foo>=1.0", "numpy>=1.19.0"]
+	berry.invalidate()
+	assert asyncio.run(berry.aget_runtime_requirements()) == ["click>=7.1.2", "foo>=1.0", "numpy>=1.19.0"]
+
+	# The project's own extras are kept.
+	with (spam / "pyproject.toml").open('a') as fp:
+		fp.write('extras = "all"\n\n[project.optional-dependencies]\ndocs = ["sphinx"]\n')
+
+	assert MaryBerry(spam).get_runtime_requirements() == ["click>=7.1.2", "foo>=1.0", "sphinx", "numpy>=1.19.0"]
+
+
+def test_MaryBerry_memoized(spam: PathPlus, monkeypatch: MonkeyPatch) -> None:
+	calls = []
+
+	def validate_requirements(requirements, conda_channels, session=None):  # noqa: MAN001,MAN002
+		calls.append(conda_channels)
+		return list(requirements)
+
+	monkeypatch.setattr("mkrecipe._core.validate_requirements", validate_requirements)
+
+	berry = MaryBerry(spam)
+	requirements = berry.get_runtime_requirements()
+	assert requirements == ["click>=7.1.2"]
+	assert berry.get_runtime_requirements() == requirements
+	assert asyncio.run(berry.aget_runtime_requirements()) == requirements
+	assert len(calls) == 1
+
+	# Modifying the returned value does not modify the cache.
+	requirements.append(ComparableRequirement("eggs"))
+	assert berry.get_runtime_requirements() == ["click>=7.1.2"]
+
+	description = berry.make_conda_description()
+	assert description.startswith("Spam, spam, spam")
+	assert set(berry.get_urls()) == set()
+	assert berry.get_maintainers() == set()
+
+	# Modifying the config in place requires an explicit invalidation.
+	berry.config["conda-channels"] = ["domdfcoding"]
+	berry.config["description"] = "Lovely spam"
+	assert berry.make_conda_description() == description
+	berry.get_runtime_requirements()
+	assert len(calls) == 1
+
+	berry.invalidate()
+	assert berry.make_conda_description().startswith("Lovely spam")
+	berry.get_runtime_requirements()
+	assert [list(channels) for channels in calls] == [["conda-forge"], ["domdfcoding"]]
+
+	# Replacing the config invalidates the cache.
+	(spam / "pyproject.toml").write_clean(
+			URLS.replace("[project]\n", '[project]\ndescription = "Eggs"\nauthors = [{name = "Brian"}]\n', 1),
+			)
+	berry.config = berry.load_config()
+	assert berry.make_conda_description().startswith("Eggs")
+	assert list(berry.get_urls()) == ["home: 'example.com'", "doc_url: 'readthedocs.org'"]
+	assert berry.get_maintainers() == {"'Brian'"}
+	berry.get_runtime_requirements()
+	assert len(calls) == 3
@@ -0,0 +1,150 @@
+# stdlib
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import MaryBerry, conda, pypi
+from mkrecipe.network import NetworkStats, RequestBudgetExceeded, ServiceStats, Session, get_stats, total
+from tests.example_configs import MINIMAL_CONFIG
+
+
+def test_network_stats() -> None:
+	stats = NetworkStats()
+
+	stats.start_request("pypi")
+	stats.record_response("pypi", 1024, 0.25)
+	stats.record_lookup("pypi", cached=False)
+	stats.record_lookup("pypi", cached=True)
+	stats.record_lookup("pypi", cached=True)
+	stats.record_lookup("conda", cached=True)
+
+	assert stats.requests == 1
+	assert stats.services == {"pypi": ServiceStats(1, 1024, 0.25, 2, 1), "conda": ServiceStats(cache_hits=1)}
+	assert stats.services["pypi"].cache_hit_ratio == pytest.approx(2 / 3)
+	assert ServiceStats().cache_hit_ratio is None
+
+	assert stats.as_dict()["conda"] == {
+			"requests": 0,
+			"bytes": 0,
+			"latency": 0.0,
+			"cache_hits": 1,
+			"cache_misses": 0,
+			"cache_hit_ratio": 1.0,
+			}
+
+	stats.reset()
+	assert stats.services == {}
+
+
+def test_network_stats_budget() -> None:
+	stats = NetworkStats(max_requests=100)
+
+	def request() -> bool:
+		try:
+			stats.start_request("pypi")
+		except RequestBudgetExceeded:
+			return False
+		return True
+
+	with ThreadPoolExecutor(8) as executor:
+		sent = list(executor.map(lambda _: request(), range(1000)))
+
+	assert sent.count(True) == 100
+	assert stats.requests == 100
+
+	with pytest.raises(RequestBudgetExceeded, match="The budget of 100 network requests has been used up."):
+		stats.start_request("conda")
+
+	# The budget isn't affected by resetting the stats.
+	stats.reset()
+	stats.start_request("conda")
+	assert stats.max_requests == 100
+
+
+def test_total() -> None:
+	first = NetworkStats()
+	first.start_request("pypi")
+	first.record_response("pypi", 100, 0.5)
+	first.record_lookup("pypi", cached=False)
+
+	second = NetworkStats()
+	second.record_lookup("pypi", cached=True)
+	second.record_lookup("conda", cached=True)
+
+	totals = total([first.as_dict(), second.as_dict(), {}])
+	assert totals["pypi"] == {
+			"requests": 1,
+			"bytes": 100,
+			"latency": 0.5,
+			"cache_hits": 1,
+			"cache_misses": 1,
+			"cache_hit_ratio": 0.5,
+			}
+	assert totals["conda"]["cache_hit_ratio"] == 1.0
+	assert total([]) == {}
+
+
+def test_requests_recorded(stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz"])
+	stand_in_server.add_channel("conda-forge", ["click"])
+	stats = get_stats()
+
+	pypi.get_sdist_url("spam", "2020.0.0")
+	pypi.get_sdist_url("spam", "2020.0.0")
+	assert stats.services["pypi"].requests == 1
+	assert stats.services["pypi"].bytes > 0
+	assert stats.services["pypi"].latency > 0
+	assert (stats.services["pypi"].cache_hits, stats.services["pypi"].cache_misses) == (1, 1)
+
+	conda.validate_requirements([ComparableRequirement("click")], ["conda-forge"])
+	conda.validate_requirements([ComparableRequirement("click")], ["conda-forge"])
+	assert stats.services["conda"].requests == len([path for path in stand_in_server.requests if "/conda/" in path])
+	assert stats.services["conda"].cache_misses == len(conda.SUBDIRS)
+	assert stats.services["conda"].cache_hits == 1
+
+
+def test_request_budget(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").touch()
+
+	get_stats().max_requests = 1
+	requests = len(stand_in_server.requests)
+
+	# The project page can be fetched, but the budget is used up before the conda channels are indexed.
+	with pytest.raises(RequestBudgetExceeded):
+		MaryBerry(tmp_pathplus).make()
+
+	assert len(stand_in_server.requests) == requests + 1
+	assert get_stats().requests == 1
+
+
+def test_session(stand_in_server: StandInServer) -> None:
+	stand_in_server.add("/spam", b"Lovely spam")
+
+	with Session(pool_size=4, connect_timeout=5, read_timeout=20) as session:
+		assert session.get_adapter("https://pypi.org/")._pool_maxsize == 4  # type: ignore[attr-defined]
+
+		for _ in range(5):
+			assert session.fetch("pypi", f"{stand_in_server.url}spam").content == b"Lovely spam"
+
+	# The connection is kept alive between requests.
+	assert stand_in_server.connections == 1
+	assert get_stats().services["pypi"] == ServiceStats(5, 55, get_stats().services["pypi"].latency)
+
+
+def test_session_threads(stand_in_server: StandInServer) -> None:
+	stand_in_server.add("/spam", b"Lovely spam")
+
+	with Session(pool_size=4) as session, ThreadPoolExecutor(4) as executor:
+		for _ in range(10):
+			responses = list(executor.map(lambda _: session.fetch("pypi", f"{stand_in_server.url}spam"), range(4)))
+			assert all(response.content == b"Lovely spam" for response in responses)
+
+	assert len(stand_in_server.requests) == 40
+	assert stand_in_server.connections <= 4
@@ -0,0 +1,235 @@
+# stdlib
+import hashlib
+import json
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+from packaging.requirements import InvalidRequirement
+from packaging.version import Version
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe.pypi import (
+		NotYetPublished,
+		ReleaseFile,
+		ReleaseNotFound,
+		_get_cache_file,
+		clear_cache,
+		get_index_url,
+		get_release_files,
+		get_sdist,
+		get_sdist_url,
+		get_sha256,
+		get_wheel_url,
+		parse_project_page
+		)
+
+FILES = [
+		"spam-1.0.0.tar.gz",
+		"spam-1.0.0-py3-none-any.whl",
+		"spam-1.1.0.tar.gz",
+		"spam-1.1.0-py3-none-any.whl",
+		"spam-1.1.0-cp39-cp39-win_amd64.whl",
+		]
+
+
+def test_get_urls(stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", FILES)
+
+	assert get_sdist_url("spam", "1.1.0") == f"{stand_in_server.url}packages/spam-1.1.0.tar.gz"
+	assert get_wheel_url("Spam", "1.1") == f"{stand_in_server.url}packages/spam-1.1.0-py3-none-any.whl"
+	assert [f.filename for f in get_release_files("spam", "1.0.0")] == FILES[:2]
+
+
+def test_get_sha256(stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", FILES, contents={"spam-1.1.0.tar.gz": b"spam" * 100_000})
+	digest = hashlib.sha256(b"spam" * 100_000).hexdigest()
+
+	sdist = get_sdist("spam", "1.1.0")
+	assert sdist.filename == "spam-1.1.0.tar.gz"
+
+	# The digest published by the index is used, so the file isn't downloaded.
+	assert get_sha256(sdist) == digest
+	assert stand_in_server.requests == ["/simple/spam/"]
+
+	# Otherwise the file is downloaded and hashed.
+	assert get_sha256(sdist._replace(hashes={})) == digest
+	assert stand_in_server.requests == ["/simple/spam/", "/packages/spam-1.1.0.tar.gz"]
+
+
+def test_cache(stand_in_server: StandInServer, monkeypatch: MonkeyPatch) -> None:
+	stand_in_server.add_project("spam", FILES)
+
+	files = get_release_files("spam", "1.0.0")
+	assert len(stand_in_server.requests) == 1
+	assert _get_cache_file("spam", Version("1.0.0")).is_file()
+
+	# Served from the cache
+	assert get_release_files("spam", "1.0.0") == files
+	assert len(stand_in_server.requests) == 1
+
+	# Revalidated with a conditional request
+	monkeypatch.setenv("MKRECIPE_CACHE_TTL", '0')
+	stand_in_server.routes.pop("/packages/spam-1.0.0.tar.gz")
+	assert get_release_files("spam", "1.0.0") == files
+	assert len(stand_in_server.requests) == 2
+
+	clear_cache("spam")
+	assert not _get_cache_file("spam", Version("1.0.0")).is_file()
+
+
+def test_cache_per_index(stand_in_server: StandInServer, monkeypatch: MonkeyPatch) -> None:
+	stand_in_server.add_project("spam", FILES)
+	sdist_url = f"{stand_in_server.url}packages/spam-1.0.0.tar.gz"
+	assert get_sdist_url("spam", "1.0.0") == sdist_url
+
+	with StandInServer() as mirror:
+		mirror.add_project("spam", FILES)
+		monkeypatch.setenv("MKRECIPE_INDEX_URL", f"{mirror.url}simple/")
+
+		# The files found in the other index aren't used.
+		assert get_sdist_url("spam", "1.0.0") == f"{mirror.url}packages/spam-1.0.0.tar.gz"
+		assert mirror.requests == ["/simple/spam/"]
+
+	n_requests = len(stand_in_server.requests)
+	monkeypatch.delenv("MKRECIPE_INDEX_URL")
+	assert get_sdist_url("spam", "1.0.0") == sdist_url
+	assert len(stand_in_server.requests) == n_requests
+
+	clear_cache("spam")
+	assert get_sdist_url("spam", "1.0.0") == sdist_url
+	assert len(stand_in_server.requests) == n_requests + 1
+
+
+def test_missing(stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", FILES)
+
+	with pytest.raises(InvalidRequirement, match="No such project/version 'spam' 2.0.0"):
+		get_sdist_url("spam", "2.0.0")
+
+	with pytest.raises(InvalidRequirement, match="No such project 'eggs'"):
+		get_sdist_url("eggs", "2.0.0")
+
+	assert not _get_cache_file("spam", Version("2.0.0")).exists()
+
+
+def test_parse_project_page_html() -> None:
+	page = """\
+<!DOCTYPE html>
+<html>
+<body>
+<a href="../../packages/ab/spam-1.0.0.tar.gz#sha256=1234" data-requires-python="&gt;=3.7">spam-1.0.0.tar.gz</a><br/>
+<a href="https://files.example.com/spam-1.0.0-py3-none-any.whl" data-yanked="">spam-1.0.0-py3-none-any.whl</a><br/>
+<a href="../../packages/ab/spam-1.1.0-py3-none-any.whl" data-core-metadata="sha256=5678">spam-1.1.0-py3-none-any.whl</a><br/>
+<a href="../../packages/ab/spam-1.2.0-py3-none-any.whl" data-dist-info-metadata="true">spam-1.2.0-py3-none-any.whl</a><br/>
+</body>
+</html>
+"""
+
+	assert parse_project_page(page, "text/html", "https://pypi.org/simple/spam/") == [
+			ReleaseFile(
+					"spam-1.0.0.tar.gz",
+					"https://pypi.org/packages/ab/spam-1.0.0.tar.gz",
+					{"sha256": "1234"},
+					">=3.7",
+					),
+			ReleaseFile(
+					"spam-1.0.0-py3-none-any.whl",
+					"https://files.example.com/spam-1.0.0-py3-none-any.whl",
+					{},
+					yanked=True,
+					),
+			ReleaseFile(
+					"spam-1.1.0-py3-none-any.whl",
+					"https://pypi.org/packages/ab/spam-1.1.0-py3-none-any.whl",
+					{},
+					core_metadata={"sha256": "5678"},
+					),
+			ReleaseFile(
+					"spam-1.2.0-py3-none-any.whl",
+					"https://pypi.org/packages/ab/spam-1.2.0-py3-none-any.whl",
+					{},
+					core_metadata={},
+					),
+			]
+
+
+def test_parse_project_page_json_core_metadata() -> None:
+	page = {
+			"meta": {"api-version": "1.1"},
+			"name": "spam",
+			"files": [
+					{"filename": "spam-1.0.0.tar.gz", "url": "spam-1.0.0.tar.gz", "hashes": {}},
+					{
+							"filename": "spam-1.0.0-py3-none-any.whl",
+							"url": "spam-1.0.0-py3-none-any.whl",
+							"hashes": {},
+							"core-metadata": {"sha256": "1234"},
+							},
+					{
+							"filename": "spam-1.1.0-py3-none-any.whl",
+							"url": "spam-1.1.0-py3-none-any.whl",
+							"hashes": {},
+							"dist-info-metadata": True,
+							},
+					],
+			}
+
+	files = parse_project_page(json.dumps(page), "application/vnd.pypi.simple.v1+json", "https://pypi.org/simple/spam/")
+	assert [file.core_metadata for file in files] == [None, {"sha256": "1234"}, {}]
+
+
+def test_release_not_found(stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", FILES)
+
+	with pytest.raises(ReleaseNotFound, match="No such project/version 'spam' 1.0.5") as excinfo:
+		get_sdist_url("spam", "1.0.5")
+
+	assert not isinstance(excinfo.value, NotYetPublished)
+
+	with pytest.raises(NotYetPublished, match="No such project/version 'spam' 1.2.0"):
+		get_sdist_url("spam", "1.2.0")
+
+
+@pytest.fixture()
+def mirror(tmp_pathplus: PathPlus) -> PathPlus:
+	mirror_dir = tmp_pathplus / "mirror"
+	(mirror_dir / "simple" / "spam").maybe_make(parents=True)
+	(mirror_dir / "packages").maybe_make()
+
+	links = []
+	for filename in FILES:
+		(mirror_dir / "packages" / filename).write_bytes(b'')
+		links.append(f'<a href="../../packages/{filename}#sha256=1234">{filename}</a><br/>')
+
+	(mirror_dir / "simple" / "spam" / "index.html").write_lines(["<html><body>", *links, "</body></html>"])
+
+	return mirror_dir
+
+
+@pytest.mark.parametrize("as_uri", [True, False])
+def test_local_mirror(mirror: PathPlus, cache_dir: PathPlus, monkeypatch: MonkeyPatch, as_uri: bool) -> None:
+	index = mirror / "simple"
+	monkeypatch.setenv("MKRECIPE_INDEX_URL", index.as_uri() if as_uri else index.as_posix())
+	assert get_index_url() == f"{index.as_uri()}/"
+
+	sdist_url = get_sdist_url("Spam", "1.1.0")
+	assert sdist_url == (mirror / "packages" / "spam-1.1.0.tar.gz").as_uri()
+	assert get_wheel_url("spam", "1.0.0") == (mirror / "packages" / "spam-1.0.0-py3-none-any.whl").as_uri()
+	assert get_release_files("spam", "1.0.0")[0].hashes == {"sha256": "1234"}
+
+	# The digest listed by the mirror is used, and otherwise the file is hashed.
+	sdist = get_sdist("spam", "1.1.0")
+	assert get_sha256(sdist) == "1234"
+	assert get_sha256(sdist._replace(hashes={})) == hashlib.sha256(b'').hexdigest()
+
+	# Local mirrors are never cached
+	assert not cache_dir.exists()
+
+	with pytest.raises(NotYetPublished, match="No such project 'eggs'"):
+		get_sdist_url("eggs", "1.0.0")
+
+	with pytest.raises(ReleaseNotFound, match="No such project/version 'spam' 1.0.5"):
+		get_sdist_url("spam", "1.0.5")
@@ -0,0 +1,85 @@
+# stdlib
+from io import StringIO
+from typing import List
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus, clean_writer
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from mkrecipe import MaryBerry
+from mkrecipe.recipe import Recipe
+from tests.example_configs import AUTHORS, MAINTAINERS, MINIMAL_CONFIG, UNICODE, URLS
+
+configs_dir = PathPlus(__file__).parent / "configs"
+
+SDIST_URL = "https://files.pythonhosted.org/packages/spam-1.0.0.tar.gz"
+SDIST_SHA256 = "c7e5b4a8f0d36dd0b5a1b3d8b5f7e2d6e1c3a0f4d9b6e8c2a5f1d7b3e9c4a6f0"
+WHEEL_URL = "https://files.pythonhosted.org/packages/spam-1.0.0-py3-none-any.whl"
+RUNTIME_REQUIREMENTS = [ComparableRequirement("click>=7.1.2"), ComparableRequirement("numpy>=1.19.0")]
+
+
+def with_description(config: str, extra: str = '') -> str:
+	return config.replace("[project]\n", f'[project]\ndescription = "Spam"\n{extra}', 1)
+
+
+def clean(recipe: str) -> str:
+	buf = StringIO()
+	clean_writer(recipe, buf)
+	return buf.getvalue()
+
+
+@pytest.fixture(
+		params=[
+				*(pytest.param(filename.read_text(), id=filename.name) for filename in sorted(configs_dir.iterdir())),
+				pytest.param(with_description(MINIMAL_CONFIG), id="minimal"),
+				pytest.param(with_description(AUTHORS), id="authors"),
+				pytest.param(with_description(MAINTAINERS), id="maintainers"),
+				pytest.param(UNICODE, id="unicode"),
+				pytest.param(with_description(URLS), id="urls"),
+				],
+		)
+def berry(request, tmp_pathplus: PathPlus) -> MaryBerry:  # noqa: MAN001
+	(tmp_pathplus / "pyproject.toml").write_clean(request.param)
+	(tmp_pathplus / "requirements.txt").touch()
+	return MaryBerry(tmp_pathplus)
+
+
+@pytest.mark.parametrize("requirements", [RUNTIME_REQUIREMENTS, []])
+def test_matches_template(berry: MaryBerry, requirements: List[ComparableRequirement]) -> None:
+	assert berry._build_sdist(SDIST_URL, requirements).to_yaml() == clean(berry.render_sdist(SDIST_URL, requirements))
+	assert berry._build_wheel(WHEEL_URL, requirements).to_yaml() == clean(berry.render_wheel(WHEEL_URL, requirements))
+
+	sdist = berry._build_sdist(SDIST_URL, requirements, SDIST_SHA256).to_yaml()
+	assert sdist == clean(berry.render_sdist(SDIST_URL, requirements, SDIST_SHA256))
+	assert f'  url: "{SDIST_URL}"\n  sha256: {SDIST_SHA256}\n\n' in sdist
+
+
+def test_recipe(tmp_pathplus: PathPlus) -> None:
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{with_description(URLS)}\n[tool.whey]\nlicense-key = "MIT"')
+	(tmp_pathplus / "requirements.txt").touch()
+	recipe = MaryBerry(tmp_pathplus)._build_sdist(SDIST_URL, RUNTIME_REQUIREMENTS)
+
+	assert isinstance(recipe, Recipe)
+	assert recipe.package.name == "spam"
+	assert recipe.package.version == "2020.0.0"
+	assert recipe.source is not None
+	assert recipe.source.url == SDIST_URL
+	assert recipe.requirements.run == ["python>=3.6", "click>=7.1.2", "numpy>=1.19.0"]
+	assert recipe.test.imports == ["spam"]
+	assert recipe.about.license == "MIT License"
+	assert recipe.about.summary == "Spam"
+	assert recipe.about.urls == {
+			"home": "example.com",
+			"doc_url": "readthedocs.org",
+			}
+
+	recipe.package.version = "2020.0.1"
+	recipe.requirements.run.append("consolekit>=1.0.0")
+	recipe.about.license = None
+
+	yaml = recipe.to_yaml()
+	assert '  version: "2020.0.1"\n' in yaml
+	assert "    - numpy>=1.19.0\n    - consolekit>=1.0.0\n" in yaml
+	assert "license" not in yaml
@@ -0,0 +1,95 @@
+# stdlib
+import asyncio
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+from packaging.requirements import InvalidRequirement
+from shippinglabel.requirements import ComparableRequirement
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import MaryBerry
+from mkrecipe.network import Session
+from mkrecipe.resolver import Resolver, get_resolver
+
+PYPROJECT = """\
+[project]
+name = "spam"
+version = "1.0.0"
+description = "Lovely Spam! Wonderful Spam!"
+dependencies = ["click>=7.1.2", "typing-extensions>=3.7.4.3", "consolekit>=1.0.0"]
+
+[tool.mkrecipe]
+conda-channels = ["conda-forge", "domdfcoding"]
+"""
+
+
+@pytest.fixture()
+def project(stand_in_server: StandInServer, tmp_pathplus: PathPlus) -> PathPlus:
+	stand_in_server.add_project("spam", ["spam-1.0.0.tar.gz", "spam-1.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "typing-extensions", "setuptools", "wheel"])
+	stand_in_server.add_channel("domdfcoding", ["consolekit"])
+
+	project_dir = tmp_pathplus / "spam"
+	project_dir.mkdir()
+	(project_dir / "pyproject.toml").write_clean(PYPROJECT)
+
+	return project_dir
+
+
+def test_amake(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe = asyncio.run(MaryBerry(project).amake())
+	assert f'url: "{stand_in_server.url}packages/spam-1.0.0.tar.gz"' in recipe
+	assert "    - consolekit>=1.0.0\n" in recipe
+	assert recipe == MaryBerry(project).make()
+
+
+def test_amake_for_wheel(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe = asyncio.run(MaryBerry(project).amake_for_wheel())
+	assert f"-m pip install {stand_in_server.url}packages/spam-1.0.0-py3-none-any.whl -vv" in recipe
+	assert recipe == MaryBerry(project).make_for_wheel()
+
+
+def test_resolver(project: PathPlus, stand_in_server: StandInServer) -> None:
+
+	async def resolve():  # noqa: MAN002
+		with Resolver(max_workers=2) as resolver:
+			return await asyncio.gather(
+					resolver.get_sdist_url("spam", "1.0.0"),
+					resolver.validate_requirements(
+							[ComparableRequirement("click"), ComparableRequirement("consolekit")],
+							["conda-forge", "domdfcoding"],
+							),
+					)
+
+	sdist_url, requirements = asyncio.run(resolve())
+	assert sdist_url == f"{stand_in_server.url}packages/spam-1.0.0.tar.gz"
+	assert requirements == ["click", "consolekit"]
+
+
+def test_resolver_errors(project: PathPlus) -> None:
+
+	async def validate() -> None:
+		with Resolver() as resolver:
+			await resolver.validate_requirements([ComparableRequirement("consolekit")], ["conda-forge"])
+
+	with pytest.raises(InvalidRequirement, match="Cannot satisfy the requirement 'consolekit'"):
+		asyncio.run(validate())
+
+
+def test_resolver_session(project: PathPlus, stand_in_server: StandInServer) -> None:
+	assert MaryBerry(project).resolver is get_resolver()
+
+	with Session() as session, Resolver(session=session) as resolver:
+		berry = MaryBerry(project, resolver=resolver)
+		assert berry.resolver.session is session
+
+		# The lookup on PyPI and the validation of the requirements each use one connection for all their requests.
+		berry.make()
+		assert stand_in_server.connections <= 2
+		assert len(stand_in_server.requests) > 2
+
+		berry.invalidate()
+		asyncio.run(berry.amake())
+		assert stand_in_server.connections <= resolver.max_workers
@@ -0,0 +1,153 @@
+# stdlib
+import asyncio
+import time
+from typing import Callable, List
+
+# 3rd party
+import pytest
+import requests
+from _pytest.monkeypatch import MonkeyPatch
+
+# this package
+from mkrecipe.pypi import NotYetPublished, ReleaseNotFound
+from mkrecipe.retry import RetryPolicy, is_transient
+
+
+def http_error(status_code: int, **headers: str) -> requests.HTTPError:
+	response = requests.Response()
+	response.status_code = status_code
+	response.headers.update(headers)
+	return requests.HTTPError(f"{status_code} Error", response=response)
+
+
+@pytest.fixture()
+def sleeps(monkeypatch: MonkeyPatch) -> List[float]:
+	# A fake clock which advances only when sleeping.
+	delays: List[float] = []
+	monkeypatch.setattr(time, "sleep", delays.append)
+	monkeypatch.setattr(time, "time", lambda: 1_000_000 + sum(delays))
+	return delays
+
+
+def failing(*exceptions: Exception) -> Callable[..., str]:
+	remaining = list(exceptions)
+
+	def func(name: str, version: str) -> str:
+		if remaining:
+			raise remaining.pop(0)
+		return f"{name}-{version}.tar.gz"
+
+	return func
+
+
+@pytest.mark.parametrize(
+		"exception, expected",
+		[
+				(requests.ConnectionError(), True),
+				(requests.Timeout(), True),
+				(http_error(429), True),
+				(http_error(503), True),
+				(http_error(403), False),
+				(http_error(404), False),
+				(ValueError(), False),
+				(NotYetPublished(), False),
+				],
+		)
+def test_is_transient(exception: Exception, expected: bool) -> None:
+	assert is_transient(exception) is expected
+
+
+def test_get_delay() -> None:
+	policy = RetryPolicy(base_delay=0.5, max_delay=3, jitter=False)
+	assert [policy.get_delay(attempt) for attempt in range(5)] == [0.5, 1, 2, 3, 3]
+	assert policy.get_delay(0, http_error(429, **{"Retry-After": '7'})) == 7
+
+	policy = RetryPolicy(base_delay=4, max_delay=30)
+	assert all(2 <= policy.get_delay(0) <= 4 for _ in range(100))
+
+
+def test_call(sleeps: List[float]) -> None:
+	policy = RetryPolicy(attempts=4, jitter=False)
+
+	func = failing(requests.ConnectionError(), http_error(502), NotYetPublished("No such project 'spam'"))
+	assert policy.call(func, "spam", "1.0") == "spam-1.0.tar.gz"
+	assert sleeps == [1, 2, 4]
+
+
+def test_call_permanent(sleeps: List[float]) -> None:
+	policy = RetryPolicy(attempts=4)
+
+	with pytest.raises(ReleaseNotFound):
+		policy.call(failing(ReleaseNotFound()), "spam", "1.0")
+
+	with pytest.raises(requests.HTTPError, match="403 Error"):
+		policy.call(failing(http_error(403)), "spam", "1.0")
+
+	with pytest.raises(NotYetPublished):
+		RetryPolicy(retry_not_published=False).call(failing(NotYetPublished()), "spam", "1.0")
+
+	assert sleeps == []
+
+
+def test_call_gives_up(sleeps: List[float]) -> None:
+	with pytest.raises(NotYetPublished):
+		RetryPolicy(attempts=3, jitter=False).call(failing(*[NotYetPublished()] * 3), "spam", "1.0")
+
+	assert sleeps == [1, 2]
+
+	sleeps.clear()
+
+	with pytest.raises(requests.ConnectionError):
+		RetryPolicy(deadline=2.5, jitter=False).call(failing(*[requests.ConnectionError()] * 3), "spam", "1.0")
+
+	assert sleeps == [1]
+
+	sleeps.clear()
+
+	with pytest.raises(requests.ConnectionError):
+		RetryPolicy(global_deadline=time.time() + 0.5).call(failing(requests.ConnectionError()), "spam", "1.0")
+
+	assert sleeps == []
+
+
+def test_for_project(sleeps: List[float]) -> None:
+	# The deadline is shared between the calls for the project.
+	policy = RetryPolicy(deadline=1.5, jitter=False).for_project()
+	assert policy.call(failing(requests.ConnectionError()), "spam", "1.0") == "spam-1.0.tar.gz"
+
+	with pytest.raises(requests.ConnectionError):
+		policy.call(failing(requests.ConnectionError()), "eggs", "1.0")
+
+	assert sleeps == [1]
+
+
+def test_from_environment(sleeps: List[float], monkeypatch: MonkeyPatch) -> None:
+	monkeypatch.setenv("MKRECIPE_HTTP_RETRIES", '5')
+	monkeypatch.setenv("MKRECIPE_DEADLINE", '30')
+	monkeypatch.setenv("MKRECIPE_GLOBAL_DEADLINE", '60')
+
+	policy = RetryPolicy.from_environment()
+	assert policy.attempts == 6
+	assert policy.deadline == 30
+	assert policy.global_deadline == 1_000_060
+
+	policy = RetryPolicy.from_environment(deadline=10, global_deadline=None)
+	assert policy.deadline == 10
+	assert policy.global_deadline is None
+
+
+def test_acall(monkeypatch: MonkeyPatch) -> None:
+	delays: List[float] = []
+
+	async def sleep(delay: float) -> None:
+		delays.append(delay)
+
+	monkeypatch.setattr(asyncio, "sleep", sleep)
+	func = failing(requests.Timeout(), http_error(503, **{"Retry-After": '3'}))
+
+	async def afunc(name: str, version: str) -> str:
+		return func(name, version)
+
+	policy = RetryPolicy(jitter=False)
+	assert asyncio.run(policy.acall(afunc, "spam", "1.0")) == "spam-1.0.tar.gz"
+	assert delays == [1, 3]
@@ -0,0 +1,177 @@
+# stdlib
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPResponse
+from typing import Any, Dict, Iterator, Tuple, cast
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe.retry import RetryPolicy
+from mkrecipe.server import BadRequest, make_server, parse_address, render_recipe
+
+PYPROJECT = """\
+[project]
+name = "spam"
+version = "1.0.0"
+description = "Lovely Spam! Wonderful Spam!"
+dynamic = ["dependencies"]
+"""
+
+NO_RETRIES = RetryPolicy(attempts=1)
+
+
+@pytest.fixture()
+def project(stand_in_server: StandInServer, tmp_pathplus: PathPlus) -> PathPlus:
+	stand_in_server.add_project("spam", ["spam-1.0.0.tar.gz", "spam-1.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "setuptools", "wheel"])
+
+	project_dir = tmp_pathplus / "spam"
+	project_dir.mkdir()
+	(project_dir / "pyproject.toml").write_clean(PYPROJECT)
+	(project_dir / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	return project_dir
+
+
+@pytest.mark.parametrize(
+		"address, expected",
+		[
+				("8080", ("127.0.0.1", 8080)),
+				("0.0.0.0:8080", ("0.0.0.0", 8080)),
+				("localhost:0", ("localhost", 0)),
+				("unix:/tmp/mkrecipe.sock", "/tmp/mkrecipe.sock"),
+				],
+		)
+def test_parse_address(address: str, expected: Any) -> None:
+	assert parse_address(address) == expected
+
+
+@pytest.mark.parametrize("address", ["spam", "localhost:eggs", "unix:"])
+def test_parse_address_errors(address: str) -> None:
+	with pytest.raises(ValueError):
+		parse_address(address)
+
+
+def test_render_recipe(project: PathPlus) -> None:
+	recipe = render_recipe({"project": project.as_posix()}, NO_RETRIES)
+	assert "spam-1.0.0.tar.gz" in recipe
+	assert "    - click>=7.1.2\n" in recipe
+
+	recipe = render_recipe({"project": project.as_posix(), "type": "wheel"}, NO_RETRIES)
+	assert "spam-1.0.0-py3-none-any.whl" in recipe
+
+	inline = {"pyproject": PYPROJECT, "requirements": "click>=7.1.2\n"}
+	assert render_recipe(inline, NO_RETRIES) == render_recipe({"project": project.as_posix()}, NO_RETRIES)
+
+
+@pytest.mark.parametrize(
+		"request_, message",
+		[
+				pytest.param([], "The request must be a JSON object.", id="not_object"),
+				pytest.param({}, "Either 'project' or 'pyproject' must be given.", id="empty"),
+				pytest.param({"project": '.', "type": "egg"}, "Unknown artifact type 'egg'", id="type"),
+				pytest.param({"pyproject": '', "requirements": 1}, "'requirements' must be a string.", id="reqs"),
+				],
+		)
+def test_render_recipe_bad_request(request_: Any, message: str) -> None:
+	with pytest.raises(BadRequest, match=message):
+		render_recipe(request_)
+
+
+class UnixHTTPConnection(HTTPConnection):
+
+	def __init__(self, path: str) -> None:
+		super().__init__("localhost")
+		self.path = path
+
+	def connect(self) -> None:
+		self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		self.sock.connect(self.path)
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def connect(request, tmp_pathplus: PathPlus, project: PathPlus) -> Iterator[Any]:  # noqa: MAN001
+	if request.param == "tcp":
+		address = "127.0.0.1:0"
+	else:
+		address = f"unix:{tmp_pathplus / 'mkrecipe.sock'}"
+
+	server = make_server(address, NO_RETRIES)
+	thread = threading.Thread(target=server.serve_forever, args=(0.01, ), daemon=True)
+	thread.start()
+
+	def factory() -> HTTPConnection:
+		if isinstance(server.server_address, str):
+			return UnixHTTPConnection(server.server_address)
+		else:
+			return HTTPConnection(*cast(Tuple[str, int], server.server_address)[:2])
+
+	try:
+		yield factory
+	finally:
+		server.shutdown()
+		server.server_close()
+		thread.join()
+
+	if request.param == "unix":
+		assert not (tmp_pathplus / "mkrecipe.sock").exists()
+
+
+def post(connection: HTTPConnection, body: Any) -> Tuple[HTTPResponse, str]:
+	connection.request("POST", "/recipe", body=json.dumps(body), headers={"Content-Type": "application/json"})
+	response = connection.getresponse()
+	return response, response.read().decode("UTF-8")
+
+
+def test_server(connect: Any, project: PathPlus) -> None:  # noqa: MAN001
+	connection = connect()
+
+	connection.request("GET", "/health")
+	response = connection.getresponse()
+	assert response.status == 200
+	assert response.read() == b"OK"
+
+	response, body = post(connection, {"project": project.as_posix()})
+	assert response.status == 200
+	assert response.getheader("Content-Type") == "text/yaml; charset=utf-8"
+	assert "spam-1.0.0.tar.gz" in body
+
+	errors: Dict[int, Any] = {
+			400: {"project": (project.parent / "eggs").as_posix()},
+			404: {"pyproject": PYPROJECT.replace("spam", "eggs")},
+			}
+
+	for status, request in errors.items():
+		response, body = post(connection, request)
+		assert response.status == status
+		assert response.getheader("Content-Type") == "application/json; charset=utf-8"
+		assert "error" in json.loads(body)
+
+	connection.request("POST", "/recipe", body=b"{")
+	response = connection.getresponse()
+	assert response.status == 400
+	assert json.loads(response.read())["error"].startswith("JSONDecodeError: ")
+
+	connection.request("GET", "/spam")
+	response = connection.getresponse()
+	assert response.status == 404
+	response.read()
+
+
+def test_server_concurrent(connect: Any, project: PathPlus) -> None:  # noqa: MAN001
+
+	def render(artifact_type: str) -> str:
+		response, body = post(connect(), {"project": project.as_posix(), "type": artifact_type})
+		assert response.status == 200, body
+		return body
+
+	with ThreadPoolExecutor(8) as executor:
+		recipes = list(executor.map(render, ["sdist", "wheel"] * 16))
+
+	assert len(set(recipes)) == 2
@@ -0,0 +1,80 @@
+# stdlib
+import json
+import subprocess
+import sys
+from typing import List
+
+# 3rd party
+import pytest
+
+# Dependencies which are only needed once a recipe is actually being made.
+HEAVY_MODULES = {
+		"dom_toml",
+		"jinja2",
+		"packaging",
+		"platformdirs",
+		"pyproject_parser",
+		"requests",
+		"shippinglabel",
+		"shippinglabel_conda",
+		"whey",
+		}
+
+PROBE = """\
+import json, sys
+from mkrecipe.__main__ import main
+
+try:
+	main({args!r})
+except SystemExit:
+	pass
+
+print(json.dumps(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+def imported_modules(*args: str) -> List[str]:
+	process = subprocess.run(
+			[sys.executable, "-c", PROBE.format(args=list(args))],
+			stdout=subprocess.PIPE,
+			stderr=subprocess.PIPE,
+			check=True,
+			universal_newlines=True,
+			)
+	return json.loads(process.stderr.splitlines()[-1])
+
+
+def modules_imported_by(module: str) -> List[str]:
+	process = subprocess.run(
+			[sys.executable, "-c", f"import json, sys, {module}; print(json.dumps(sorted(sys.modules)))"],
+			stdout=subprocess.PIPE,
+			check=True,
+			universal_newlines=True,
+			)
+	return json.loads(process.stdout)
+
+
+@pytest.mark.parametrize("args", [["--help"], ["--version"]])
+def test_cli_imports(args: List[str]) -> None:
+	top_level = {name.split('.')[0] for name in imported_modules(*args)}
+	assert not top_level & HEAVY_MODULES
+	assert "mkrecipe._core" not in imported_modules(*args)
+
+
+def test_import_package() -> None:
+	# Importing the package itself should do next to nothing until the public API is used.
+	modules = modules_imported_by("mkrecipe")
+	assert not {name.split('.')[0] for name in modules} & HEAVY_MODULES
+	assert not {"mkrecipe._core", "mkrecipe.network", "mkrecipe.pypi", "mkrecipe.resolver"} & set(modules)
+
+
+def test_lazy_attributes() -> None:
+	# this package
+	import mkrecipe
+	from mkrecipe import _core
+
+	assert mkrecipe.MaryBerry is _core.MaryBerry
+	assert set(mkrecipe.__all__) <= set(dir(mkrecipe))
+
+	with pytest.raises(AttributeError, match="module 'mkrecipe' has no attribute 'spam'"):
+		mkrecipe.spam  # noqa: B018  # pylint: disable=pointless-statement
@@ -0,0 +1,55 @@
+# stdlib
+from typing import Any, Dict
+
+# 3rd party
+import pytest
+from _pytest.monkeypatch import MonkeyPatch
+from domdf_python_tools.paths import PathPlus
+from jinja2 import BaseLoader, Environment, StrictUndefined
+
+# this package
+from mkrecipe.template import _load_template, compile_template, get_template, read_template_source
+
+context: Dict[str, Any] = {
+		"name": "spam",
+		"version": "2020.0.0",
+		"sdist_url": "https://files.pythonhosted.org/packages/spam-2020.0.0.tar.gz",
+		"requires": ["setuptools", "wheel"],
+		"requires_python": ">=3.7",
+		"host_requirements": ["click>=7.1.2", "setuptools", "wheel"],
+		"runtime_requirements": ["click>=7.1.2"],
+		"package": "spam",
+		"project_license": "MIT License",
+		"description": "Lovely Spam! Wonderful Spam!",
+		"conda_full_description": "Lovely Spam! Wonderful Spam!",
+		"url_lines": ["home: 'https://example.com'"],
+		"all_maintainers": ["'Joe Bloggs'"],
+		}
+
+
+@pytest.fixture()
+def expected() -> str:
+	environment = Environment(loader=BaseLoader(), undefined=StrictUndefined)  # nosec: B701
+	return environment.from_string(read_template_source()).render(**context)
+
+
+def test_get_template(expected: str, monkeypatch: MonkeyPatch) -> None:
+	monkeypatch.delenv("MKRECIPE_TEMPLATE_MODULES", raising=False)
+
+	assert get_template() is get_template()
+	assert get_template().render(**context) == expected
+
+
+def test_compile_template(tmp_pathplus: PathPlus, expected: str, monkeypatch: MonkeyPatch) -> None:
+	compile_template(tmp_pathplus)
+	assert [p.suffix for p in tmp_pathplus.iterdir()] == [".py"]
+
+	monkeypatch.setenv("MKRECIPE_TEMPLATE_MODULES", tmp_pathplus.as_posix())
+
+	try:
+		template = get_template()
+		assert template is get_template()
+		assert template is not _load_template(None)
+		assert template.render(**context) == expected
+	finally:
+		_load_template.cache_clear()
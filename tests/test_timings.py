@@ -0,0 +1,116 @@
+# stdlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe import MaryBerry, make_recipes
+from mkrecipe.timings import PhaseTiming, Timings, summarise
+from tests.example_configs import MINIMAL_CONFIG
+
+
+def test_timings() -> None:
+	timings = Timings()
+
+	with timings.phase("sleep"):
+		time.sleep(0.05)
+
+	with pytest.raises(ValueError, match="spam"):
+		with timings.phase("busy"):
+			sum(range(100_000))
+			raise ValueError("spam")
+
+	with timings.phase("sleep"):
+		pass
+
+	assert list(timings.phases) == ["sleep", "busy"]
+	assert timings.phases["sleep"].calls == 2
+	assert timings.phases["sleep"].wall >= 0.05
+	assert timings.phases["sleep"].cpu < timings.phases["sleep"].wall
+	assert timings.phases["busy"].cpu > 0
+
+	assert timings.as_dict()["busy"] == {
+			"wall": timings.phases["busy"].wall,
+			"cpu": timings.phases["busy"].cpu,
+			"calls": 1,
+			}
+
+
+def test_timings_threads() -> None:
+	timings = Timings()
+
+	with ThreadPoolExecutor(8) as executor:
+		for _ in range(1000):
+			executor.submit(timings.record, "phase", 0.5, 0.25)
+
+	assert timings.phases == {"phase": PhaseTiming(500.0, 250.0, 1000)}
+
+
+def test_timings_hook() -> None:
+	measurements: List[Tuple[str, float]] = []
+
+	class RecordingTimings(Timings):
+
+		def record(self, name: str, wall: float, cpu: float) -> None:
+			measurements.append((name, wall))
+			super().record(name, wall, cpu)
+
+	timings = RecordingTimings()
+	with timings.phase("spam"):
+		pass
+
+	assert [name for name, _ in measurements] == ["spam"]
+
+
+def test_summarise() -> None:
+	runs = [{"render": {"wall": float(wall), "cpu": wall / 10, "calls": 1}} for wall in range(1, 21)]
+	runs.append({"write": {"wall": 1.0, "cpu": 0.5, "calls": 1}})
+
+	summary = summarise(runs)
+	assert list(summary) == ["render", "write"]
+	assert summary["render"] == {
+			"calls": 20,
+			"wall_p50": 10.5,
+			"wall_p95": pytest.approx(19.05),
+			"cpu_p50": pytest.approx(1.05),
+			"cpu_p95": pytest.approx(1.905),
+			}
+	assert summary["write"] == {"calls": 1, "wall_p50": 1.0, "wall_p95": 1.0, "cpu_p50": 0.5, "cpu_p95": 0.5}
+	assert summarise([]) == {}
+
+
+def test_maryberry_timings(tmp_pathplus: PathPlus, stand_in_server: StandInServer) -> None:
+	stand_in_server.add_project("spam", ["spam-2020.0.0.tar.gz", "spam-2020.0.0-py3-none-any.whl"])
+	stand_in_server.add_channel("conda-forge", ["click", "setuptools", "wheel"])
+	(tmp_pathplus / "pyproject.toml").write_clean(f'{MINIMAL_CONFIG}\ndescription = "Spam, spam, spam"')
+	(tmp_pathplus / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	berry = MaryBerry(tmp_pathplus)
+	assert list(berry.timings.phases) == ["load_config"]
+
+	# The lookup on PyPI runs concurrently with the requirements phases.
+	berry.make()
+	phases = list(berry.timings.phases)
+	assert phases[0] == "load_config"
+	assert phases[-1] == "render"
+	assert set(phases) == {"load_config", "pypi_lookup", "prepare_requirements", "validate_requirements", "render"}
+	assert phases.index("prepare_requirements") < phases.index("validate_requirements")
+
+	# Cached data is not recomputed, so only the lookup and rendering are timed again.
+	berry.make_for_wheel()
+	assert berry.timings.phases["pypi_lookup"].calls == 2
+	assert berry.timings.phases["validate_requirements"].calls == 1
+	assert berry.timings.phases["render"].calls == 2
+
+	# Shared between recipes.
+	timings = Timings()
+	make_recipes(tmp_pathplus, {"sdist": tmp_pathplus / "sdist.yaml", "wheel": tmp_pathplus / "wheel.yaml"}, timings=timings)
+	make_recipes(tmp_pathplus, {"sdist": tmp_pathplus / "sdist.yaml"}, timings=timings)
+	assert timings.phases["load_config"].calls == 2
+	assert timings.phases["pypi_lookup"].calls == 3
+	assert timings.phases["write"].calls == 3
@@ -0,0 +1,180 @@
+# stdlib
+import hashlib
+import threading
+from typing import Callable, List, Optional
+
+# 3rd party
+import pytest
+from domdf_python_tools.paths import PathPlus
+
+# this package
+from benchmarks.stand_ins import StandInServer
+from mkrecipe.watch import FileWatcher, InotifyWatcher, PollingWatcher, RecipeSession, get_watcher, watch
+
+PYPROJECT = """\
+[project]
+name = "spam"
+version = "{version}"
+description = "Lovely Spam! Wonderful Spam!"
+dynamic = ["dependencies"]
+"""
+
+
+@pytest.fixture()
+def project(stand_in_server: StandInServer, tmp_pathplus: PathPlus) -> PathPlus:
+	stand_in_server.add_project("spam", ["spam-1.0.0.tar.gz", "spam-1.1.0.tar.gz"])
+	stand_in_server.add_channel("conda-forge", ["click", "consolekit", "setuptools", "wheel"])
+
+	project_dir = tmp_pathplus / "spam"
+	project_dir.mkdir()
+	(project_dir / "pyproject.toml").write_clean(PYPROJECT.format(version="1.0.0"))
+	(project_dir / "requirements.txt").write_lines(["click>=7.1.2"])
+
+	return project_dir
+
+
+def _inotify_watcher(files: List[PathPlus]) -> FileWatcher:
+	try:
+		return InotifyWatcher(files)
+	except OSError:
+		pytest.skip("inotify is not available.")
+
+
+@pytest.mark.parametrize(
+		"make_watcher",
+		[
+				pytest.param(lambda files: PollingWatcher(files, interval=0.01), id="polling"),
+				pytest.param(_inotify_watcher, id="inotify"),
+				],
+		)
+def test_watcher(tmp_pathplus: PathPlus, make_watcher: Callable[[List[PathPlus]], FileWatcher]) -> None:
+	watched = tmp_pathplus / "pyproject.toml"
+	watched.write_clean("[project]")
+
+	with make_watcher([watched, tmp_pathplus / "requirements.txt"]) as watcher:
+		assert not watcher.wait(timeout=0.1)
+
+		(tmp_pathplus / "README.rst").write_clean("Not watched")
+		assert not watcher.wait(timeout=0.1)
+
+		timer = threading.Timer(0.05, watched.write_clean, args=("[project]\nname = 'spam'", ))
+		timer.start()
+		assert watcher.wait(timeout=5)
+		timer.join()
+
+		(tmp_pathplus / "requirements.txt").write_lines(["click"])
+		assert watcher.wait(timeout=5)
+
+		(tmp_pathplus / "requirements.txt").unlink()
+		assert watcher.wait(timeout=5)
+		assert not watcher.wait(timeout=0.1)
+
+
+def test_file_watcher_abstract(tmp_pathplus: PathPlus) -> None:
+	with pytest.raises(TypeError, match="abstract"):
+		FileWatcher([tmp_pathplus / "pyproject.toml"])  # type: ignore[abstract]
+
+
+def test_get_watcher(tmp_pathplus: PathPlus) -> None:
+	with get_watcher([tmp_pathplus / "pyproject.toml"]) as watcher:
+		assert isinstance(watcher, (InotifyWatcher, PollingWatcher))
+
+
+def test_session(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+	session = RecipeSession(project, recipe_file)
+
+	result = session.update()
+	assert result.written
+	assert result.error is None
+	assert "spam-1.0.0.tar.gz" in recipe_file.read_text()
+	request_count = len(stand_in_server.requests)
+
+	# Nothing has changed.
+	assert not session.update().written
+
+	# Only the requirements have changed, so the URL is not looked up again.
+	(project / "requirements.txt").write_lines(["click>=7.1.2", "consolekit>=1.0.0"])
+	assert session.update().written
+	assert "    - consolekit>=1.0.0\n" in recipe_file.read_text()
+	assert len(stand_in_server.requests) == request_count
+
+	# The version has changed, so it is.
+	(project / "pyproject.toml").write_clean(PYPROJECT.format(version="1.1.0"))
+	assert session.update().written
+	assert "spam-1.1.0.tar.gz" in recipe_file.read_text()
+	assert "    - consolekit>=1.0.0\n" in recipe_file.read_text()
+	assert len(stand_in_server.requests) > request_count
+
+
+def test_session_bad_type(project: PathPlus) -> None:
+	with pytest.raises(ValueError, match="Unknown artifact type 'egg'"):
+		RecipeSession(project, project / "conda" / "meta.yaml", "egg")
+
+
+class ScriptedWatcher(FileWatcher):
+	"""
+	Applies a change to the project each time :meth:`~.wait` is called.
+	"""
+
+	def __init__(self, changes: List[Callable[[], None]]) -> None:
+		super().__init__([])
+		self.changes = changes
+		self.closed = False
+
+	def wait(self, timeout: Optional[float] = None) -> bool:
+		self.changes.pop(0)()
+		return True
+
+	def close(self) -> None:
+		self.closed = True
+
+
+def test_watch(project: PathPlus) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+	pyproject_file = project / "pyproject.toml"
+
+	watcher = ScriptedWatcher([
+			lambda: pyproject_file.write_clean("[project"),
+			lambda: pyproject_file.write_clean(PYPROJECT.format(version="1.1.0")),
+			])
+	results = watch(project, recipe_file, watcher=watcher)
+
+	result = next(results)
+	assert result.written
+	assert result.error is None
+
+	# Errors are reported, and watching continues.
+	result = next(results)
+	assert not result.written
+	assert result.error is not None
+	assert "spam-1.0.0.tar.gz" in recipe_file.read_text()
+
+	result = next(results)
+	assert result.written
+	assert result.error is None
+	assert "spam-1.1.0.tar.gz" in recipe_file.read_text()
+
+	results.close()
+	assert watcher.closed
+
+
+def test_session_sha256(project: PathPlus, stand_in_server: StandInServer) -> None:
+	recipe_file = project / "conda" / "meta.yaml"
+	pyproject_file = project / "pyproject.toml"
+	pyproject_file.write_clean(f"{PYPROJECT.format(version='1.0.0')}\n[tool.mkrecipe]\nsha256 = true")
+	digest = hashlib.sha256(b"spam-1.0.0.tar.gz").hexdigest()
+
+	session = RecipeSession(project, recipe_file)
+	assert session.update().written
+	assert f"  sha256: {digest}\n" in recipe_file.read_text()
+
+	# The digest is kept when only the requirements change.
+	(project / "requirements.txt").write_lines(["click>=7.1.2", "consolekit>=1.0.0"])
+	assert session.update().written
+	assert f"  sha256: {digest}\n" in recipe_file.read_text()
+
+	# And dropped when the option is disabled.
+	pyproject_file.write_clean(PYPROJECT.format(version="1.0.0"))
+	assert session.update().written
+	assert "sha256" not in recipe_file.read_text()